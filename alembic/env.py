@@ -1,8 +1,16 @@
+import os
+import sys
 from logging.config import fileConfig
 from alembic import context
 
+# Import the platform from src like the services do. postgres.py imports agentic_platform.*,
+# and the engine's profile listener must read the ContextVar of the same session_profiles
+# module this file sets, which a src.-prefixed import would load a second time.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
 # Import only the database connection
-from src.agentic_platform.core.db.postgres import write_postgres_db
+from agentic_platform.core.db.postgres import get_db
+from agentic_platform.core.db.session_profiles import WorkloadProfile, session_profile
 
 # Alembic Config object
 config = context.config
@@ -29,15 +37,24 @@ def run_migrations_offline() -> None:
 
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode using the existing connection."""
-    # Use your existing connection for migrations
-    with write_postgres_db.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=None,  # No ORM metadata
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+    # Use your existing connection for migrations. DDL and backfills run far longer
+    # than the statement_timeout of the interactive profile.
+    with session_profile(WorkloadProfile.BULK_WRITE), get_db().get_write_engine().connect() as connection:
+        # Table rewrites and index builds can outlast even the bulk profile's timeout. Committed
+        # so alembic starts its own transaction, and the connection is discarded afterwards so
+        # the pool never hands out a session without a timeout.
+        connection.exec_driver_sql("SET statement_timeout = 0")
+        connection.commit()
+        try:
+            context.configure(
+                connection=connection,
+                target_metadata=None,  # No ORM metadata
+            )
+
+            with context.begin_transaction():
+                context.run_migrations()
+        finally:
+            connection.invalidate()
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -0,0 +1,29 @@
+"""Add memory_archive.summary
+
+Revision ID: 3c8f1a6d2e95
+Revises: 9e5a2c7d4b18
+Create Date: 2026-10-17 23:12:08.517364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8f1a6d2e95'
+down_revision: Union[str, None] = '9e5a2c7d4b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Archived memories keep the distilled summary next to the full transcript, like memory.
+    op.execute('ALTER TABLE memory_archive ADD COLUMN IF NOT EXISTS summary TEXT;')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER TABLE memory_archive DROP COLUMN IF EXISTS summary;')
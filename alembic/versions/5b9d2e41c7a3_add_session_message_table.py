@@ -0,0 +1,44 @@
+"""Add append-only session_message table
+
+Revision ID: 5b9d2e41c7a3
+Revises: 80231e6f76e0
+Create Date: 2026-10-17 10:04:18.532907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9d2e41c7a3'
+down_revision: Union[str, None] = '80231e6f76e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Highest sequence handed out for the session. Appends bump it under the row lock of the
+    # session, which serializes concurrent appends to the same session without gaps or duplicates.
+    # A constant default doesn't rewrite the table.
+    op.execute('ALTER TABLE session_context ADD COLUMN last_sequence BIGINT NOT NULL DEFAULT 0;')
+
+    # One row per appended message. A turn inserts only its new messages instead of
+    # rewriting the whole messages JSONB of the session.
+    op.execute('''
+    CREATE TABLE session_message (
+        session_id UUID NOT NULL REFERENCES session_context(session_id) ON DELETE CASCADE,
+        sequence BIGINT NOT NULL,
+        message JSONB NOT NULL,
+        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (session_id, sequence)
+    );
+    ''')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TABLE IF EXISTS session_message;')
+    op.execute('ALTER TABLE session_context DROP COLUMN IF EXISTS last_sequence;')
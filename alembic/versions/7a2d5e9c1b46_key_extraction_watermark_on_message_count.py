@@ -0,0 +1,35 @@
+"""Key the memory extraction watermark on the message count
+
+Revision ID: 7a2d5e9c1b46
+Revises: 3c8f1a6d2e95
+Create Date: 2026-10-17 23:41:26.093518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2d5e9c1b46'
+down_revision: Union[str, None] = '3c8f1a6d2e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Message timestamps can't be mapped to message counts without the sessions, which are
+    # stored compressed. The watermarks are dropped instead: each session is extracted in full
+    # once more, like before the watermark existed, and near duplicates are deduplicated.
+    op.execute('DELETE FROM memory_extraction_watermark;')
+    op.execute('ALTER TABLE memory_extraction_watermark DROP COLUMN last_message_ms;')
+    op.execute('ALTER TABLE memory_extraction_watermark ADD COLUMN message_count BIGINT NOT NULL;')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DELETE FROM memory_extraction_watermark;')
+    op.execute('ALTER TABLE memory_extraction_watermark DROP COLUMN message_count;')
+    op.execute('ALTER TABLE memory_extraction_watermark ADD COLUMN last_message_ms BIGINT NOT NULL;')
@@ -0,0 +1,45 @@
+"""Add HNSW index on memory.embedding
+
+Revision ID: 80231e6f76e0
+Revises: ceb61c324258
+Create Date: 2026-10-17 09:12:41.220318
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '80231e6f76e0'
+down_revision: Union[str, None] = 'ceb61c324258'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# HNSW build parameters. Higher values give better recall at the cost of build time and memory.
+# m: links per node (pgvector default 16). ef_construction: candidate list while building (default 64).
+HNSW_M: int = int(os.environ.get("MEMORY_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION: int = int(os.environ.get("MEMORY_HNSW_EF_CONSTRUCTION", "64"))
+# The build is much faster when the graph fits into maintenance_work_mem.
+HNSW_MAINTENANCE_WORK_MEM: str = os.environ.get("MEMORY_HNSW_MAINTENANCE_WORK_MEM", "1GB")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the memory table writable during the build, it can't run in a transaction.
+    with op.get_context().autocommit_block():
+        op.execute("SET statement_timeout = 0;")
+        op.execute(f"SET maintenance_work_mem = '{HNSW_MAINTENANCE_WORK_MEM}';")
+        op.execute(f'''
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memory_embedding_hnsw
+        ON memory USING hnsw (embedding vector_cosine_ops)
+        WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION});
+        ''')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_memory_embedding_hnsw;')
@@ -0,0 +1,31 @@
+"""Add memory.summary
+
+Revision ID: 9e5a2c7d4b18
+Revises: d83b6f2e9a14
+Create Date: 2026-10-17 21:48:37.402915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5a2c7d4b18'
+down_revision: Union[str, None] = 'd83b6f2e9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The LLM-distilled text a session memory's embeddings are computed from, so an embedding
+    # migration re-embeds the same text. Null where content is the embedded text. Nullable
+    # without a default, a catalog change on every partition without a table rewrite.
+    op.execute('ALTER TABLE memory ADD COLUMN IF NOT EXISTS summary TEXT;')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER TABLE memory DROP COLUMN IF EXISTS summary;')
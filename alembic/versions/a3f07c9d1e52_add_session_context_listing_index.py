@@ -0,0 +1,38 @@
+"""Add keyset index for listing a user's sessions
+
+Revision ID: a3f07c9d1e52
+Revises: 5b9d2e41c7a3
+Create Date: 2026-10-17 11:27:05.914662
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f07c9d1e52'
+down_revision: Union[str, None] = '5b9d2e41c7a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves list_sessions: WHERE user_id = ? AND (created_at, session_id) < (?, ?)
+    # ORDER BY created_at DESC, session_id DESC LIMIT n, a single index range scan per page.
+    # Its user_id prefix also covers every lookup of the old single-column index.
+    with op.get_context().autocommit_block():
+        op.execute('''
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_session_context_user_created
+        ON session_context (user_id, created_at DESC, session_id DESC);
+        ''')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_session_context_user_id;')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_session_context_user_id ON session_context (user_id);')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_session_context_user_created;')
@@ -0,0 +1,58 @@
+"""Add memory_archive and the consolidation checkpoint
+
+Revision ID: b71e3c9a4f28
+Revises: f2b7d5a9c046
+Create Date: 2026-10-17 17:12:44.207391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e3c9a4f28'
+down_revision: Union[str, None] = 'f2b7d5a9c046'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Memories replaced by a consolidated memory. They move out of the memory table so searches
+    # and its indexes only cover live memories, and are kept for audit or to undo a consolidation.
+    # No embedding index, the archive is only read by user or by consolidated memory.
+    op.execute('''
+    CREATE TABLE memory_archive (
+        memory_id UUID NOT NULL PRIMARY KEY,
+        session_id UUID,
+        user_id TEXT NOT NULL,
+        agent_id UUID,
+        memory_type TEXT,
+        content TEXT NOT NULL,
+        embedding_model TEXT NOT NULL,
+        embedding vector(1024),
+        created_at TIMESTAMPTZ,
+        updated_at TIMESTAMPTZ,
+        consolidated_into UUID NOT NULL,
+        archived_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    ''')
+    op.execute('CREATE INDEX idx_memory_archive_user_id ON memory_archive (user_id);')
+    op.execute('CREATE INDEX idx_memory_archive_consolidated_into ON memory_archive (consolidated_into);')
+
+    # Last user fully consolidated by a worker, a restarted worker resumes after it.
+    op.execute('''
+    CREATE TABLE memory_consolidation_checkpoint (
+        worker TEXT NOT NULL PRIMARY KEY,
+        last_user_id TEXT NOT NULL,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    ''')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TABLE IF EXISTS memory_consolidation_checkpoint;')
+    op.execute('DROP TABLE IF EXISTS memory_archive;')
@@ -0,0 +1,42 @@
+"""Add full text search vector and GIN index on memory.content
+
+Revision ID: d61e8b04f7c9
+Revises: a3f07c9d1e52
+Create Date: 2026-10-17 12:48:33.107254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd61e8b04f7c9'
+down_revision: Union[str, None] = 'a3f07c9d1e52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Stored generated column, kept in sync with content by Postgres. Adding it rewrites the
+    # memory table under an exclusive lock, run this in a maintenance window on large tables.
+    # The configuration has to match TEXT_SEARCH_CONFIG of the memory client.
+    op.execute("SET statement_timeout = 0;")
+    op.execute('''
+    ALTER TABLE memory
+    ADD COLUMN IF NOT EXISTS content_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', content)) STORED;
+    ''')
+
+    with op.get_context().autocommit_block():
+        op.execute("SET statement_timeout = 0;")
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memory_content_tsv ON memory USING gin (content_tsv);')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_memory_content_tsv;')
+    op.execute('ALTER TABLE memory DROP COLUMN IF EXISTS content_tsv;')
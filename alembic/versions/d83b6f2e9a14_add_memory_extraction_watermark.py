@@ -0,0 +1,38 @@
+"""Add memory_extraction_watermark
+
+Revision ID: d83b6f2e9a14
+Revises: c4e8a1f5d237
+Create Date: 2026-10-17 19:26:05.871342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd83b6f2e9a14'
+down_revision: Union[str, None] = 'c4e8a1f5d237'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Newest message of each session distilled into a memory, in epoch milliseconds. Sessions
+    # without a row are extracted in full the next time, so existing sessions need no backfill.
+    # No foreign key, memories are created for sessions that aren't stored in session_context.
+    op.execute('''
+    CREATE TABLE memory_extraction_watermark (
+        session_id UUID NOT NULL PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        last_message_ms BIGINT NOT NULL,
+        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+    );
+    ''')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TABLE IF EXISTS memory_extraction_watermark;')
@@ -0,0 +1,128 @@
+"""Hash partition the memory table by user_id
+
+Revision ID: e4a9c2d7b813
+Revises: d61e8b04f7c9
+Create Date: 2026-10-17 14:02:51.648930
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c2d7b813'
+down_revision: Union[str, None] = 'd61e8b04f7c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Number of hash partitions. Can't be changed later without another copy of the table, so
+# size it for the expected corpus: a few million memories per partition at most.
+MEMORY_PARTITIONS: int = int(os.environ.get("MEMORY_PARTITIONS", "16"))
+HNSW_M: int = int(os.environ.get("MEMORY_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION: int = int(os.environ.get("MEMORY_HNSW_EF_CONSTRUCTION", "64"))
+HNSW_MAINTENANCE_WORK_MEM: str = os.environ.get("MEMORY_HNSW_MAINTENANCE_WORK_MEM", "1GB")
+
+# Indexes of the unpartitioned table. They are renamed with the table so the partitioned
+# table can take over their names.
+UNPARTITIONED_INDEXES = (
+    'memory_pkey',
+    'idx_memory_user_id',
+    'idx_memory_agent_id',
+    'idx_memory_session_id',
+    'idx_memory_type',
+    'idx_memory_embedding_hnsw',
+    'idx_memory_content_tsv',
+)
+
+# Indexes of the partitioned table, created under temporary names and renamed at the end.
+PARTITIONED_INDEXES = {
+    'idx_memory_agent_id': '(agent_id)',
+    'idx_memory_session_id': '(session_id)',
+    'idx_memory_type': '(memory_type)',
+    'idx_memory_content_tsv': 'USING gin (content_tsv)',
+    'idx_memory_embedding_hnsw': (
+        f'USING hnsw (embedding vector_cosine_ops) WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION})'
+    ),
+}
+
+COLUMNS = 'memory_id, session_id, user_id, agent_id, memory_type, content, embedding_model, embedding, created_at, updated_at'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Block writes, not reads, while the memories are copied. The old table stays around as
+    # memory_unpartitioned for the downgrade and is dropped by hand once the new one is verified.
+    op.execute("SET LOCAL statement_timeout = 0;")
+    op.execute(f"SET LOCAL maintenance_work_mem = '{HNSW_MAINTENANCE_WORK_MEM}';")
+    op.execute('LOCK TABLE memory IN SHARE MODE;')
+
+    # The partition key has to be part of the primary key and can't be NULL. Every memory
+    # written through the API has a user_id, older agent-only memories get an empty one.
+    op.execute(f'''
+    CREATE TABLE memory_partitioned (
+        memory_id UUID NOT NULL DEFAULT uuid_generate_v4(),
+        session_id UUID,
+        user_id TEXT NOT NULL,
+        agent_id UUID,
+        memory_type TEXT,
+        content TEXT NOT NULL,
+        embedding_model TEXT NOT NULL,
+        embedding vector(1024),
+        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        content_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', content)) STORED,
+        PRIMARY KEY (user_id, memory_id)
+    ) PARTITION BY HASH (user_id);
+    ''')
+    for remainder in range(MEMORY_PARTITIONS):
+        op.execute(f'''
+        CREATE TABLE memory_p{remainder} PARTITION OF memory_partitioned
+        FOR VALUES WITH (MODULUS {MEMORY_PARTITIONS}, REMAINDER {remainder});
+        ''')
+
+    op.execute(f'''
+    INSERT INTO memory_partitioned ({COLUMNS})
+    SELECT memory_id, session_id, COALESCE(user_id, ''), agent_id, memory_type, content,
+           embedding_model, embedding, created_at, updated_at
+    FROM memory;
+    ''')
+
+    # Indexes on the parent are created on every partition, after the copy so each one is built
+    # in a single pass. Each partition gets its own, smaller HNSW graph. The primary key covers
+    # lookups by user_id. Built under the SHARE lock, before the renames, so reads continue.
+    for index, definition in PARTITIONED_INDEXES.items():
+        op.execute(f'CREATE INDEX {index}_partitioned ON memory_partitioned {definition};')
+    op.execute('ANALYZE memory_partitioned;')
+
+    # The renames take an ACCESS EXCLUSIVE lock, held only until the migration commits.
+    for index in UNPARTITIONED_INDEXES:
+        op.execute(f'ALTER INDEX IF EXISTS {index} RENAME TO {index}_unpartitioned;')
+    op.execute('ALTER TABLE memory RENAME TO memory_unpartitioned;')
+    op.execute('ALTER TABLE memory_partitioned RENAME TO memory;')
+    op.execute('ALTER INDEX memory_partitioned_pkey RENAME TO memory_pkey;')
+    for index in PARTITIONED_INDEXES:
+        op.execute(f'ALTER INDEX {index}_partitioned RENAME TO {index};')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("SET LOCAL statement_timeout = 0;")
+    op.execute('LOCK TABLE memory IN SHARE MODE;')
+
+    # Memories were written, updated and deleted since the upgrade, the partitioned table is
+    # the only current copy. Replace the unpartitioned one with it in full.
+    op.execute('TRUNCATE memory_unpartitioned;')
+    op.execute(f'''
+    INSERT INTO memory_unpartitioned ({COLUMNS})
+    SELECT memory_id, session_id, NULLIF(user_id, ''), agent_id, memory_type, content,
+           embedding_model, embedding, created_at, updated_at
+    FROM memory;
+    ''')
+
+    op.execute('DROP TABLE memory;')
+    op.execute('ALTER TABLE memory_unpartitioned RENAME TO memory;')
+    for index in UNPARTITIONED_INDEXES:
+        op.execute(f'ALTER INDEX IF EXISTS {index}_unpartitioned RENAME TO {index};')
@@ -0,0 +1,89 @@
+"""Add quantized HNSW index on memory.embedding
+
+Revision ID: f2b7d5a9c046
+Revises: e4a9c2d7b813
+Create Date: 2026-10-17 15:36:12.480115
+
+"""
+import os
+from typing import List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7d5a9c046'
+down_revision: Union[str, None] = 'e4a9c2d7b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match MEMORY_EMBEDDING_QUANTIZATION of the memory gateway, with the same default: none
+# builds no index, which no query would use. halfvec halves the index, binary shrinks it 32x
+# at a larger recall loss, which the re-rank on the full vector recovers. Turning quantization
+# on later is the embedding_migration index step, not this migration.
+QUANTIZATION: str = os.environ.get("MEMORY_EMBEDDING_QUANTIZATION", "none").lower()
+# The float32 index is only needed while MEMORY_EMBEDDING_QUANTIZATION=none. Drop it to free its memory.
+DROP_FULL_PRECISION_INDEX: bool = os.environ.get("MEMORY_DROP_FULL_PRECISION_INDEX", "false").lower() == "true"
+EMBEDDING_DIMENSIONS: int = int(os.environ.get("MEMORY_EMBEDDING_DIMENSIONS", "1024"))
+HNSW_M: int = int(os.environ.get("MEMORY_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION: int = int(os.environ.get("MEMORY_HNSW_EF_CONSTRUCTION", "64"))
+HNSW_MAINTENANCE_WORK_MEM: str = os.environ.get("MEMORY_HNSW_MAINTENANCE_WORK_MEM", "1GB")
+
+# Expression and operator class per quantization. The expressions must match the memory client's queries.
+INDEX_DEFINITIONS = {
+    'halfvec': f"(embedding::halfvec({EMBEDDING_DIMENSIONS})) halfvec_cosine_ops",
+    'binary': f"(binary_quantize(embedding)::bit({EMBEDDING_DIMENSIONS})) bit_hamming_ops",
+}
+
+
+def _partitions() -> List[str]:
+    """Partitions of the memory table"""
+    result = op.get_bind().execute(sa.text(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'memory'::regclass ORDER BY 1"
+    ))
+    return list(result.scalars())
+
+
+def _create_partitioned_index(name: str, definition: str) -> None:
+    """
+    CONCURRENTLY isn't supported on a partitioned table. Create the parent index on the parent
+    only, build each partition's index concurrently and attach it, the parent index becomes
+    valid once every partition is attached. Writes continue throughout.
+    """
+    op.execute(f'''
+    CREATE INDEX IF NOT EXISTS {name} ON ONLY memory USING hnsw ({definition})
+    WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION});
+    ''')
+    for partition in _partitions():
+        op.execute(f'''
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_{name}
+        ON {partition} USING hnsw ({definition})
+        WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION});
+        ''')
+        op.execute(f'ALTER INDEX {name} ATTACH PARTITION {partition}_{name};')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if QUANTIZATION not in INDEX_DEFINITIONS:
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("SET statement_timeout = 0;")
+        op.execute(f"SET maintenance_work_mem = '{HNSW_MAINTENANCE_WORK_MEM}';")
+        _create_partitioned_index(f'idx_memory_embedding_{QUANTIZATION}', INDEX_DEFINITIONS[QUANTIZATION])
+
+        if DROP_FULL_PRECISION_INDEX:
+            op.execute('DROP INDEX IF EXISTS idx_memory_embedding_hnsw;')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("SET statement_timeout = 0;")
+        op.execute(f"SET maintenance_work_mem = '{HNSW_MAINTENANCE_WORK_MEM}';")
+        if DROP_FULL_PRECISION_INDEX:
+            _create_partitioned_index('idx_memory_embedding_hnsw', 'embedding vector_cosine_ops')
+        for quantization in INDEX_DEFINITIONS:
+            op.execute(f'DROP INDEX IF EXISTS idx_memory_embedding_{quantization};')
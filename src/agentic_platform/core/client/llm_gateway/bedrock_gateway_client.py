@@ -96,6 +96,8 @@ class BedrockGatewayClient:
         request_body = {
             "inputText": request.text
         }
+        if request.dimensions:
+            request_body["dimensions"] = request.dimensions
         
         # Convert to JSON string for the InvokeModel API
         body = json.dumps(request_body)
@@ -6,7 +6,7 @@ from typing import Dict, Any, Optional, List, Generator, AsyncGenerator
 from pydantic import BaseModel
 
 from agentic_platform.core.models.llm_models import LLMResponse, LLMRequest, Usage
-from agentic_platform.core.models.embedding_models import EmbedRequest, EmbedResponse
+from agentic_platform.core.models.embedding_models import EmbedRequest, EmbedResponse, EmbedBatchRequest, EmbedBatchResponse
 from agentic_platform.core.models.memory_models import Message, ToolCall, TextContent
 from agentic_platform.core.context.request_context import get_auth_token
 from agentic_platform.core.converter.litellm_converters import LiteLLMRequestConverter, LiteLLMResponseConverter
@@ -152,6 +152,8 @@ class LiteLLMGatewayClient:
             "model": request.model_id,
             "input": request.text
         }
+        if request.dimensions:
+            payload["dimensions"] = request.dimensions
         
         # Make the API request
         response = requests.post(
@@ -175,6 +177,33 @@ class LiteLLMGatewayClient:
         
         # Return the embedding response
         return EmbedResponse(embedding=embedding)
+
+    def embed_batch_invoke(self, request: EmbedBatchRequest) -> EmbedBatchResponse:
+        """
+        Embed several texts with one request to the LiteLLM API.
+        """
+        payload = {
+            "model": request.model_id,
+            "input": request.texts
+        }
+        if request.dimensions:
+            payload["dimensions"] = request.dimensions
+
+        response = requests.post(
+            f"{self.api_endpoint}/v1/embeddings",
+            headers=self._get_headers(),
+            json=payload
+        )
+
+        if response.status_code != 200:
+            error_message = f"LiteLLM API error: {response.status_code} - {response.text}"
+            raise Exception(error_message)
+
+        # The embeddings are matched back to the texts by index, not by position in the response.
+        data = sorted(response.json().get("data", []), key=lambda item: item["index"])
+        if len(data) != len(request.texts):
+            raise Exception(f"LiteLLM returned {len(data)} embeddings for {len(request.texts)} texts")
+        return EmbedBatchResponse(embeddings=[item["embedding"] for item in data])
     
     def get_client(self) -> LiteLLMClientInfo:
         """
@@ -1,6 +1,6 @@
 
 from agentic_platform.core.models.llm_models import LLMRequest, LLMResponse
-from agentic_platform.core.models.embedding_models import EmbedRequest, EmbedResponse
+from agentic_platform.core.models.embedding_models import EmbedRequest, EmbedResponse, EmbedBatchRequest, EmbedBatchResponse
 from agentic_platform.core.client.llm_gateway.bedrock_gateway_client import BedrockGatewayClient
 from agentic_platform.core.client.llm_gateway.litellm_gateway_client import LiteLLMGatewayClient, LiteLLMClientInfo
 # from openai import AsyncOpenAI
@@ -23,6 +23,10 @@ class LLMGatewayClient:
     def embed_invoke(request: EmbedRequest) -> EmbedResponse:
         return litellm_client.embed_invoke(request=request)
 
+    @staticmethod
+    def embed_batch_invoke(request: EmbedBatchRequest) -> EmbedBatchResponse:
+        return litellm_client.embed_batch_invoke(request=request)
+
     @staticmethod
     def get_client_info() -> LiteLLMClientInfo:
         return litellm_client.get_client()
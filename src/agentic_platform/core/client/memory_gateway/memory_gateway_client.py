@@ -3,12 +3,20 @@ import requests
 from agentic_platform.core.models.memory_models import (
     GetSessionContextRequest,
     GetSessionContextResponse,
+    ListSessionsRequest,
+    ListSessionsResponse,
     UpsertSessionContextRequest,
     UpsertSessionContextResponse,
+    AppendSessionMessagesRequest,
+    AppendSessionMessagesResponse,
     GetMemoriesRequest,
     GetMemoriesResponse,
+    GetMemoriesBatchRequest,
+    GetMemoriesBatchResponse,
     CreateMemoryRequest,
-    CreateMemoryResponse
+    CreateMemoryJobResponse,
+    GetMemoryJobRequest,
+    GetMemoryJobResponse
 )
 from agentic_platform.core.context.request_context import get_auth_token
 MEMORY_GATEWAY_URL = os.getenv("MEMORY_GATEWAY_ENDPOINT")
@@ -40,6 +48,18 @@ class MemoryGatewayClient:
         response.raise_for_status()
         return GetSessionContextResponse(**response.json())
     
+    @classmethod
+    def list_sessions(cls, request: ListSessionsRequest) -> ListSessionsResponse:
+        headers = cls._get_auth_headers()
+        response = requests.post(
+            f"{MEMORY_GATEWAY_URL}/list-sessions", 
+            json=request.model_dump(),
+            timeout=DEFAULT_TIMEOUT,
+            headers=headers
+        )
+        response.raise_for_status()
+        return ListSessionsResponse(**response.json())
+    
     @classmethod
     def upsert_session_context(cls, request: UpsertSessionContextRequest) -> UpsertSessionContextResponse:
         headers = cls._get_auth_headers()
@@ -51,6 +71,18 @@ class MemoryGatewayClient:
         )
         response.raise_for_status()
         return UpsertSessionContextResponse(**response.json())
+
+    @classmethod
+    def append_session_messages(cls, request: AppendSessionMessagesRequest) -> AppendSessionMessagesResponse:
+        headers = cls._get_auth_headers()
+        response = requests.post(
+            f"{MEMORY_GATEWAY_URL}/append-session-messages", 
+            json=request.model_dump(),
+            timeout=DEFAULT_TIMEOUT,
+            headers=headers
+        )
+        response.raise_for_status()
+        return AppendSessionMessagesResponse(**response.json())
     
     @classmethod
     def get_memories(cls, request: GetMemoriesRequest) -> GetMemoriesResponse:
@@ -63,9 +95,23 @@ class MemoryGatewayClient:
         )
         response.raise_for_status()
         return GetMemoriesResponse(**response.json())
+
+    @classmethod
+    def get_memories_batch(cls, request: GetMemoriesBatchRequest) -> GetMemoriesBatchResponse:
+        """Searches memories for several query embeddings in one request."""
+        headers = cls._get_auth_headers()
+        response = requests.post(
+            f"{MEMORY_GATEWAY_URL}/get-memories-batch", 
+            json=request.model_dump(),
+            timeout=DEFAULT_TIMEOUT,
+            headers=headers
+        )
+        response.raise_for_status()
+        return GetMemoriesBatchResponse(**response.json())
     
     @classmethod
-    def create_memory(cls, request: CreateMemoryRequest) -> CreateMemoryResponse:
+    def create_memory(cls, request: CreateMemoryRequest) -> CreateMemoryJobResponse:
+        """Queues the memory creation. The memory is in the job's result once it completed."""
         headers = cls._get_auth_headers()
         response = requests.post(
             f"{MEMORY_GATEWAY_URL}/create-memory", 
@@ -74,4 +120,16 @@ class MemoryGatewayClient:
             headers=headers
         )
         response.raise_for_status()
-        return CreateMemoryResponse(**response.json())
\ No newline at end of file
+        return CreateMemoryJobResponse(**response.json())
+
+    @classmethod
+    def get_memory_job(cls, request: GetMemoryJobRequest) -> GetMemoryJobResponse:
+        headers = cls._get_auth_headers()
+        response = requests.post(
+            f"{MEMORY_GATEWAY_URL}/get-memory-job", 
+            json=request.model_dump(),
+            timeout=DEFAULT_TIMEOUT,
+            headers=headers
+        )
+        response.raise_for_status()
+        return GetMemoryJobResponse(**response.json())
\ No newline at end of file
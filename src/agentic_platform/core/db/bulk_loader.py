@@ -0,0 +1,212 @@
+import re
+import time
+import uuid
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from psycopg import sql
+from pgvector.psycopg import register_vector
+from sqlalchemy import Engine, Table
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import UUID
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+@dataclass
+class BulkLoadProgress:
+    """Progress of a bulk load, reported after every committed batch"""
+    table: str
+    rows_loaded: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_loaded / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+def _batches(rows: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Split a stream of rows into lists of at most batch_size rows"""
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+class BulkLoader:
+    """
+    Streams rows into a Postgres table with binary COPY, committing every batch_size rows.
+
+    Rows are dicts keyed by column key, which is the column name unless the Table sets another
+    key. The columns of the first row are loaded. Columns with a Python-side default
+    (e.g. memory_id) are filled in when a row leaves them out. pgvector
+    embeddings can be lists or numpy arrays, JSONB values any JSON-serializable object.
+
+    COPY straight into the table fails the batch on a duplicate key. With use_staging each
+    batch is copied into an unlogged staging table first and merged with
+    INSERT ... ON CONFLICT, which makes re-running an interrupted backfill safe.
+
+    COPY requires psycopg3, use PostgresDB.create_bulk_engine() for the engine.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        batch_size: int = 10000,
+        use_staging: bool = False,
+        update_existing: bool = True,
+        on_progress: Optional[Callable[[BulkLoadProgress], None]] = None
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.engine = engine
+        self.batch_size = batch_size
+        self.use_staging = use_staging
+        self.update_existing = update_existing
+        self.on_progress = on_progress
+
+    def load(self, table: Table, rows: Iterable[Dict[str, Any]]) -> BulkLoadProgress:
+        """Load all rows into the table and return the final progress"""
+        progress = BulkLoadProgress(table=table.name)
+        batches = _batches(rows, self.batch_size)
+        first = next(batches, None)
+        if first is None:
+            return progress
+
+        columns = self._copy_columns(table, first[0])
+        started = time.perf_counter()
+
+        raw = self.engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            self._register_types(conn, table, columns)
+            target = self._create_staging_table(conn, table) if self.use_staging else table.name
+
+            try:
+                for batch in chain([first], batches):
+                    self._copy_batch(conn, target, table, columns, batch)
+                    if self.use_staging:
+                        self._merge(conn, target, table, columns)
+                    conn.commit()
+
+                    progress.rows_loaded += len(batch)
+                    progress.batches += 1
+                    progress.elapsed_seconds = time.perf_counter() - started
+                    self._report(progress)
+            finally:
+                if self.use_staging:
+                    self._drop_staging_table(conn, target)
+        finally:
+            raw.close()
+
+        return progress
+
+    def _copy_columns(self, table: Table, sample: Dict[str, Any]) -> List[str]:
+        """Keys of the columns of the sample row plus columns with a Python-side default, in table order"""
+        columns = [
+            column.key for column in table.columns
+            if column.key in sample or (column.default is not None and not column.default.is_sequence)
+        ]
+        if not columns:
+            raise ValueError(f"Rows have no columns of table {table.name}")
+        return columns
+
+    def _register_types(self, conn, table: Table, columns: List[str]) -> None:
+        """Register the pgvector adapters if an embedding column is loaded"""
+        if any(self._type_name(table.c[key]) == "vector" for key in columns):
+            register_vector(conn)
+
+    @staticmethod
+    def _type_name(column) -> str:
+        """Postgres type name of a column without modifiers, e.g. VECTOR(1024) -> vector"""
+        compiled = column.type.compile(dialect=postgresql.dialect())
+        return re.sub(r"\(.*\)", "", compiled).strip().lower()
+
+    def _copy_batch(self, conn, target: str, table: Table, columns: List[str], batch: List[Dict[str, Any]]) -> None:
+        """COPY one batch in binary format"""
+        table_columns = [table.c[key] for key in columns]
+        statement = sql.SQL("COPY {} ({}) FROM STDIN (FORMAT BINARY)").format(
+            sql.Identifier(target),
+            sql.SQL(", ").join(sql.Identifier(column.name) for column in table_columns)
+        )
+
+        with conn.cursor() as cursor:
+            with cursor.copy(statement) as copy:
+                copy.set_types([self._type_name(column) for column in table_columns])
+                for row in batch:
+                    copy.write_row([self._value(column, row) for column in table_columns])
+
+    @staticmethod
+    def _value(column, row: Dict[str, Any]) -> Any:
+        """The value to copy for a column, applying Python-side defaults and UUID strings"""
+        if column.key not in row and column.default is not None:
+            default = column.default
+            return default.arg(None) if default.is_callable else default.arg
+
+        value = row.get(column.key)
+        # The binary UUID dumper needs UUID objects, rows often carry strings.
+        if isinstance(value, str) and isinstance(column.type, UUID):
+            return uuid.UUID(value)
+        # The binary timestamptz dumper rejects naive datetimes, models use local naive time.
+        if isinstance(value, datetime) and value.tzinfo is None and getattr(column.type, "timezone", False):
+            return value.astimezone()
+        return value
+
+    ##########################################################################
+    # Staging table and merge
+    ##########################################################################
+
+    def _create_staging_table(self, conn, table: Table) -> str:
+        """Create an unlogged copy of the table. Unlogged tables skip WAL, COPY into them is cheap."""
+        name = f"{table.name}_bulk_stage_{uuid.uuid4().hex[:8]}"
+        conn.execute(sql.SQL("CREATE UNLOGGED TABLE {} (LIKE {} INCLUDING DEFAULTS)").format(
+            sql.Identifier(name), sql.Identifier(table.name)
+        ))
+        conn.commit()
+        return name
+
+    def _merge(self, conn, stage: str, table: Table, columns: List[str]) -> None:
+        """Move the staged batch into the table, updating or skipping rows that already exist"""
+        names = [table.c[key].name for key in columns]
+        column_list = sql.SQL(", ").join(map(sql.Identifier, names))
+        primary_key = [column.name for column in table.primary_key.columns]
+        updates = [name for name in names if name not in primary_key]
+
+        if self.update_existing and updates:
+            on_conflict = sql.SQL("DO UPDATE SET {}").format(sql.SQL(", ").join(
+                sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(name), sql.Identifier(name))
+                for name in updates
+            ))
+        else:
+            on_conflict = sql.SQL("DO NOTHING")
+
+        conn.execute(sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {} ON CONFLICT ({}) {}").format(
+            sql.Identifier(table.name),
+            column_list,
+            column_list,
+            sql.Identifier(stage),
+            sql.SQL(", ").join(map(sql.Identifier, primary_key)),
+            on_conflict
+        ))
+        conn.execute(sql.SQL("TRUNCATE {}").format(sql.Identifier(stage)))
+
+    def _drop_staging_table(self, conn, stage: str) -> None:
+        try:
+            conn.rollback()
+            conn.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(stage)))
+            conn.commit()
+        except Exception as e:
+            logger.warning("Failed to drop staging table %s: %s", stage, e)
+
+    def _report(self, progress: BulkLoadProgress) -> None:
+        logger.info(
+            "Loaded %d rows into %s in %d batches (%.0f rows/s)",
+            progress.rows_loaded, progress.table, progress.batches, progress.rows_per_second
+        )
+        if self.on_progress:
+            self.on_progress(progress)
@@ -0,0 +1,126 @@
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+# RDS IAM auth tokens are valid for 15 minutes.
+IAM_TOKEN_LIFETIME_SECONDS: int = 900
+
+@dataclass
+class _CachedToken:
+    """An IAM token and the time it was generated"""
+    token: str
+    generated_at: float
+
+class IAMTokenCache:
+    """
+    Caches Aurora IAM auth tokens per (user, host).
+
+    Tokens are refreshed by a background thread once they are older than refresh_seconds,
+    well before the 15 minute expiry, so the connect path only reads from the cache.
+    Callers that miss the cache for the same key share a single token generation.
+    """
+
+    def __init__(
+        self,
+        rds_client,
+        port: int = 5432,
+        refresh_seconds: int = 600,
+        max_age_seconds: int = IAM_TOKEN_LIFETIME_SECONDS - 60,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if refresh_seconds >= max_age_seconds:
+            raise ValueError("refresh_seconds must be smaller than max_age_seconds")
+
+        self.rds_client = rds_client
+        self.port = port
+        self.refresh_seconds = refresh_seconds
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+
+        self._tokens: Dict[Tuple[str, str], _CachedToken] = {}
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    def get_token(self, username: str, hostname: str) -> str:
+        """Get a valid token for the user and host, generating one only if the cache has none"""
+        key = (username, hostname)
+        cached = self._tokens.get(key)
+        if cached and not self._is_expired(cached):
+            return cached.token
+
+        # Single flight: concurrent connects for the same key wait on one generation.
+        with self._get_key_lock(key):
+            cached = self._tokens.get(key)
+            if cached and not self._is_expired(cached):
+                return cached.token
+
+            cached = self._generate(key)
+            self._ensure_refresher()
+            return cached.token
+
+    def refresh_due(self) -> None:
+        """Regenerate every cached token that is older than refresh_seconds"""
+        for key, cached in list(self._tokens.items()):
+            if self._clock() - cached.generated_at < self.refresh_seconds:
+                continue
+
+            with self._get_key_lock(key):
+                try:
+                    self._generate(key)
+                except Exception as e:
+                    # Keep serving the current token, it is still valid until max_age_seconds.
+                    logger.warning(f"Background IAM token refresh failed for {key[0]}@{key[1]}: {e}")
+
+    def stop(self) -> None:
+        """Stop the background refresher"""
+        self._stop_event.set()
+        if self._refresher:
+            self._refresher.join(timeout=5)
+            self._refresher = None
+
+    def _generate(self, key: Tuple[str, str]) -> _CachedToken:
+        """Generate a token with the RDS client and store it"""
+        username, hostname = key
+        token = self.rds_client.generate_db_auth_token(
+            DBHostname=hostname,
+            Port=self.port,
+            DBUsername=username
+        )
+        cached = _CachedToken(token=token, generated_at=self._clock())
+        self._tokens[key] = cached
+        return cached
+
+    def _is_expired(self, cached: _CachedToken) -> bool:
+        return self._clock() - cached.generated_at >= self.max_age_seconds
+
+    def _get_key_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _ensure_refresher(self) -> None:
+        """Start the background refresher the first time a token is cached"""
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._stop_event.clear()
+            self._refresher = threading.Thread(
+                target=self._run_refresher,
+                name="iam-token-refresher",
+                daemon=True
+            )
+            self._refresher.start()
+
+    def _run_refresher(self) -> None:
+        # Wake up often enough that no token outlives refresh_seconds by much.
+        interval = max(1, self.refresh_seconds // 10)
+        while not self._stop_event.wait(interval):
+            self.refresh_due()
@@ -0,0 +1,118 @@
+import time
+import inspect
+import functools
+import logging
+from typing import Callable, Optional, TypeVar
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.exc import DBAPIError, DisconnectionError
+
+from agentic_platform.core.observability.observability_facade import get_facade
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+FAILOVER_METRIC: str = "db.pool.failovers"
+
+# Key in the connection record info dict holding the time the connection was last returned.
+_LAST_USED_KEY: str = "liveness_last_used"
+
+# SQLSTATEs seen while Aurora fails over. The old writer is demoted and rejects writes,
+# or the instance is shut down / restarting. Every pooled connection points at it.
+FAILOVER_SQLSTATES = frozenset({
+    "25006",  # read_only_sql_transaction
+    "57P01",  # admin_shutdown
+    "57P02",  # crash_shutdown
+    "57P03",  # cannot_connect_now
+})
+
+F = TypeVar("F", bound=Callable)
+
+def _sqlstate(error: Optional[BaseException]) -> Optional[str]:
+    """SQLSTATE of a psycopg2 (pgcode) or psycopg3 (sqlstate) error"""
+    return getattr(error, "sqlstate", None) or getattr(error, "pgcode", None)
+
+class IdleAwareLiveness:
+    """
+    Liveness checks that replace pool_pre_ping.
+
+    Only connections that sat in the pool longer than idle_threshold_seconds are pinged on
+    checkout; recently used connections go straight to the caller. A connection that died
+    anyway fails its statement, is invalidated on its own and the caller retries once
+    (see retry_on_disconnect). Errors that indicate an Aurora failover invalidate the
+    whole pool instead, since every connection points at the old writer.
+    """
+
+    def __init__(self, idle_threshold_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.idle_threshold_seconds = idle_threshold_seconds
+        self._clock = clock
+        self._engine: Optional[Engine] = None
+
+    def attach(self, engine: Engine) -> None:
+        """Register the listeners. For an AsyncEngine pass engine.sync_engine."""
+        self._engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkin", self._on_checkin)
+        # Inserted first so dead connections are replaced before other checkout listeners use them.
+        event.listen(engine, "checkout", self._on_checkout, insert=True)
+        event.listen(engine, "handle_error", self._on_handle_error)
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        connection_record.info[_LAST_USED_KEY] = self._clock()
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        connection_record.info[_LAST_USED_KEY] = self._clock()
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        last_used = connection_record.info.get(_LAST_USED_KEY)
+        if last_used is not None and self._clock() - last_used <= self.idle_threshold_seconds:
+            return
+
+        try:
+            self._engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            # The pool invalidates the connection and checks out another one.
+            logger.info("Idle pooled connection failed its liveness check: %s", e)
+            raise DisconnectionError() from e
+
+    def _on_handle_error(self, context: ExceptionContext) -> None:
+        if _sqlstate(context.original_exception) in FAILOVER_SQLSTATES:
+            logger.warning("Database failover detected, invalidating the connection pool")
+            context.is_disconnect = True
+            context.invalidate_pool_on_disconnect = True
+            facade = get_facade()
+            if facade:
+                facade.increment_counter(FAILOVER_METRIC)
+        elif context.is_disconnect:
+            # A single dead connection, the idle checks catch any others.
+            context.invalidate_pool_on_disconnect = False
+
+def retry_on_disconnect(func: F) -> F:
+    """
+    Retry a database call once when its connection was invalidated.
+    Only use for idempotent calls: the first attempt may have reached the database.
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except DBAPIError as e:
+                if not e.connection_invalidated:
+                    raise
+                logger.info("Retrying %s on a new connection after a disconnect", func.__qualname__)
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except DBAPIError as e:
+            if not e.connection_invalidated:
+                raise
+            logger.info("Retrying %s on a new connection after a disconnect", func.__qualname__)
+            return func(*args, **kwargs)
+    return wrapper
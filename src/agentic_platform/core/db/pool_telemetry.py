@@ -0,0 +1,205 @@
+import math
+import time
+import threading
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from agentic_platform.core.observability.observability_facade import ObservabilityFacade, get_facade
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+# Metric names emitted through the ObservabilityFacade.
+CHECKOUT_WAIT_METRIC: str = "db.pool.checkout_wait"
+CONNECTIONS_IN_USE_METRIC: str = "db.pool.connections_in_use"
+OVERFLOW_METRIC: str = "db.pool.overflow"
+INVALIDATIONS_METRIC: str = "db.pool.invalidations"
+CONNECT_LATENCY_METRIC: str = "db.pool.connect_latency"
+
+# Keys stored in the connection record info dict between events.
+_CHECKOUT_WAIT_KEY: str = "telemetry_checkout_wait"
+_CONNECT_STARTED_KEY: str = "telemetry_connect_started"
+
+##############################################################################
+# SQLAlchemy has no event before a checkout starts waiting, so the pools
+# time _do_get() themselves and leave the result on the connection record
+# for the checkout listener to pick up.
+##############################################################################
+
+class _TimedCheckoutMixin:
+    """Records how long a checkout waited on the pool on the connection record"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        record = super()._do_get()
+        record.info[_CHECKOUT_WAIT_KEY] = time.perf_counter() - start
+        return record
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """QueuePool that measures checkout wait time"""
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that measures checkout wait time"""
+
+def _percentile(values, percentile: float) -> float:
+    """Nearest-rank percentile of a non-empty collection"""
+    ordered = sorted(values)
+    rank = max(0, math.ceil(percentile / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+@dataclass
+class PoolSizingRecommendation:
+    """Recommended pool settings for one engine, derived from observed checkouts"""
+    pool_size: int
+    max_overflow: int
+    current_pool_size: int
+    current_max_overflow: int
+    peak_in_use: int
+    p95_in_use: float
+    p99_checkout_wait_ms: float
+    saturated: bool
+    samples: int
+
+    def connections_per_pod(self) -> int:
+        """Upper bound of connections one pod can open with this engine"""
+        return self.pool_size + self.max_overflow
+
+class PoolSizingAdvisor:
+    """
+    Recommends pool_size / max_overflow from the concurrency observed at checkout.
+    pool_size covers the p95 concurrency and max_overflow covers the peak, both with headroom.
+    When checkouts had to wait with the pool at capacity, the observed peak is capped by
+    the pool itself so the recommendation grows the capacity instead.
+    """
+
+    def __init__(
+        self,
+        pool_size: int,
+        max_overflow: int,
+        max_samples: int = 10000,
+        headroom: float = 1.2,
+        saturation_wait_ms: float = 5.0
+    ):
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.headroom = headroom
+        self.saturation_wait_ms = saturation_wait_ms
+        self._in_use: Deque[int] = deque(maxlen=max_samples)
+        self._waits_ms: Deque[float] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def observe_checkout(self, in_use: int, wait_seconds: float) -> None:
+        """Record the connections in use and the wait time of one checkout"""
+        with self._lock:
+            self._in_use.append(in_use)
+            self._waits_ms.append(wait_seconds * 1000)
+
+    def recommend(self) -> Optional[PoolSizingRecommendation]:
+        """Recommend pool settings, or None if nothing has been observed yet"""
+        with self._lock:
+            if not self._in_use:
+                return None
+            in_use = list(self._in_use)
+            waits_ms = list(self._waits_ms)
+
+        peak = max(in_use)
+        p95 = _percentile(in_use, 95)
+        p99_wait = _percentile(waits_ms, 99)
+        capacity = self.pool_size + self.max_overflow
+        saturated = peak >= capacity and p99_wait >= self.saturation_wait_ms
+
+        demand_peak = capacity * 1.5 if saturated else peak
+        pool_size = max(1, math.ceil(p95 * self.headroom))
+        max_overflow = max(0, math.ceil(demand_peak * self.headroom) - pool_size)
+
+        return PoolSizingRecommendation(
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            current_pool_size=self.pool_size,
+            current_max_overflow=self.max_overflow,
+            peak_in_use=peak,
+            p95_in_use=p95,
+            p99_checkout_wait_ms=round(p99_wait, 3),
+            saturated=saturated,
+            samples=len(in_use)
+        )
+
+class PoolTelemetry:
+    """
+    Emits connection pool metrics for one engine through the ObservabilityFacade
+    and feeds a PoolSizingAdvisor. Metrics are only emitted once a facade is configured.
+    """
+
+    def __init__(self, engine_name: str, pool_size: int, max_overflow: int):
+        self.engine_name = engine_name
+        self.attributes: Dict[str, Any] = {"db.engine": engine_name}
+        self.advisor = PoolSizingAdvisor(pool_size, max_overflow)
+        self._engine: Optional[Engine] = None
+
+    def attach(self, engine: Engine) -> None:
+        """Register the pool listeners. For an AsyncEngine pass engine.sync_engine."""
+        self._engine = engine
+        # Inserted first so the IAM token generation counts towards connect latency.
+        event.listen(engine, "do_connect", self._on_do_connect, insert=True)
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        event.listen(engine, "soft_invalidate", self._on_soft_invalidate)
+
+    def _on_do_connect(self, dialect, connection_record, cargs, cparams) -> None:
+        connection_record.info[_CONNECT_STARTED_KEY] = time.perf_counter()
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        started = connection_record.info.pop(_CONNECT_STARTED_KEY, None)
+        if started is not None:
+            self._record_histogram(CONNECT_LATENCY_METRIC, (time.perf_counter() - started) * 1000)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        wait = connection_record.info.pop(_CHECKOUT_WAIT_KEY, 0.0)
+        pool = self._engine.pool
+        in_use = pool.checkedout()
+        self.advisor.observe_checkout(in_use, wait)
+
+        facade = self._get_facade()
+        if facade:
+            facade.record_histogram(CHECKOUT_WAIT_METRIC, wait * 1000, self.attributes)
+            facade.add_up_down_counter(CONNECTIONS_IN_USE_METRIC, 1, self.attributes)
+            facade.record_histogram(OVERFLOW_METRIC, max(0, pool.overflow()), self.attributes)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        facade = self._get_facade()
+        if facade:
+            facade.add_up_down_counter(CONNECTIONS_IN_USE_METRIC, -1, self.attributes)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        self._increment_invalidations(soft=False)
+
+    def _on_soft_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        self._increment_invalidations(soft=True)
+
+    def _increment_invalidations(self, soft: bool) -> None:
+        facade = self._get_facade()
+        if facade:
+            facade.increment_counter(INVALIDATIONS_METRIC, 1, {**self.attributes, "db.invalidation.soft": soft})
+
+    def _record_histogram(self, name: str, value: float) -> None:
+        facade = self._get_facade()
+        if facade:
+            facade.record_histogram(name, value, self.attributes)
+
+    def _get_facade(self) -> Optional[ObservabilityFacade]:
+        facade = get_facade()
+        if facade and CHECKOUT_WAIT_METRIC not in facade.histogram_metrics:
+            facade.create_histogram(CHECKOUT_WAIT_METRIC, "Time spent waiting for a pooled connection", unit="ms")
+            facade.create_histogram(CONNECT_LATENCY_METRIC, "Time to open a new connection, including IAM token", unit="ms")
+            facade.create_histogram(OVERFLOW_METRIC, "Overflow connections open at checkout")
+            facade.create_up_down_counter(CONNECTIONS_IN_USE_METRIC, "Connections checked out of the pool")
+            facade.create_counter(INVALIDATIONS_METRIC, "Pooled connections invalidated")
+        return facade
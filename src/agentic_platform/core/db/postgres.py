@@ -1,13 +1,26 @@
 import os
-import boto3
-from sqlalchemy import Engine, create_engine, event
+import threading
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
 import urllib.parse
 from enum import Enum, auto
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Union
 import logging
 from dotenv import load_dotenv
 
+from agentic_platform.core.db.iam_token_cache import IAMTokenCache
+from agentic_platform.core.db.read_your_writes import ReadYourWrites
+from agentic_platform.core.db.liveness import IdleAwareLiveness
+from agentic_platform.core.db.session_profiles import SessionProfileListener, WorkloadProfile
+from agentic_platform.core.db.pool_telemetry import (
+    PoolTelemetry,
+    PoolSizingRecommendation,
+    TimedQueuePool,
+    TimedAsyncAdaptedQueuePool
+)
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -57,6 +70,24 @@ class DatabaseConfig:
     max_overflow: int = 15
     pool_recycle: int = 300
     token_refresh_seconds: int = 290  # For IAM auth (tokens expire in 15 min)
+    liveness_idle_seconds: float = 30.0  # Ping pooled connections idle longer than this on checkout
+    iam_token_refresh_seconds: int = 600  # Background refresh age for cached IAM tokens
+
+    # Read-your-writes between writer and reader endpoints
+    read_your_writes: bool = True
+    read_your_writes_ttl_seconds: float = 30.0
+    read_your_writes_max_wait_ms: int = 50
+
+    # Server-side prepared statements (psycopg3 async engines). Statements are prepared
+    # after being executed prepare_threshold times on a connection, None disables them.
+    # Transaction-pooling PgBouncer hands out a different server connection per
+    # transaction, so prepared statements are always disabled behind it.
+    prepare_threshold: Optional[int] = 2
+    pgbouncer: bool = False
+
+    # Per-workload session settings (statement_timeout, work_mem, ANN search parameters)
+    session_profiles: bool = True
+    application_name: str = "agentic-platform"
 
     def __post_init__(self):
         """Validate configuration after initialization"""
@@ -85,6 +116,10 @@ class DatabaseConfig:
 
 class PostgresDB:
     """Manages PostgreSQL database connections with IAM authentication for Aurora"""
+
+    # All engines use psycopg3: native asyncio, server-side prepared statements,
+    # binary COPY and binary pgvector parameters.
+    _DRIVER = "postgresql+psycopg"
     
     # Standard PostgreSQL connection settings
     _DEFAULT_CONNECT_ARGS = {
@@ -96,11 +131,41 @@ class PostgresDB:
     }
     
     def __init__(self, config: Optional[DatabaseConfig] = None, rds_client = None):
-        """Initialize database connection engines with optional dependency injection"""
+        """
+        Initialize the database with optional dependency injection.
+        Engines, their pools and the RDS client are created lazily on first use.
+        """
         self.config = config or self._load_config()
-        self.rds_client = rds_client or boto3.client("rds")
-        self.write_engine = self._create_engine(EngineType.WRITER)
-        self.read_engine = self._create_engine(EngineType.READER)
+        self._rds_client = rds_client
+        self._token_cache: Optional[IAMTokenCache] = None
+        self._engines: Dict[Tuple[EngineType, bool], Union[Engine, AsyncEngine]] = {}
+        self.pool_telemetry: Dict[str, PoolTelemetry] = {}
+        # Local reader and writer are the same server, so there is no replica lag to track.
+        self.read_your_writes = ReadYourWrites(
+            enabled=self.config.read_your_writes and self.config.environment != EnvironmentType.LOCAL,
+            ttl_seconds=self.config.read_your_writes_ttl_seconds,
+            max_wait_seconds=self.config.read_your_writes_max_wait_ms / 1000
+        )
+        self._lock = threading.Lock()
+
+    @property
+    def rds_client(self):
+        """RDS client used for IAM tokens. Only Aurora environments ever create one."""
+        if self._rds_client is None:
+            # boto3 is slow to import, keep it off the import path of this module.
+            import boto3
+            self._rds_client = boto3.client("rds")
+        return self._rds_client
+
+    @property
+    def token_cache(self) -> IAMTokenCache:
+        """IAM token cache shared by all Aurora engines"""
+        if self._token_cache is None:
+            self._token_cache = IAMTokenCache(
+                self.rds_client,
+                refresh_seconds=self.config.iam_token_refresh_seconds
+            )
+        return self._token_cache
     
     def _load_config(self) -> DatabaseConfig:
         """Load database configuration from environment variables"""
@@ -120,7 +185,28 @@ class PostgresDB:
             pool_size=int(os.environ.get("PG_POOL_SIZE", "10")),
             max_overflow=int(os.environ.get("PG_MAX_OVERFLOW", "15")),
             pool_recycle=int(os.environ.get("PG_POOL_RECYCLE", "300")),
+            liveness_idle_seconds=float(os.environ.get("PG_LIVENESS_IDLE_SECONDS", "30")),
+            iam_token_refresh_seconds=int(os.environ.get("PG_IAM_TOKEN_REFRESH_SECONDS", "600")),
+            read_your_writes=os.environ.get("PG_READ_YOUR_WRITES", "true").lower() == "true",
+            read_your_writes_ttl_seconds=float(os.environ.get("PG_READ_YOUR_WRITES_TTL_SECONDS", "30")),
+            read_your_writes_max_wait_ms=int(os.environ.get("PG_READ_YOUR_WRITES_MAX_WAIT_MS", "50")),
+            prepare_threshold=self._parse_prepare_threshold(os.environ.get("PG_PREPARE_THRESHOLD", "2")),
+            pgbouncer=os.environ.get("PG_PGBOUNCER", "false").lower() == "true",
+            session_profiles=os.environ.get("PG_SESSION_PROFILES", "true").lower() == "true",
+            application_name=os.environ.get("PG_APPLICATION_NAME", "agentic-platform"),
         )
+
+    @staticmethod
+    def _parse_prepare_threshold(value: str) -> Optional[int]:
+        """PG_PREPARE_THRESHOLD is a number of executions, or 'none' to disable prepared statements"""
+        if value.strip().lower() in ("", "none", "off"):
+            return None
+        return int(value)
+
+    def _connect_args(self) -> Dict[str, Any]:
+        """Connect args for psycopg3, including the prepared statement switch"""
+        prepare_threshold = None if self.config.pgbouncer else self.config.prepare_threshold
+        return {**self._DEFAULT_CONNECT_ARGS, "prepare_threshold": prepare_threshold}
     
     def _create_engine(self, engine_type: EngineType) -> Engine:
         """Create SQLAlchemy engine based on environment and engine type"""
@@ -139,15 +225,16 @@ class PostgresDB:
         user = self.config.writer_user if is_writer else self.config.reader_user
         password = self.config.writer_password if is_writer else self.config.reader_password
         
-        connection_string = f"postgresql://{user}:{urllib.parse.quote(password)}@{self.config.local_host}/{self.config.database}"
+        connection_string = f"{self._DRIVER}://{user}:{urllib.parse.quote(password)}@{self.config.local_host}/{self.config.database}"
         
         return create_engine(
             connection_string,
+            poolclass=TimedQueuePool,
             pool_size=self.config.pool_size,
             max_overflow=self.config.max_overflow,
-            pool_pre_ping=True,
+            pool_pre_ping=False,
             pool_recycle=self.config.pool_recycle,
-            connect_args=self._DEFAULT_CONNECT_ARGS
+            connect_args=self._connect_args()
         )
     
     def _create_aurora_engine(self, is_writer: bool) -> Engine:
@@ -158,51 +245,218 @@ class PostgresDB:
         try:
             # Create engine with minimal connection string - parameters set by event
             engine = create_engine(
-                "postgresql:///",  # Empty connection string
+                f"{self._DRIVER}:///",  # Empty connection string
+                poolclass=TimedQueuePool,
                 pool_size=self.config.pool_size,
                 max_overflow=self.config.max_overflow,
-                pool_pre_ping=True,
+                pool_pre_ping=False,
                 pool_recycle=self.config.token_refresh_seconds,
-                connect_args=self._DEFAULT_CONNECT_ARGS
+                connect_args=self._connect_args()
             )
             
-            # Event listener to provide fresh connection parameters including token
-            @event.listens_for(engine, "do_connect")
-            def provide_token(dialect, conn_rec, cargs, cparams):
-                # Generate fresh token for each connection
-                token = self._get_iam_token(user, host)
-                
-                # Set all connection parameters
-                cparams['host'] = host
-                cparams['port'] = 5432
-                cparams['user'] = user
-                cparams['password'] = token
-                cparams['database'] = self.config.database
-                cparams['sslmode'] = 'require'
-            
+            self._register_iam_auth(engine, user, host)
             return engine
             
         except Exception as e:
             raise RuntimeError(f"Failed to create Aurora database engine: {str(e)}") from e
+
+    def _register_iam_auth(self, engine: Engine, user: str, host: str) -> None:
+        """Register a do_connect listener that provides fresh connection parameters including token"""
+
+        @event.listens_for(engine, "do_connect")
+        def provide_token(dialect, conn_rec, cargs, cparams):
+            # Cached token, refreshed in the background before it expires
+            token = self._get_iam_token(user, host)
+            
+            # Set all connection parameters
+            cparams['host'] = host
+            cparams['port'] = 5432
+            cparams['user'] = user
+            cparams['password'] = token
+            cparams['dbname'] = self.config.database
+            cparams['sslmode'] = 'require'
+
+    def _create_async_engine(self, engine_type: EngineType) -> AsyncEngine:
+        """Create an asyncio SQLAlchemy engine based on environment and engine type"""
+        is_writer = engine_type == EngineType.WRITER
+
+        if self.config.environment == EnvironmentType.LOCAL:
+            logger.info("Using local env async database connection")
+            return self._create_async_local_engine(is_writer)
+        else:
+            logger.info("Using aurora IAM async database connection")
+            return self._create_async_aurora_engine(is_writer)
+
+    def _create_async_local_engine(self, is_writer: bool) -> AsyncEngine:
+        """Create async engine for local development using password authentication"""
+        user = self.config.writer_user if is_writer else self.config.reader_user
+        password = self.config.writer_password if is_writer else self.config.reader_password
+
+        connection_string = f"{self._DRIVER}://{user}:{urllib.parse.quote(password)}@{self.config.local_host}/{self.config.database}"
+
+        return create_async_engine(
+            connection_string,
+            poolclass=TimedAsyncAdaptedQueuePool,
+            pool_size=self.config.pool_size,
+            max_overflow=self.config.max_overflow,
+            pool_pre_ping=False,
+            pool_recycle=self.config.pool_recycle,
+            connect_args=self._connect_args()
+        )
+
+    def _create_async_aurora_engine(self, is_writer: bool) -> AsyncEngine:
+        """Create async engine for Aurora using IAM authentication with do_connect event"""
+        user = self.config.writer_user if is_writer else self.config.reader_user
+        host = self.config.writer_endpoint if is_writer else self.config.reader_endpoint
+
+        try:
+            engine = create_async_engine(
+                f"{self._DRIVER}:///",  # Empty connection string
+                poolclass=TimedAsyncAdaptedQueuePool,
+                pool_size=self.config.pool_size,
+                max_overflow=self.config.max_overflow,
+                pool_pre_ping=False,
+                pool_recycle=self.config.token_refresh_seconds,
+                connect_args=self._connect_args()
+            )
+
+            # Pool events fire on the sync facade of the async engine.
+            self._register_iam_auth(engine.sync_engine, user, host)
+            return engine
+
+        except Exception as e:
+            raise RuntimeError(f"Failed to create Aurora async database engine: {str(e)}") from e
     
+    def create_bulk_engine(self) -> Engine:
+        """
+        Create an unpooled psycopg3 writer engine for BulkLoader. A bulk load holds one
+        connection for its whole run, so it doesn't take a slot in the request pools.
+        The caller owns the engine and disposes it when the load is done.
+        """
+        user = self.config.writer_user
+        if self.config.environment == EnvironmentType.LOCAL:
+            password = urllib.parse.quote(self.config.writer_password)
+            return create_engine(
+                f"{self._DRIVER}://{user}:{password}@{self.config.local_host}/{self.config.database}",
+                poolclass=NullPool,
+                connect_args=self._DEFAULT_CONNECT_ARGS
+            )
+
+        engine = create_engine(
+            f"{self._DRIVER}:///",  # Empty connection string
+            poolclass=NullPool,
+            connect_args=self._DEFAULT_CONNECT_ARGS
+        )
+        self._register_iam_auth(engine, user, self.config.writer_endpoint)
+        return engine
+
     def _get_iam_token(self, username: str, hostname: str) -> str:
-        """Generate an IAM authentication token for Aurora PostgreSQL"""
+        """Get a cached IAM authentication token for Aurora PostgreSQL"""
         try:
-            return self.rds_client.generate_db_auth_token(
-                DBHostname=hostname,
-                Port=5432,
-                DBUsername=username
-            )
+            return self.token_cache.get_token(username, hostname)
         except Exception as e:
             raise RuntimeError(f"Failed to generate IAM token: {str(e)}") from e
 
+    def _get_or_create_engine(self, engine_type: EngineType, is_async: bool) -> Union[Engine, AsyncEngine]:
+        """Return the cached engine, creating it on first use"""
+        key = (engine_type, is_async)
+        engine = self._engines.get(key)
+        if engine is None:
+            with self._lock:
+                engine = self._engines.get(key)
+                if engine is None:
+                    engine = self._create_async_engine(engine_type) if is_async else self._create_engine(engine_type)
+                    self._attach_pool_telemetry(engine, engine_type, is_async)
+                    self._attach_liveness(engine, is_async)
+                    self._attach_pgvector(engine, is_async)
+                    self._attach_session_profiles(engine, engine_type, is_async)
+                    self._engines[key] = engine
+        return engine
+
+    def _attach_pool_telemetry(self, engine: Union[Engine, AsyncEngine], engine_type: EngineType, is_async: bool) -> None:
+        """Emit pool metrics for the engine and track its concurrency for the sizing advisor"""
+        name = f"{engine_type.value}-async" if is_async else engine_type.value
+        telemetry = PoolTelemetry(name, self.config.pool_size, self.config.max_overflow)
+        # Pool events are dispatched on the sync facade of an async engine.
+        telemetry.attach(engine.sync_engine if is_async else engine)
+        self.pool_telemetry[name] = telemetry
+
+    def _attach_liveness(self, engine: Union[Engine, AsyncEngine], is_async: bool) -> None:
+        """Ping only idle connections on checkout and invalidate the pool on failover"""
+        liveness = IdleAwareLiveness(self.config.liveness_idle_seconds)
+        liveness.attach(engine.sync_engine if is_async else engine)
+
+    def _attach_pgvector(self, engine: Union[Engine, AsyncEngine], is_async: bool) -> None:
+        """
+        Register the pgvector adapters on new connections so embeddings are sent and read in binary.
+        Imported here, pgvector pulls in numpy, which importing the module shouldn't.
+        """
+        from pgvector.psycopg import register_vector
+
+        @event.listens_for(engine.sync_engine if is_async else engine, "connect")
+        def register_vector_types(dbapi_connection, connection_record):
+            try:
+                if is_async:
+                    dbapi_connection.run_async(self._register_vector_async)
+                else:
+                    register_vector(dbapi_connection)
+                    dbapi_connection.rollback()
+            except Exception as e:
+                # Without the extension (e.g. before the first migration) there is nothing to register.
+                logger.warning(f"Failed to register pgvector types: {e}")
+
+    @staticmethod
+    async def _register_vector_async(conn) -> None:
+        from pgvector.psycopg import register_vector_async
+        await register_vector_async(conn)
+        await conn.rollback()
+
+    def _attach_session_profiles(self, engine: Union[Engine, AsyncEngine], engine_type: EngineType, is_async: bool) -> None:
+        """Apply workload session profiles on checkout, defaulting to the interactive profile of the engine"""
+        if not self.config.session_profiles:
+            return
+        default = WorkloadProfile.INTERACTIVE_WRITE if engine_type == EngineType.WRITER else WorkloadProfile.INTERACTIVE_READ
+        listener = SessionProfileListener(default, self.config.application_name)
+        listener.attach(engine.sync_engine if is_async else engine)
+
+    def recommend_pool_sizes(self) -> Dict[str, Optional[PoolSizingRecommendation]]:
+        """Recommended pool_size / max_overflow per engine from the concurrency observed so far"""
+        return {name: telemetry.advisor.recommend() for name, telemetry in self.pool_telemetry.items()}
+
     def get_write_engine(self) -> Engine:
         """Get the database engine for write operations"""
-        return self.write_engine
+        return self._get_or_create_engine(EngineType.WRITER, is_async=False)
     
     def get_read_engine(self) -> Engine:
         """Get the database engine for read operations"""
-        return self.read_engine
+        return self._get_or_create_engine(EngineType.READER, is_async=False)
+
+    def get_async_write_engine(self) -> AsyncEngine:
+        """Get the async database engine for write operations"""
+        return self._get_or_create_engine(EngineType.WRITER, is_async=True)
+
+    def get_async_read_engine(self) -> AsyncEngine:
+        """Get the async database engine for read operations"""
+        return self._get_or_create_engine(EngineType.READER, is_async=True)
+
+    def get_engine(self, engine_type: EngineType, is_async: bool = False) -> Union[Engine, AsyncEngine]:
+        """Get an engine by type"""
+        return self._get_or_create_engine(engine_type, is_async)
+
+    async def dispose(self) -> None:
+        """Close every pool that was created and stop the IAM token refresher"""
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+
+        for engine in engines:
+            if isinstance(engine, AsyncEngine):
+                await engine.dispose()
+            else:
+                engine.dispose()
+
+        if self._token_cache is not None:
+            self._token_cache.stop()
         
     def healthcheck(self) -> Dict[str, Any]:
         """Perform a health check on both database connections"""
@@ -210,8 +464,8 @@ class PostgresDB:
         
         try:
             # Check writer connection
-            with self.write_engine.connect() as conn:
-                version = conn.execute("SELECT version()").scalar()
+            with self.get_write_engine().connect() as conn:
+                version = conn.execute(text("SELECT version()")).scalar()
                 result["writer"] = {"connected": True, "version": version}
         except Exception as e:
             result["writer"] = {"connected": False, "error": str(e)}
@@ -219,8 +473,8 @@ class PostgresDB:
             
         try:
             # Check reader connection
-            with self.read_engine.connect() as conn:
-                version = conn.execute("SELECT version()").scalar()
+            with self.get_read_engine().connect() as conn:
+                version = conn.execute(text("SELECT version()")).scalar()
                 result["reader"] = {"connected": True, "version": version}
         except Exception as e:
             result["reader"] = {"connected": False, "error": str(e)}
@@ -228,7 +482,52 @@ class PostgresDB:
             
         return result
 
-# Create singleton instance
-db = PostgresDB()
-write_postgres_db = db.get_write_engine()
-read_postgres_db = db.get_read_engine()
+class LazyEngine:
+    """
+    Stand-in for an engine of the registered PostgresDB that is resolved on every use.
+    Modules can bind these at import time without creating engines, and swapping the
+    registered database with set_db() is picked up immediately.
+    """
+
+    def __init__(self, engine_type: EngineType, is_async: bool = False):
+        self.engine_type = engine_type
+        self.is_async = is_async
+
+    def resolve(self) -> Union[Engine, AsyncEngine]:
+        return get_db().get_engine(self.engine_type, self.is_async)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+# Lazily created registry instance. Nothing is built when this module is imported.
+_instance: Optional[PostgresDB] = None
+_instance_lock = threading.Lock()
+
+def get_db() -> PostgresDB:
+    """
+    Get the registered PostgresDB, creating it from the environment on first use.
+    """
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = PostgresDB()
+    return _instance
+
+def set_db(db: Optional[PostgresDB]) -> None:
+    """
+    Register a PostgresDB (or a stand-in with the same getters). None resets the registry.
+    """
+    global _instance
+    with _instance_lock:
+        _instance = db
+
+async def dispose_db() -> None:
+    """
+    Dispose the registered PostgresDB, if one was created. Call from the FastAPI lifespan on shutdown.
+    """
+    global _instance
+    with _instance_lock:
+        db, _instance = _instance, None
+    if db is not None:
+        await db.dispose()
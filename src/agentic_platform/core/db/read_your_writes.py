@@ -0,0 +1,191 @@
+import asyncio
+import time
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager, asynccontextmanager
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Connection, Engine, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from agentic_platform.core.observability.observability_facade import get_facade
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+READ_YOUR_WRITES_FALLBACK_METRIC: str = "db.read_your_writes.writer_fallbacks"
+
+# WAL position of the writer after a commit.
+_CURRENT_LSN = text("SELECT pg_current_wal_lsn()::text")
+
+# True when the reader has replayed the given LSN. A reader that isn't a
+# replica (local development) is always consistent. NULL means unknown.
+_REPLAY_CHECK = text(
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn) ELSE true END"
+)
+
+def consistency_keys(session_id: Optional[str] = None, user_id: Optional[str] = None) -> List[str]:
+    """Keys that writes are tracked under and reads are checked against"""
+    keys = []
+    if session_id:
+        keys.append(f"session:{session_id}")
+    if user_id:
+        keys.append(f"user:{user_id}")
+    return keys
+
+def _lsn_to_int(lsn: str) -> int:
+    """Convert a Postgres LSN like '16/B374D848' into a comparable integer"""
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+class ReadYourWrites:
+    """
+    Read-your-writes routing between the Aurora writer and reader endpoints.
+
+    After a write the writer's WAL LSN is recorded per key (session or user). A read for
+    a key with a recent write first checks that the reader has replayed that LSN, polls
+    for up to max_wait_seconds and otherwise falls back to the writer. Keys are forgotten
+    after ttl_seconds, replica lag is far below that, so steady-state reads skip the check.
+
+    Tracking is in-process: it covers callers that read back through the same pod.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        ttl_seconds: float = 30.0,
+        max_wait_seconds: float = 0.05,
+        poll_interval_seconds: float = 0.01,
+        max_keys: int = 10000,
+        clock=time.monotonic
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_keys = max_keys
+        self._clock = clock
+        self._writes: "OrderedDict[str, Tuple[int, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, keys: Iterable[str], lsn: Optional[str]) -> None:
+        """Remember that the given keys were written up to lsn"""
+        if not self.enabled or not lsn:
+            return
+
+        lsn_int = _lsn_to_int(lsn)
+        now = self._clock()
+        with self._lock:
+            for key in keys:
+                previous = self._writes.pop(key, None)
+                if previous and previous[0] > lsn_int:
+                    self._writes[key] = (previous[0], previous[1], now)
+                else:
+                    self._writes[key] = (lsn_int, lsn, now)
+            while len(self._writes) > self.max_keys:
+                self._writes.popitem(last=False)
+
+    def pending_lsn(self, keys: Iterable[str]) -> Optional[str]:
+        """The newest LSN written for any of the keys within the TTL, if any"""
+        if not self.enabled:
+            return None
+
+        newest: Optional[Tuple[int, str, float]] = None
+        now = self._clock()
+        with self._lock:
+            for key in keys:
+                write = self._writes.get(key)
+                if write is None:
+                    continue
+                if now - write[2] >= self.ttl_seconds:
+                    del self._writes[key]
+                    continue
+                if newest is None or write[0] > newest[0]:
+                    newest = write
+        return newest[1] if newest else None
+
+    ##########################################################################
+    # Sync engines
+    ##########################################################################
+
+    def record_write(self, conn: Connection, keys: Iterable[str]) -> None:
+        """Record the writer LSN for the keys. Call after the write has committed."""
+        if self.enabled:
+            self.record(keys, conn.execute(_CURRENT_LSN).scalar())
+
+    @contextmanager
+    def read_connection(self, read_engine: Engine, write_engine: Engine, keys: Iterable[str]) -> Iterator[Connection]:
+        """Connect to the reader, or to the writer if the reader hasn't replayed the keys' writes"""
+        lsn = self.pending_lsn(keys)
+        if lsn is not None:
+            with read_engine.connect() as conn:
+                if self._wait_for_replay(conn, lsn):
+                    yield conn
+                    return
+            self._record_fallback()
+            with write_engine.connect() as conn:
+                yield conn
+            return
+
+        with read_engine.connect() as conn:
+            yield conn
+
+    def _wait_for_replay(self, conn: Connection, lsn: str) -> bool:
+        deadline = self._clock() + self.max_wait_seconds
+        while True:
+            if conn.execute(_REPLAY_CHECK, {"lsn": lsn}).scalar():
+                return True
+            if self._clock() >= deadline:
+                return False
+            time.sleep(self.poll_interval_seconds)
+
+    ##########################################################################
+    # Async engines
+    ##########################################################################
+
+    async def record_write_async(self, conn: AsyncConnection, keys: Iterable[str]) -> None:
+        """Record the writer LSN for the keys. Call after the write has committed."""
+        if self.enabled:
+            result = await conn.execute(_CURRENT_LSN)
+            self.record(keys, result.scalar())
+
+    @asynccontextmanager
+    async def read_connection_async(
+        self,
+        read_engine: AsyncEngine,
+        write_engine: AsyncEngine,
+        keys: Iterable[str]
+    ) -> AsyncIterator[AsyncConnection]:
+        """Connect to the reader, or to the writer if the reader hasn't replayed the keys' writes"""
+        lsn = self.pending_lsn(keys)
+        if lsn is not None:
+            async with read_engine.connect() as conn:
+                if await self._wait_for_replay_async(conn, lsn):
+                    yield conn
+                    return
+            self._record_fallback()
+            async with write_engine.connect() as conn:
+                yield conn
+            return
+
+        async with read_engine.connect() as conn:
+            yield conn
+
+    async def _wait_for_replay_async(self, conn: AsyncConnection, lsn: str) -> bool:
+        deadline = self._clock() + self.max_wait_seconds
+        while True:
+            result = await conn.execute(_REPLAY_CHECK, {"lsn": lsn})
+            if result.scalar():
+                return True
+            if self._clock() >= deadline:
+                return False
+            await asyncio.sleep(self.poll_interval_seconds)
+
+    def _record_fallback(self) -> None:
+        logger.debug("Reader is behind the last write, reading from the writer")
+        facade = get_facade()
+        if facade:
+            facade.increment_counter(READ_YOUR_WRITES_FALLBACK_METRIC)
@@ -0,0 +1,119 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Engine, event
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+# Key in the connection record info dict holding the profile applied to the connection.
+_APPLIED_PROFILE_KEY: str = "session_profile"
+
+class WorkloadProfile(Enum):
+    """Workloads that get their own session settings"""
+    INTERACTIVE_READ = "interactive-read"
+    INTERACTIVE_WRITE = "interactive-write"
+    VECTOR_SEARCH = "vector-search"
+    BULK_WRITE = "bulk-write"
+    ANALYTICS_EXPORT = "analytics-export"
+
+@dataclass(frozen=True)
+class SessionProfile:
+    """Session GUCs applied to a connection before it runs a workload"""
+    statement_timeout_ms: int
+    work_mem: str
+    hnsw_ef_search: Optional[int] = None
+    ivfflat_probes: Optional[int] = None
+
+    def settings(self, application_name: str) -> List[Tuple[str, str]]:
+        """The (GUC, value) pairs of the profile"""
+        settings = [
+            ("statement_timeout", str(self.statement_timeout_ms)),
+            ("work_mem", self.work_mem),
+            ("application_name", application_name),
+        ]
+        if self.hnsw_ef_search is not None:
+            settings.append(("hnsw.ef_search", str(self.hnsw_ef_search)))
+        if self.ivfflat_probes is not None:
+            settings.append(("ivfflat.probes", str(self.ivfflat_probes)))
+        return settings
+
+SESSION_PROFILES: Dict[WorkloadProfile, SessionProfile] = {
+    # Indexed lookups behind an API call. Fail fast instead of holding the connection.
+    WorkloadProfile.INTERACTIVE_READ: SessionProfile(statement_timeout_ms=2000, work_mem="4MB"),
+    WorkloadProfile.INTERACTIVE_WRITE: SessionProfile(statement_timeout_ms=5000, work_mem="4MB"),
+    # ANN search, a wider candidate list trades a little latency for recall.
+    WorkloadProfile.VECTOR_SEARCH: SessionProfile(
+        statement_timeout_ms=5000,
+        work_mem="16MB",
+        hnsw_ef_search=100,
+        ivfflat_probes=10
+    ),
+    WorkloadProfile.BULK_WRITE: SessionProfile(statement_timeout_ms=300000, work_mem="64MB"),
+    WorkloadProfile.ANALYTICS_EXPORT: SessionProfile(statement_timeout_ms=1800000, work_mem="128MB"),
+}
+
+_current_profile: ContextVar[Optional[WorkloadProfile]] = ContextVar("session_profile", default=None)
+
+@contextmanager
+def session_profile(profile: WorkloadProfile) -> Iterator[None]:
+    """Connections checked out inside the block run with the given profile"""
+    token = _current_profile.set(profile)
+    try:
+        yield
+    finally:
+        _current_profile.reset(token)
+
+def current_session_profile() -> Optional[WorkloadProfile]:
+    """The profile requested by the enclosing session_profile() block, if any"""
+    return _current_profile.get()
+
+class SessionProfileListener:
+    """
+    Applies the requested workload profile to a connection on checkout.
+
+    The settings are applied at session level and committed, and the applied profile is
+    remembered on the connection record, so a connection only pays the extra round trip
+    when it switches workloads. Checkouts outside a session_profile() block get the
+    engine's default profile, so no connection keeps the settings of a previous workload.
+    """
+
+    def __init__(
+        self,
+        default: WorkloadProfile,
+        application_name: str,
+        profiles: Optional[Dict[WorkloadProfile, SessionProfile]] = None
+    ):
+        self.default = default
+        self.application_name = application_name
+        self.profiles = profiles or SESSION_PROFILES
+
+    def attach(self, engine: Engine) -> None:
+        """Register the checkout listener. For an AsyncEngine pass engine.sync_engine."""
+        event.listen(engine, "checkout", self._on_checkout)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        profile = current_session_profile() or self.default
+        if connection_record.info.get(_APPLIED_PROFILE_KEY) == profile:
+            return
+
+        settings = self.profiles[profile].settings(f"{self.application_name}:{profile.value}")
+        # A single statement, so it runs in one round trip with psycopg2 and psycopg3.
+        query = "SELECT " + ", ".join("set_config(%s, %s, false)" for _ in settings)
+        params = [value for setting in settings for value in setting]
+
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(query, params)
+        finally:
+            cursor.close()
+        # Commit so a rollback of the first transaction doesn't revert the settings.
+        dbapi_connection.commit()
+
+        connection_record.info[_APPLIED_PROFILE_KEY] = profile
+        logger.debug("Applied session profile %s", profile.value)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, field_validator
-from typing import List
+from typing import List, Optional
 
 SUPPORTED_MODELS: List[str] = [
     "amazon.titan-embed-text-v2:0",
@@ -8,6 +8,8 @@ SUPPORTED_MODELS: List[str] = [
 class EmbedRequest(BaseModel):
     text: str
     model_id: str
+    # Output size for models with a configurable one (Titan v2: 256, 512 or 1024). None uses the model's default.
+    dimensions: Optional[int] = None
 
     # Check for supported models
     @field_validator("model_id")
@@ -18,4 +20,20 @@ class EmbedRequest(BaseModel):
         return v
     
 class EmbedResponse(BaseModel):
-    embedding: List[float]
\ No newline at end of file
+    embedding: List[float]
+
+class EmbedBatchRequest(BaseModel):
+    texts: List[str]
+    model_id: str
+    dimensions: Optional[int] = None
+
+    @field_validator("model_id")
+    @classmethod
+    def validate_model_id(cls, v, info):
+        if v not in SUPPORTED_MODELS:
+            raise ValueError(f"Model ID {v} is not supported")
+        return v
+
+class EmbedBatchResponse(BaseModel):
+    # One embedding per text, in the order of the request.
+    embeddings: List[List[float]]
\ No newline at end of file
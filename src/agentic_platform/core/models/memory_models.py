@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional, List, Literal, Union, Annotated
+from typing import Dict, Any, Optional, List, Literal, Tuple, Union, Annotated, get_args
 from pydantic import BaseModel, Field, field_validator, Discriminator
 from uuid import uuid4
 from datetime import datetime
@@ -175,31 +175,93 @@ class SessionContext(BaseModel):
     def add_metadata(self, metadata: Dict[str, Any]) -> None:
         self.session_metadata = metadata
 
-class Memory(BaseModel):
+# Fields of a memory get-memories can return. A ranked search always sets similarity.
+MemoryField = Literal[
+    "memory_id", "session_id", "user_id", "agent_id", "content",
+    "embedding_model", "created_at", "updated_at", "embedding"
+]
+MEMORY_FIELDS: Tuple[str, ...] = get_args(MemoryField)
+# Returned when a request doesn't project. An embedding is kilobytes of floats, ask for it by name.
+DEFAULT_MEMORY_FIELDS: Tuple[str, ...] = tuple(field for field in MEMORY_FIELDS if field != "embedding")
+
+class MemoryView(BaseModel):
+    """A memory as get-memories returns it. Fields that weren't requested are None."""
+    memory_id: Optional[str] = None
+    session_id: Optional[str] = None
+    user_id: Optional[str] = None
+    agent_id: Optional[str] = None
+    content: Optional[str] = None
+    embedding_model: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    embedding: Optional[List[float]] = None
+    similarity: float = -1.0
+
+class Memory(MemoryView):
     memory_id: str = Field(default_factory=lambda: str(uuid4()))
     session_id: str
     user_id: str
     agent_id: str
     content: str
     embedding_model: str
+    # The text the embeddings were computed from when it isn't content.
+    summary: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now())
     updated_at: datetime = Field(default_factory=lambda: datetime.now())
     embedding: Optional[List[float]] = None
+    # Embedding of the next model while an embedding migration dual-writes. Stored, never returned.
+    embedding_next: Optional[List[float]] = Field(default=None, exclude=True)
     similarity: float = -1.0
     
 
 class GetSessionContextRequest(BaseModel):
     user_id: Optional[str] = None
     session_id: Optional[str] = None
+    # Only return the last N messages of each session. None returns the whole conversation.
+    last_n_messages: Optional[int] = Field(default=None, ge=1)
 
 class GetSessionContextResponse(BaseModel):
     results: List[SessionContext]
 
+class ListSessionsRequest(BaseModel):
+    """Page through a user's sessions, newest first, without loading their messages."""
+    user_id: str
+    limit: int = Field(default=20, ge=1, le=100)
+    # next_cursor of the previous page. None starts at the newest session.
+    cursor: Optional[str] = None
+
+class SessionSummary(BaseModel):
+    session_id: str
+    user_id: Optional[str] = None
+    agent_id: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    message_count: int = 0
+    last_message_preview: Optional[str] = None
+
+class ListSessionsResponse(BaseModel):
+    sessions: List[SessionSummary]
+    # Pass as cursor to get the next page. None on the last page.
+    next_cursor: Optional[str] = None
+
 class UpsertSessionContextRequest(BaseModel):
     session_context: SessionContext
     
 class UpsertSessionContextResponse(BaseModel):
     session_context: SessionContext
+
+class AppendSessionMessagesRequest(BaseModel):
+    """Append only the new messages of a turn. The session is created if it doesn't exist."""
+    session_id: str
+    user_id: Optional[str] = None
+    agent_id: Optional[str] = None
+    messages: List[Message] = Field(min_length=1)
+
+class AppendSessionMessagesResponse(BaseModel):
+    session_id: str
+    # Sequence numbers assigned to the appended messages, in order.
+    first_sequence: int
+    last_sequence: int
     
 class GetMemoriesRequest(BaseModel):
     user_id: Optional[str] = None
@@ -207,6 +269,21 @@ class GetMemoriesRequest(BaseModel):
     agent_id: Optional[str] = None
     embedding: Optional[List[float]] = None
     limit: int = 2
+    # Full text query. Together with an embedding the memories are ranked by both searches
+    # (hybrid), on its own by text match only.
+    query_text: Optional[str] = None
+    # Weights of the vector and lexical rankings in a hybrid search. 0 turns a search off.
+    vector_weight: float = Field(default=1.0, ge=0)
+    lexical_weight: float = Field(default=1.0, ge=0)
+    # Rank by similarity blended with recency: a memory's recency score halves every half-life.
+    # Without an embedding memories are ranked by recency alone. Not applied to text queries.
+    recency_half_life_hours: Optional[float] = Field(default=None, gt=0)
+    # Share of the recency score in the blended score, 0 ranks by similarity only.
+    recency_weight: float = Field(default=0.3, ge=0, le=1)
+    # Multipliers of the score per memory_type, types not listed keep a weight of 1.
+    memory_type_weights: Optional[Dict[str, float]] = None
+    # Memory fields to return, DEFAULT_MEMORY_FIELDS when not set. Add embedding to get the vectors.
+    fields: Optional[List[MemoryField]] = Field(default=None, min_length=1)
 
     # Add validation so you can't get memories of an agent without session or user
     @field_validator("agent_id")
@@ -218,7 +295,38 @@ class GetMemoriesRequest(BaseModel):
         return v
 
 class GetMemoriesResponse(BaseModel):
-    memories: List[Memory]
+    memories: List[MemoryView]
+
+class GetMemoriesBatchRequest(BaseModel):
+    """Similarity searches for several query embeddings with the same filters, in one round trip."""
+    user_id: Optional[str] = None
+    session_id: Optional[str] = None
+    agent_id: Optional[str] = None
+    embeddings: List[List[float]] = Field(min_length=1)
+    # Memories returned per query embedding.
+    limit: int = Field(default=2, ge=1)
+    # Memory fields to return, DEFAULT_MEMORY_FIELDS when not set. Add embedding to get the vectors.
+    fields: Optional[List[MemoryField]] = Field(default=None, min_length=1)
+
+    # The searches share one statement, so their embeddings must come from the same model.
+    @field_validator("embeddings")
+    @classmethod
+    def validate_embeddings(cls, v):
+        if len({len(embedding) for embedding in v}) > 1:
+            raise ValueError("All embeddings must have the same dimensions")
+        return v
+
+    @field_validator("agent_id")
+    @classmethod
+    def validate_agent_id(cls, v, info):
+        data = info.data
+        if not data.get("session_id") and not data.get("user_id"):
+            raise ValueError("Either session_id or user_id must be provided")
+        return v
+
+class GetMemoriesBatchResponse(BaseModel):
+    # One result per query embedding, in the order of the request.
+    results: List[GetMemoriesResponse]
     
 class CreateMemoryRequest(BaseModel):
     session_id: str
@@ -228,3 +336,26 @@ class CreateMemoryRequest(BaseModel):
     
 class CreateMemoryResponse(BaseModel):
     memory: Memory
+    # True when the memory matched an existing one of the user, which was refreshed instead.
+    deduplicated: bool = False
+
+# create-memory runs in the background, the request returns a job to poll.
+# skipped: no messages that weren't already distilled, or a newer job of the session covered them.
+MemoryJobStatus = Literal["queued", "running", "completed", "failed", "skipped"]
+
+class CreateMemoryJobResponse(BaseModel):
+    job_id: str
+    status: MemoryJobStatus
+
+class GetMemoryJobRequest(BaseModel):
+    job_id: str
+
+class GetMemoryJobResponse(BaseModel):
+    job_id: str
+    status: MemoryJobStatus
+    created_at: datetime
+    updated_at: datetime
+    # Set once the job completed.
+    result: Optional[CreateMemoryResponse] = None
+    # Set when the job failed, or why it was skipped.
+    error: Optional[str] = None
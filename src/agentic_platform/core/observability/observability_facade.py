@@ -36,6 +36,7 @@ class ObservabilityFacade:
         
         # Create commonly used meters
         self.counter_metrics = {}
+        self.up_down_counter_metrics = {}
         self.gauge_metrics = {}
         self.histogram_metrics = {}
     
@@ -47,6 +48,14 @@ class ObservabilityFacade:
             unit=unit
         )
     
+    def create_up_down_counter(self, name: str, description: str, unit: str = "1") -> None:
+        """Create an up-down counter metric."""
+        self.up_down_counter_metrics[name] = self.meter.create_up_down_counter(
+            name=name,
+            description=description,
+            unit=unit
+        )
+    
     def create_gauge(self, name: str, description: str, unit: str = "1") -> None:
         """Create a gauge metric."""
         self.gauge_metrics[name] = self.meter.create_observable_gauge(
@@ -69,6 +78,12 @@ class ObservabilityFacade:
             self.create_counter(name, f"Counter for {name}")
         self.counter_metrics[name].add(value, attributes)
     
+    def add_up_down_counter(self, name: str, value: int, attributes: Optional[Dict[str, Any]] = None) -> None:
+        """Add a positive or negative value to an up-down counter metric."""
+        if name not in self.up_down_counter_metrics:
+            self.create_up_down_counter(name, f"Up-down counter for {name}")
+        self.up_down_counter_metrics[name].add(value, attributes)
+    
     def record_histogram(self, name: str, value: float, attributes: Optional[Dict[str, Any]] = None) -> None:
         """Record a value to a histogram metric."""
         if name not in self.histogram_metrics:
@@ -0,0 +1,10 @@
+from agentic_platform.core.models.memory_models import (
+    AppendSessionMessagesRequest,
+    AppendSessionMessagesResponse
+)
+from agentic_platform.service.memory_gateway.client.memory.memory_client import MemoryClient
+
+class AppendSessionMessagesController:
+    @staticmethod
+    async def append_session_messages(request: AppendSessionMessagesRequest) -> AppendSessionMessagesResponse:
+        return await MemoryClient.append_session_messages(request)
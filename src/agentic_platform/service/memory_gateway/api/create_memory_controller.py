@@ -1,10 +1,16 @@
+from fastapi import HTTPException
 from agentic_platform.core.models.memory_models import (
     CreateMemoryRequest,
-    CreateMemoryResponse
+    CreateMemoryJobResponse
 )
-from agentic_platform.service.memory_gateway.client.memory.memory_client import MemoryClient
+from agentic_platform.service.memory_gateway.worker.memory_pipeline import MemoryPipeline, MemoryQueueFull
 
 class CreateMemoryController:
     @staticmethod
-    def create_memory(request: CreateMemoryRequest) -> CreateMemoryResponse:
-        return MemoryClient.create_memory(request)
\ No newline at end of file
+    async def create_memory(request: CreateMemoryRequest) -> CreateMemoryJobResponse:
+        try:
+            return await MemoryPipeline.submit(request)
+        except MemoryQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
@@ -0,0 +1,10 @@
+from agentic_platform.core.models.memory_models import (
+    GetMemoriesBatchRequest,
+    GetMemoriesBatchResponse
+)
+from agentic_platform.service.memory_gateway.client.memory.memory_client import MemoryClient
+
+class GetMemoriesBatchController:
+    @staticmethod
+    async def get_memories_batch(request: GetMemoriesBatchRequest) -> GetMemoriesBatchResponse:
+        return await MemoryClient.get_memories_batch(request)
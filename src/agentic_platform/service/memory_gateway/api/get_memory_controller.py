@@ -6,5 +6,5 @@ from agentic_platform.service.memory_gateway.client.memory.memory_client import
 
 class GetMemoriesController:
     @staticmethod
-    def get_memories(request: GetMemoriesRequest) -> GetMemoriesResponse:
-        return MemoryClient.get_memories(request)
+    async def get_memories(request: GetMemoriesRequest) -> GetMemoriesResponse:
+        return await MemoryClient.get_memories(request)
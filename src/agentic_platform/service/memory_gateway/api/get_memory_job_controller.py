@@ -0,0 +1,14 @@
+from fastapi import HTTPException
+from agentic_platform.core.models.memory_models import (
+    GetMemoryJobRequest,
+    GetMemoryJobResponse
+)
+from agentic_platform.service.memory_gateway.worker.memory_pipeline import MemoryPipeline
+
+class GetMemoryJobController:
+    @staticmethod
+    async def get_memory_job(request: GetMemoryJobRequest) -> GetMemoryJobResponse:
+        job = await MemoryPipeline.get_job(request.job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Memory job {request.job_id} not found")
+        return job
@@ -6,5 +6,5 @@ from agentic_platform.service.memory_gateway.client.memory.memory_client import
 
 class GetSessionContextController:
     @staticmethod
-    def get_session_context(request: GetSessionContextRequest) -> GetSessionContextResponse:
-        return MemoryClient.get_session_context(request)
\ No newline at end of file
+    async def get_session_context(request: GetSessionContextRequest) -> GetSessionContextResponse:
+        return await MemoryClient.get_session_context(request)
\ No newline at end of file
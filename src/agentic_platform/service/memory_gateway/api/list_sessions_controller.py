@@ -0,0 +1,10 @@
+from agentic_platform.core.models.memory_models import (
+    ListSessionsRequest,
+    ListSessionsResponse
+)
+from agentic_platform.service.memory_gateway.client.memory.memory_client import MemoryClient
+
+class ListSessionsController:
+    @staticmethod
+    async def list_sessions(request: ListSessionsRequest) -> ListSessionsResponse:
+        return await MemoryClient.list_sessions(request)
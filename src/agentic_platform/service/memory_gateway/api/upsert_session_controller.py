@@ -6,5 +6,5 @@ from agentic_platform.service.memory_gateway.client.memory.memory_client import
 
 class UpsertSessionContextController:
     @staticmethod
-    def upsert_session_context(request: UpsertSessionContextRequest) -> UpsertSessionContextResponse:
-        return MemoryClient.upsert_session_context(request)
\ No newline at end of file
+    async def upsert_session_context(request: UpsertSessionContextRequest) -> UpsertSessionContextResponse:
+        return await MemoryClient.upsert_session_context(request)
\ No newline at end of file
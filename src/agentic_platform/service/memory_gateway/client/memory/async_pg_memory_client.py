@@ -0,0 +1,207 @@
+from agentic_platform.core.db.postgres import EngineType, LazyEngine, get_db
+from agentic_platform.core.db.read_your_writes import consistency_keys
+from agentic_platform.core.db.session_profiles import WorkloadProfile, session_profile
+from agentic_platform.core.db.liveness import retry_on_disconnect
+from agentic_platform.core.models.memory_models import (
+    Memory,
+    GetSessionContextRequest,
+    GetSessionContextResponse,
+    GetMemoriesRequest,
+    GetMemoriesResponse,
+    GetMemoriesBatchRequest,
+    GetMemoriesBatchResponse,
+    CreateMemoryRequest,
+    CreateMemoryResponse,
+    UpsertSessionContextRequest,
+    UpsertSessionContextResponse,
+    AppendSessionMessagesRequest,
+    AppendSessionMessagesResponse,
+    ListSessionsRequest,
+    ListSessionsResponse
+)
+from agentic_platform.service.memory_gateway.client.memory.pg_memory_client import PGMemoryClient, _row_dict, _watermark_upsert_statement
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    # Add basic configuration if none exists
+    logging.basicConfig(level=logging.INFO)
+
+read_db: AsyncEngine = LazyEngine(EngineType.READER, is_async=True)
+write_db: AsyncEngine = LazyEngine(EngineType.WRITER, is_async=True)
+
+class AsyncPGMemoryClient:
+    """
+    Asyncio variant of PGMemoryClient. Statements and row conversion are shared with
+    PGMemoryClient, only the execution runs on the async engines so a slow query
+    doesn't stall the event loop of the memory gateway.
+    """
+
+    @classmethod
+    async def get_session_context(cls, request: GetSessionContextRequest) -> GetSessionContextResponse:
+        """
+        Retrieves session contexts based on user_id or session_id.
+        """
+        logger.debug("Getting session context for request: %s", request)
+        query, params = PGMemoryClient._build_session_context_query(request)
+        keys = consistency_keys(request.session_id, request.user_id)
+
+        session_contexts = await cls._read_rows(query, params, keys, WorkloadProfile.INTERACTIVE_READ)
+        return PGMemoryClient._to_session_context_response(session_contexts, request.last_n_messages)
+
+    @classmethod
+    async def list_sessions(cls, request: ListSessionsRequest) -> ListSessionsResponse:
+        """
+        Lists a user's sessions newest first with keyset pagination. Returns metadata only.
+        """
+        query, params = PGMemoryClient._build_session_list_query(request)
+        keys = consistency_keys(None, request.user_id)
+
+        sessions = await cls._read_rows(query, params, keys, WorkloadProfile.INTERACTIVE_READ)
+        return PGMemoryClient._to_session_list_response(sessions, request.limit)
+
+    @classmethod
+    async def upsert_session_context(cls, request: UpsertSessionContextRequest) -> UpsertSessionContextResponse:
+        """
+        Upserts a session context. Updates all non-primary key fields on conflict.
+        """
+        stmt, params = PGMemoryClient._build_session_context_upsert(request)
+        session_context = request.session_context
+
+        async with write_db.connect() as conn:
+            await conn.execute(stmt, params)
+            await conn.commit()
+            await get_db().read_your_writes.record_write_async(
+                conn, consistency_keys(session_context.session_id, session_context.user_id)
+            )
+
+        return UpsertSessionContextResponse(session_context=request.session_context)
+
+    @classmethod
+    async def append_session_messages(cls, request: AppendSessionMessagesRequest) -> AppendSessionMessagesResponse:
+        """
+        Appends the new messages of a turn without rewriting the conversation.
+        """
+        stmt, params = PGMemoryClient._build_session_message_append(request)
+
+        async with write_db.connect() as conn:
+            result = await conn.execute(stmt, params)
+            sequences = [row.sequence for row in result]
+            await conn.commit()
+            await get_db().read_your_writes.record_write_async(
+                conn, consistency_keys(request.session_id, request.user_id)
+            )
+
+        return PGMemoryClient._to_append_response(request, sequences)
+
+    @classmethod
+    async def get_memories(cls, request: GetMemoriesRequest) -> GetMemoriesResponse:
+        """
+        Retrieves memories based on user_id, session_id, or agent_id.
+        """
+        query, params = PGMemoryClient._build_memories_query(request)
+        keys = consistency_keys(request.session_id, request.user_id)
+
+        memories = await cls._read_rows(
+            query, params, keys, PGMemoryClient._memories_profile(request), PGMemoryClient._to_memory_view
+        )
+        return GetMemoriesResponse(memories=memories)
+
+    @classmethod
+    async def get_memories_batch(cls, request: GetMemoriesBatchRequest) -> GetMemoriesBatchResponse:
+        """
+        Runs a similarity search per query embedding with shared filters in one statement.
+        """
+        query, params = PGMemoryClient._build_memories_batch_query(request)
+        keys = consistency_keys(request.session_id, request.user_id)
+
+        rows = await cls._read_rows(
+            query, params, keys, WorkloadProfile.VECTOR_SEARCH, PGMemoryClient._to_indexed_memory_view
+        )
+        return PGMemoryClient._to_memories_batch_response(rows, len(request.embeddings))
+
+    @classmethod
+    async def create_memory(cls, request: CreateMemoryRequest) -> CreateMemoryResponse:
+        """
+        Creates a memory from the new messages of the session. The LLM gateway client is
+        blocking so the extraction and embedding calls run in a worker thread.
+        """
+        watermarks = await cls.read_watermarks([request.session_id])
+        memory: Memory = await asyncio.to_thread(PGMemoryClient._extract_memory, request, watermarks.get(request.session_id))
+        stmt, params, deduplicating = PGMemoryClient._build_memory_write(memory)
+
+        async with write_db.connect() as conn:
+            # The watermark goes first, an extraction that lost the race for the session writes nothing.
+            advanced = await conn.execute(_watermark_upsert_statement(), PGMemoryClient._watermark_row(request))
+            if advanced.first() is None:
+                await conn.rollback()
+                raise PGMemoryClient._superseded(request)
+            result = await conn.execute(stmt, params)
+            rows = list(result) if deduplicating else []
+            await conn.commit()
+            await get_db().read_your_writes.record_write_async(conn, consistency_keys(memory.session_id, memory.user_id))
+
+        return PGMemoryClient._to_create_memory_response(memory, rows)
+
+    @classmethod
+    async def create_memories(
+        cls,
+        memories: List[Memory],
+        watermark_rows: List[Dict[str, Any]]
+    ) -> List[Optional[CreateMemoryResponse]]:
+        """
+        Stores memories that were already extracted and embedded, and advances the extraction
+        watermarks of their sessions, in one transaction. Used by the create-memory pipeline
+        to write a batch of jobs at once. None for a memory whose session another extraction
+        already advanced as far, it isn't written.
+        """
+        keys = [key for memory in memories for key in consistency_keys(memory.session_id, memory.user_id)]
+
+        async with write_db.connect() as conn:
+            advanced = {row.session_id for row in await conn.execute(_watermark_upsert_statement(), watermark_rows)}
+            written = [memory for memory, watermark in zip(memories, watermark_rows) if watermark['session_id'] in advanced]
+            result, deduplicating = [], False
+            if written:
+                stmt, params, deduplicating = PGMemoryClient._build_memory_batch_write(written)
+                result = list(await conn.execute(stmt, params))
+            await conn.commit()
+            await get_db().read_your_writes.record_write_async(conn, keys)
+
+        # A deduplicating write returns a row per memory, a batch insert only the new ids.
+        rows = iter([[row] for row in result] if deduplicating else [[] for _ in written])
+        return [
+            PGMemoryClient._to_create_memory_response(memory, next(rows)) if watermark['session_id'] in advanced else None
+            for memory, watermark in zip(memories, watermark_rows)
+        ]
+
+    @classmethod
+    async def read_watermarks(cls, session_ids: List[str]) -> Dict[str, int]:
+        """Extraction watermarks of the sessions that have one, by session id."""
+        query, params = PGMemoryClient._build_watermark_query(session_ids)
+        async with write_db.connect() as conn:
+            return PGMemoryClient._to_watermarks(await conn.execute(query, params))
+
+    @classmethod
+    @retry_on_disconnect
+    async def _read_rows(
+        cls,
+        query: Select,
+        params: Dict[str, Any],
+        keys: List[str],
+        profile: WorkloadProfile,
+        to_row: Optional[Callable[[Any], Any]] = None
+    ) -> List[Any]:
+        """
+        Run a read on the reader, or on the writer if the reader hasn't caught up with our last
+        write. Rows are converted by to_row, into dicts by default.
+        """
+        to_row = to_row or _row_dict
+        with session_profile(profile):
+            async with get_db().read_your_writes.read_connection_async(read_db, write_db, keys) as conn:
+                result = await conn.execute(query, params)
+                return [to_row(row) for row in result]
@@ -3,27 +3,45 @@ from agentic_platform.core.models.memory_models import (
     GetSessionContextResponse,
     UpsertSessionContextRequest,
     UpsertSessionContextResponse,
+    AppendSessionMessagesRequest,
+    AppendSessionMessagesResponse,
+    ListSessionsRequest,
+    ListSessionsResponse,
     GetMemoriesRequest,
     GetMemoriesResponse,
+    GetMemoriesBatchRequest,
+    GetMemoriesBatchResponse,
     CreateMemoryRequest,
     CreateMemoryResponse
 )
 
-from agentic_platform.service.memory_gateway.client.memory.pg_memory_client import PGMemoryClient
+from agentic_platform.service.memory_gateway.client.memory.async_pg_memory_client import AsyncPGMemoryClient
 class MemoryClient:
 
     @classmethod
-    def get_session_context(cls, request: GetSessionContextRequest) -> GetSessionContextResponse:
-        return PGMemoryClient.get_session_context(request)
+    async def get_session_context(cls, request: GetSessionContextRequest) -> GetSessionContextResponse:
+        return await AsyncPGMemoryClient.get_session_context(request)
     
     @classmethod
-    def upsert_session_context(cls, request: UpsertSessionContextRequest) -> UpsertSessionContextResponse:
-        return PGMemoryClient.upsert_session_context(request)
+    async def list_sessions(cls, request: ListSessionsRequest) -> ListSessionsResponse:
+        return await AsyncPGMemoryClient.list_sessions(request)
+
+    @classmethod
+    async def upsert_session_context(cls, request: UpsertSessionContextRequest) -> UpsertSessionContextResponse:
+        return await AsyncPGMemoryClient.upsert_session_context(request)
+
+    @classmethod
+    async def append_session_messages(cls, request: AppendSessionMessagesRequest) -> AppendSessionMessagesResponse:
+        return await AsyncPGMemoryClient.append_session_messages(request)
     
     @classmethod
-    def get_memories(cls, request: GetMemoriesRequest) -> GetMemoriesResponse:
-        return PGMemoryClient.get_memories(request)
+    async def get_memories(cls, request: GetMemoriesRequest) -> GetMemoriesResponse:
+        return await AsyncPGMemoryClient.get_memories(request)
+
+    @classmethod
+    async def get_memories_batch(cls, request: GetMemoriesBatchRequest) -> GetMemoriesBatchResponse:
+        return await AsyncPGMemoryClient.get_memories_batch(request)
     
     @classmethod
-    def create_memory(cls, request: CreateMemoryRequest) -> CreateMemoryResponse:
-        return PGMemoryClient.create_memory(request)
+    async def create_memory(cls, request: CreateMemoryRequest) -> CreateMemoryResponse:
+        return await AsyncPGMemoryClient.create_memory(request)
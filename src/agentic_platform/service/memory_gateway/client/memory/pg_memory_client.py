@@ -1,38 +1,85 @@
-from agentic_platform.core.db.postgres import PostgresDB, write_postgres_db, read_postgres_db
+from agentic_platform.core.db.postgres import EngineType, LazyEngine, get_db
+from agentic_platform.core.db.read_your_writes import consistency_keys
+from agentic_platform.core.db.session_profiles import WorkloadProfile, session_profile
+from agentic_platform.core.db.liveness import retry_on_disconnect
+from agentic_platform.core.db.bulk_loader import BulkLoader, BulkLoadProgress
+from agentic_platform.service.memory_gateway.client.memory.session_codec import encode_messages, decode_messages
 from agentic_platform.core.models.memory_models import (
     SessionContext, 
     Memory,
+    MemoryView,
+    MEMORY_FIELDS,
+    DEFAULT_MEMORY_FIELDS,
     GetSessionContextRequest,
     GetSessionContextResponse,
     GetMemoriesRequest,
     GetMemoriesResponse,
+    GetMemoriesBatchRequest,
+    GetMemoriesBatchResponse,
     CreateMemoryRequest,
     CreateMemoryResponse,
     UpsertSessionContextRequest,
-    UpsertSessionContextResponse
+    UpsertSessionContextResponse,
+    AppendSessionMessagesRequest,
+    AppendSessionMessagesResponse,
+    ListSessionsRequest,
+    ListSessionsResponse,
+    SessionSummary
 )
 from agentic_platform.service.memory_gateway.prompt.create_memory_prompt import CreateMemoryPrompt
 from agentic_platform.core.models.llm_models import LLMRequest, LLMResponse, Message
-from agentic_platform.core.models.embedding_models import EmbedRequest, EmbedResponse
+from agentic_platform.core.models.embedding_models import EmbedRequest, EmbedResponse, EmbedBatchRequest
 from agentic_platform.core.formatter.extract_regex_formatter import ExtractRegexFormatter
 from agentic_platform.core.client.llm_gateway.llm_gateway_client import LLMGatewayClient
 from agentic_platform.core.context.request_context import set_auth_token, get_auth_token
 import os
+import math
 
-from sqlalchemy import MetaData, Table, Column, Text, select, insert, DateTime, func
-from sqlalchemy import Result
+from sqlalchemy import MetaData, Table, Column, Text, BigInteger, Float, ForeignKey, Computed, select, insert, delete, union_all, DateTime, func
+from sqlalchemy import Result, Engine
+from pgvector import Vector as PGVector
 from pgvector.sqlalchemy import Vector
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy import and_, desc
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR, ARRAY, REAL, aggregate_order_by
+from sqlalchemy import and_, any_, desc, bindparam, label, literal_column, text, true, tuple_, type_coerce
+from sqlalchemy.types import NullType
+from sqlalchemy.sql.elements import TextClause
 import uuid
 import json
-from typing import List
-from sqlalchemy.dialects.postgresql import insert
+import base64
+from datetime import datetime
+from typing import List, Dict, Any, Tuple, Iterable, Callable, Optional, Sequence, Union
+from functools import lru_cache
+from sqlalchemy.dialects.postgresql import insert, Insert
+from sqlalchemy import Select, Executable
 import logging
 
 # Note: WARNING
-# Bad things will happen if you change this without migrating existing embeddings to the new embedding space.
-EMBEDDING_MODEL: str = "amazon.titan-embed-text-v2:0"
+# Bad things will happen if you change these without migrating existing embeddings to the new
+# embedding space. Use the embedding migration below, the column type must match the dimensions.
+EMBEDDING_MODEL: str = os.getenv("MEMORY_EMBEDDING_MODEL", "amazon.titan-embed-text-v2:0")
+EMBEDDING_DIMENSIONS: int = int(os.getenv("MEMORY_EMBEDDING_DIMENSIONS", "1024"))
+
+# Column holding the embedding, its model is stored in <column>_model. Migrations alternate
+# between two columns, so the column of a deployment can be either.
+EMBEDDING_COLUMN: str = os.getenv("MEMORY_EMBEDDING_COLUMN", "embedding")
+
+# Embedding migration, driven by worker/embedding_migration.py. With a next model configured
+# every memory is written with both embeddings (dual_write) while the backfill re-embeds the
+# existing memories into the next column. cutover moves searches to the next column. The next
+# model, dimensions and column then become the current ones and the old column is dropped.
+NEXT_EMBEDDING_MODEL: Optional[str] = os.getenv("MEMORY_NEXT_EMBEDDING_MODEL") or None
+NEXT_EMBEDDING_DIMENSIONS: int = int(os.getenv("MEMORY_NEXT_EMBEDDING_DIMENSIONS", str(EMBEDDING_DIMENSIONS)))
+NEXT_EMBEDDING_COLUMN: str = os.getenv("MEMORY_NEXT_EMBEDDING_COLUMN", "embedding_next")
+EMBEDDING_MIGRATION_PHASES: Tuple[str, ...] = ('dual_write', 'cutover')
+EMBEDDING_MIGRATION_PHASE: str = os.getenv("MEMORY_EMBEDDING_MIGRATION_PHASE", "dual_write").lower()
+if EMBEDDING_MIGRATION_PHASE not in EMBEDDING_MIGRATION_PHASES:
+    raise ValueError(f"MEMORY_EMBEDDING_MIGRATION_PHASE must be one of {EMBEDDING_MIGRATION_PHASES}")
+
+# Embedding column and dimensions per embedding space.
+EMBEDDING_SPACES: Dict[str, Tuple[str, int]] = {
+    'current': (EMBEDDING_COLUMN, EMBEDDING_DIMENSIONS),
+    'next': (NEXT_EMBEDDING_COLUMN, NEXT_EMBEDDING_DIMENSIONS),
+}
 
 logger = logging.getLogger(__name__)
 if not logger.handlers:
@@ -40,7 +87,9 @@ if not logger.handlers:
     logging.basicConfig(level=logging.INFO)
 
 SESSION_CONTEXT_TABLE_NAME: str = 'session_context'
+SESSION_MESSAGE_TABLE_NAME: str = 'session_message'
 MEMORY_TABLE_NAME: str = 'memory'
+DEFAULT_MEMORY_TYPE: str = 'general'
 
 metadata = MetaData()
 SESSION_CONTEXT_TABLE: Table = Table(
@@ -53,24 +102,775 @@ SESSION_CONTEXT_TABLE: Table = Table(
     Column('session_metadata', JSONB),
     Column('created_at', DateTime(timezone=True), server_default='now()'),
     Column('updated_at', DateTime(timezone=True), server_default='now()'),
+    Column('last_sequence', BigInteger, nullable=False, server_default='0'),
+)
+
+# Append-only message log. Sessions written through append_session_messages keep their
+# messages here, one row per message, instead of in session_context.messages.
+SESSION_MESSAGE_TABLE: Table = Table(
+    "session_message", metadata,
+    Column('session_id', UUID(as_uuid=True), ForeignKey('session_context.session_id', ondelete='CASCADE'), primary_key=True),
+    Column('sequence', BigInteger, primary_key=True),
+    Column('message', JSONB, nullable=False),
+    Column('created_at', DateTime(timezone=True), server_default='now()'),
 )
 
+# Hash partitioned by user_id, which is why it is part of the primary key. Filtering on
+# user_id lets Postgres prune the search down to the one partition holding the user's memories.
 MEMORY_TABLE: Table = Table(
     "memory", metadata,
     Column('memory_id', UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
     Column('session_id', UUID(as_uuid=True)),
-    Column('user_id', Text, nullable=True),
+    Column('user_id', Text, primary_key=True),
     Column('agent_id', UUID(as_uuid=True), nullable=True),
-    Column('memory_type', Text, nullable=False, default='general'),
+    Column('memory_type', Text, nullable=False, default=DEFAULT_MEMORY_TYPE),
     Column('content', Text, nullable=False),
-    Column('embedding_model', Text, nullable=False),
-    Column('embedding', Vector(1024)),
+    # Text the embeddings were computed from when it isn't content, the LLM-distilled memory of a session.
+    Column('summary', Text),
+    # Keyed embedding_model and embedding whatever the columns are named.
+    Column(f'{EMBEDDING_COLUMN}_model', Text, key='embedding_model'),
+    Column(EMBEDDING_COLUMN, Vector(EMBEDDING_DIMENSIONS), key='embedding'),
     Column('created_at', DateTime(timezone=True), server_default='now()'),
     Column('updated_at', DateTime(timezone=True), server_default='now()'),
+    # Maintained by Postgres for lexical search, never selected or written by the client.
+    Column('content_tsv', TSVECTOR, Computed("to_tsvector('english', content)", persisted=True)),
+)
+if NEXT_EMBEDDING_MODEL:
+    MEMORY_TABLE.append_column(Column(f'{NEXT_EMBEDDING_COLUMN}_model', Text, key='embedding_next_model'))
+    MEMORY_TABLE.append_column(Column(NEXT_EMBEDDING_COLUMN, Vector(NEXT_EMBEDDING_DIMENSIONS), key='embedding_next'))
+
+# How many messages of each session were already distilled into a memory. Later extractions
+# only send the messages from that index on. Sessions are append-only, so unlike timestamps
+# the index orders their messages even with clock skew or equal timestamps.
+MEMORY_WATERMARK_TABLE: Table = Table(
+    "memory_extraction_watermark", metadata,
+    Column('session_id', UUID(as_uuid=True), primary_key=True),
+    Column('user_id', Text, nullable=False),
+    Column('message_count', BigInteger, nullable=False),
+    Column('updated_at', DateTime(timezone=True), server_default='now()'),
+)
+# Already distilled messages sent again ahead of the new ones, so the LLM sees what they refer to.
+EXTRACTION_OVERLAP_MESSAGES: int = int(os.getenv("MEMORY_EXTRACTION_OVERLAP_MESSAGES", "2"))
+
+class NothingToExtract(ValueError):
+    """Every message of the session was already distilled into a memory"""
+
+# Text search configuration of memory.content_tsv. Queries must use the same one to hit the GIN index.
+TEXT_SEARCH_CONFIG: str = 'english'
+# Reciprocal rank fusion constant. A memory ranked r by one search contributes weight / (RRF_K + r).
+RRF_K: int = 60
+# Each search of a hybrid query ranks this many candidates per requested memory before fusion.
+HYBRID_CANDIDATE_FACTOR: int = 5
+HYBRID_MIN_CANDIDATES: int = 20
+
+# Recency-decayed ranking scores this many candidates per requested memory.
+RECENCY_CANDIDATE_FACTOR: int = int(os.getenv("MEMORY_RECENCY_CANDIDATE_FACTOR", "10"))
+
+# Quantized nearest neighbour search. With halfvec or binary the HNSW index is built on a compact
+# copy of the embedding (see the quantized index migration), the index walk returns
+# RERANK_FACTOR times the requested candidates and those are re-ranked by the exact distance on
+# the full vector in the same query. none searches the float32 index directly.
+EMBEDDING_QUANTIZATIONS: Tuple[str, ...] = ('none', 'halfvec', 'binary')
+EMBEDDING_QUANTIZATION: str = os.getenv("MEMORY_EMBEDDING_QUANTIZATION", "none").lower()
+RERANK_FACTOR: int = int(os.getenv("MEMORY_RERANK_FACTOR", "4"))
+if EMBEDDING_QUANTIZATION not in EMBEDDING_QUANTIZATIONS:
+    raise ValueError(f"MEMORY_EMBEDDING_QUANTIZATION must be one of {EMBEDDING_QUANTIZATIONS}")
+
+def _similarity_threshold(value: str) -> Optional[float]:
+    """MEMORY_DEDUP_SIMILARITY is a cosine similarity, or 'off' to always insert"""
+    if value.strip().lower() in ("", "none", "off"):
+        return None
+    return float(value)
+
+# A new memory at least this similar to an existing memory of the user refreshes that memory
+# instead of inserting a near duplicate. With MEMORY_DEDUP_APPEND_CONTENT the new content is
+# appended to the existing memory's content.
+DEDUP_SIMILARITY: Optional[float] = _similarity_threshold(os.getenv("MEMORY_DEDUP_SIMILARITY", "0.95"))
+DEDUP_APPEND_CONTENT: bool = os.getenv("MEMORY_DEDUP_APPEND_CONTENT", "false").lower() == "true"
+
+def _exact_distance(space: str = 'current', param: str = 'embedding', query: Optional[str] = None) -> str:
+    """
+    Cosine distance between the space's embedding column and the :param vector, or the
+    query expression, e.g. a column of a joined set of query vectors.
+    """
+    column, _ = EMBEDDING_SPACES[space]
+    return f"memory.{column} <=> {query or ':' + param}"
+
+def _unit_vector(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
+def _quantized_distance(quantization: str, space: str = 'current', param: str = 'embedding', query: Optional[str] = None) -> str:
+    """
+    The distance the index of the quantization serves, the exact one for none.
+    These must match the index expressions exactly, otherwise the planner can't use the index.
+    """
+    column, dimensions = EMBEDDING_SPACES[space]
+    query = query or f":{param}"
+    if quantization == 'halfvec':
+        return f"(memory.{column}::halfvec({dimensions})) <=> CAST({query} AS halfvec({dimensions}))"
+    if quantization == 'binary':
+        return (
+            f"(binary_quantize(memory.{column})::bit({dimensions})) "
+            f"<~> binary_quantize(CAST({query} AS vector({dimensions})))"
+        )
+    return _exact_distance(space, param, query)
+
+# Resolved against the registered PostgresDB on use, so importing this module is cheap.
+read_db: Engine = LazyEngine(EngineType.READER)
+write_db: Engine = LazyEngine(EngineType.WRITER)
+
+##############################################################################
+# Statements are built once per filter combination with bind parameters and
+# reused for every request. Reusing the same statement object keeps its cache
+# key memoized, so SQLAlchemy serves the compiled SQL from its compiled cache
+# instead of rebuilding and recompiling the tree on each call.
+##############################################################################
+
+# Fields of SessionContext that map 1:1 onto session_context columns.
+_SESSION_CONTEXT_FIELDS: Tuple[str, ...] = (
+    'session_id', 'user_id', 'agent_id', 'system_prompt', 'messages', 'session_metadata'
 )
 
-read_db: PostgresDB = read_postgres_db
-write_db: PostgresDB = write_postgres_db
+@lru_cache(maxsize=None)
+def _session_context_statement(by_session: bool, by_user: bool, windowed: bool = False) -> Select:
+    """Select session contexts filtered by the given columns, with their appended messages"""
+    conditions = []
+    if by_session:
+        conditions.append(SESSION_CONTEXT_TABLE.c.session_id == bindparam('session_id'))
+    if by_user:
+        conditions.append(SESSION_CONTEXT_TABLE.c.user_id == bindparam('user_id'))
+
+    return (
+        select(SESSION_CONTEXT_TABLE, _appended_messages(windowed))
+        .where(and_(*conditions))
+        .order_by(desc(SESSION_CONTEXT_TABLE.c.created_at))
+    )
+
+def _appended_messages(windowed: bool):
+    """
+    The session_message rows of a session as one JSONB array in sequence order. Windowed
+    reads only take the last :last_n_messages rows, walking the primary key backwards.
+    """
+    messages = (
+        select(SESSION_MESSAGE_TABLE.c.sequence, SESSION_MESSAGE_TABLE.c.message)
+        .where(SESSION_MESSAGE_TABLE.c.session_id == SESSION_CONTEXT_TABLE.c.session_id)
+        .correlate(SESSION_CONTEXT_TABLE)
+    )
+    if windowed:
+        messages = messages.order_by(desc(SESSION_MESSAGE_TABLE.c.sequence)).limit(bindparam('last_n_messages'))
+    messages = messages.subquery('appended')
+
+    return (
+        select(func.jsonb_agg(aggregate_order_by(messages.c.message, messages.c.sequence)))
+        .correlate(SESSION_CONTEXT_TABLE)
+        .scalar_subquery()
+        .label('appended_messages')
+    )
+
+# Characters of the last message returned by list_sessions.
+SESSION_PREVIEW_LENGTH: int = 120
+
+# Messages are stored in the compact encoding of session_codec. Set to "json" to keep
+# writing full message dumps while gateways that can't read the compact one still run.
+SESSION_MESSAGE_ENCODING: str = os.getenv("MEMORY_SESSION_MESSAGE_ENCODING", "compact").lower()
+
+@lru_cache(maxsize=None)
+def _session_list_statement(paged: bool) -> Select:
+    """
+    One page of a user's sessions, newest first. Only metadata is selected, the message
+    count comes from the column lengths and the preview from a single message, so the
+    cost of a page doesn't grow with the conversations.
+    """
+    sc = SESSION_CONTEXT_TABLE.c
+    # The newest appended message is a primary key lookup, sessions without appends fall
+    # back to the last message of the stored conversation.
+    last_appended = (
+        select(SESSION_MESSAGE_TABLE.c.message)
+        .where(and_(
+            SESSION_MESSAGE_TABLE.c.session_id == sc.session_id,
+            SESSION_MESSAGE_TABLE.c.sequence == sc.last_sequence
+        ))
+        .correlate(SESSION_CONTEXT_TABLE)
+        .scalar_subquery()
+    )
+    last_message = func.coalesce(last_appended, sc.messages.op('->')(literal_column('-1')))
+    # Compact messages store text content as bare strings, full dumps as typed objects.
+    preview_text = func.coalesce(
+        func.jsonb_path_query_first(last_message, text("""'$.c[*] ? (@.type() == "string")'""")),
+        func.jsonb_path_query_first(last_message, text("""'$.content[*] ? (@.type == "text").text'"""))
+    )
+    preview = func.left(preview_text.op('#>>')(text("'{}'")), literal_column(str(SESSION_PREVIEW_LENGTH)))
+
+    query = select(
+        sc.session_id,
+        sc.user_id,
+        sc.agent_id,
+        sc.created_at,
+        sc.updated_at,
+        (func.jsonb_array_length(sc.messages) + sc.last_sequence).label('message_count'),
+        preview.label('last_message_preview')
+    ).where(sc.user_id == bindparam('user_id'))
+
+    if paged:
+        # Row comparison matches the (user_id, created_at DESC, session_id DESC) index order.
+        query = query.where(
+            tuple_(sc.created_at, sc.session_id) < tuple_(bindparam('cursor_created_at'), bindparam('cursor_session_id'))
+        )
+
+    return query.order_by(desc(sc.created_at), desc(sc.session_id)).limit(bindparam('limit'))
+
+@lru_cache(maxsize=None)
+def _session_context_upsert_statement() -> Insert:
+    """
+    Upsert a session context. Conflicting rows take the values of the insert.
+    The upsert replaces the whole conversation, so appended messages of the session are dropped.
+    """
+    cleared = (
+        delete(SESSION_MESSAGE_TABLE)
+        .where(SESSION_MESSAGE_TABLE.c.session_id == bindparam('session_id'))
+        .cte('cleared_messages')
+    )
+    stmt = insert(SESSION_CONTEXT_TABLE).values({
+        field: bindparam(field) for field in _SESSION_CONTEXT_FIELDS
+    })
+
+    # Referencing excluded.* avoids binding every value (including messages) twice.
+    update_fields = {field: stmt.excluded[field] for field in _SESSION_CONTEXT_FIELDS if field != 'session_id'}
+    return stmt.on_conflict_do_update(
+        index_elements=['session_id'],
+        set_={**update_fields, 'last_sequence': literal_column('0'), 'updated_at': func.now()}
+    ).add_cte(cleared)
+
+@lru_cache(maxsize=None)
+def _session_message_append_statement() -> Insert:
+    """
+    Append messages to a session in one round trip. The session row is created or its
+    last_sequence bumped by the number of messages, which locks the row until commit, then the
+    messages are inserted with consecutive sequence numbers. The cost doesn't depend on the
+    length of the conversation.
+    """
+    session = insert(SESSION_CONTEXT_TABLE).values(
+        session_id=bindparam('session_id'),
+        user_id=bindparam('user_id'),
+        agent_id=bindparam('agent_id'),
+        messages=func.jsonb_build_array(),
+        last_sequence=bindparam('message_count', type_=BigInteger)
+    )
+    session = session.on_conflict_do_update(
+        index_elements=['session_id'],
+        set_={
+            'last_sequence': SESSION_CONTEXT_TABLE.c.last_sequence + session.excluded.last_sequence,
+            'updated_at': func.now()
+        }
+    ).returning(SESSION_CONTEXT_TABLE.c.session_id, SESSION_CONTEXT_TABLE.c.last_sequence).cte('session_row')
+
+    messages = func.jsonb_array_elements(bindparam('messages', type_=JSONB)).table_valued(
+        'value', with_ordinality='ordinality'
+    ).render_derived('message')
+    rows = select(
+        session.c.session_id,
+        session.c.last_sequence - bindparam('message_count', type_=BigInteger) + messages.c.ordinality,
+        messages.c.value
+    )
+    # Data-modifying CTEs have to be attached to the top-level statement.
+    return (
+        insert(SESSION_MESSAGE_TABLE)
+        .from_select(['session_id', 'sequence', 'message'], rows)
+        .returning(SESSION_MESSAGE_TABLE.c.sequence)
+        .add_cte(session)
+    )
+
+def _row_dict(row: Any) -> Dict[str, Any]:
+    return dict(row._mapping)
+
+def _as(column: Column, name: str) -> Any:
+    return column if column.name == name else column.label(name)
+
+def _memory_columns(space: str = 'current', fields: Tuple[str, ...] = DEFAULT_MEMORY_FIELDS) -> List[Any]:
+    """
+    Columns of the requested memory fields. Only the embedding of the searched space is
+    returned, as embedding. UUIDs are cast to text and the embedding to real[] by Postgres,
+    so a row is a response memory as it comes off the wire.
+    """
+    prefix = 'embedding_next' if space == 'next' else 'embedding'
+    columns = {
+        'memory_id': MEMORY_TABLE.c.memory_id.cast(Text).label('memory_id'),
+        'session_id': MEMORY_TABLE.c.session_id.cast(Text).label('session_id'),
+        'user_id': MEMORY_TABLE.c.user_id,
+        'agent_id': MEMORY_TABLE.c.agent_id.cast(Text).label('agent_id'),
+        # Not a response field, the recency ranking weighs memories by it.
+        'memory_type': MEMORY_TABLE.c.memory_type,
+        'content': MEMORY_TABLE.c.content,
+        'embedding_model': _as(MEMORY_TABLE.c[f'{prefix}_model'], 'embedding_model'),
+        'created_at': MEMORY_TABLE.c.created_at,
+        'updated_at': MEMORY_TABLE.c.updated_at,
+        'embedding': MEMORY_TABLE.c[prefix].cast(ARRAY(REAL)).label('embedding'),
+    }
+    return [columns[field] for field in fields]
+
+def _memory_conditions(by_session: bool, by_user: bool, by_agent: bool, by_memory_type: bool) -> List[Any]:
+    """
+    Filters shared by every memory search. The user_id equality is what allows partition
+    pruning, also at execution time for prepared statements. Searches by session or agent
+    alone have to visit every partition.
+    """
+    conditions = []
+    if by_session:
+        conditions.append(MEMORY_TABLE.c.session_id == bindparam('session_id'))
+    if by_user:
+        conditions.append(MEMORY_TABLE.c.user_id == bindparam('user_id'))
+    if by_agent:
+        conditions.append(MEMORY_TABLE.c.agent_id == bindparam('agent_id'))
+    if by_memory_type:
+        conditions.append(MEMORY_TABLE.c.memory_type == bindparam('memory_type'))
+    return conditions
+
+def _nearest_memories(
+    columns: List[Any],
+    conditions: List[Any],
+    quantization: str,
+    space: str = 'current',
+    query: Optional[str] = None
+):
+    """
+    The :rerank_candidates nearest memories by the distance the HNSW index serves, the
+    quantized one if configured, with their exact distance for the re-rank.
+    """
+    return (
+        select(*columns, type_coerce(text(_exact_distance(space, query=query)), Float).label('distance'))
+        .where(and_(*conditions))
+        .order_by(text(_quantized_distance(quantization, space, query=query)))
+        .limit(bindparam('rerank_candidates'))
+        .subquery('nearest')
+    )
+
+@lru_cache(maxsize=None)
+def _decayed_memories_statement(
+    by_similarity: bool,
+    by_session: bool,
+    by_user: bool,
+    by_agent: bool,
+    by_memory_type: bool,
+    by_type_weights: bool,
+    quantization: str = 'none',
+    space: str = 'current',
+    fields: Tuple[str, ...] = DEFAULT_MEMORY_FIELDS
+) -> Select:
+    """
+    Rank memories by similarity blended with an exponential recency decay, optionally weighted
+    per memory_type. The score is computed over the :rerank_candidates memories the index
+    returns (nearest, or newest without an embedding), only the top :limit leave the database.
+    The score is returned as similarity.
+    """
+    conditions = _memory_conditions(by_session, by_user, by_agent, by_memory_type)
+    # The candidates carry what the score needs, whether or not it was requested.
+    scored = fields + tuple(f for f in ('created_at', 'updated_at', 'memory_type') if f not in fields)
+    if by_similarity:
+        candidates = _nearest_memories(_memory_columns(space, scored), conditions, quantization, space)
+    else:
+        candidates = (
+            select(*_memory_columns(space, scored))
+            .where(and_(*conditions))
+            .order_by(desc(MEMORY_TABLE.c.created_at))
+            .limit(bindparam('rerank_candidates'))
+            .subquery('newest')
+        )
+
+    # Refreshing a duplicate touches updated_at, a memory that keeps coming up stays fresh.
+    one = literal_column('1')
+    age_seconds = func.extract('epoch', func.now() - func.coalesce(candidates.c.updated_at, candidates.c.created_at))
+    half_life_seconds = bindparam('half_life_hours', type_=Float) * literal_column('3600')
+    decay = func.power(literal_column('0.5'), age_seconds / half_life_seconds)
+
+    if by_similarity:
+        recency_weight = bindparam('recency_weight', type_=Float)
+        score = (one - recency_weight) * (one - candidates.c.distance) + recency_weight * decay
+    else:
+        score = decay
+    if by_type_weights:
+        type_weight = bindparam('memory_type_weights', type_=JSONB).op('->>')(candidates.c.memory_type)
+        score = score * func.coalesce(type_coerce(type_weight, Text).cast(Float), one)
+
+    score = score.label('similarity')
+    return (
+        select(*[candidates.c[field] for field in fields], score)
+        .order_by(desc(score))
+        .limit(bindparam('limit'))
+    )
+
+@lru_cache(maxsize=None)
+def _memories_statement(
+    by_similarity: bool,
+    by_session: bool,
+    by_user: bool,
+    by_agent: bool,
+    by_memory_type: bool,
+    limited: bool,
+    quantization: str = 'none',
+    space: str = 'current',
+    fields: Tuple[str, ...] = DEFAULT_MEMORY_FIELDS
+) -> Select:
+    """Select memories filtered by the given columns, ranked by similarity or recency"""
+    conditions = _memory_conditions(by_session, by_user, by_agent, by_memory_type)
+
+    if by_similarity and limited and quantization != 'none':
+        nearest = _nearest_memories(_memory_columns(space, fields), conditions, quantization, space)
+        return (
+            select(*[column for column in nearest.c if column.name != 'distance'],
+                   label('similarity', literal_column('1') - nearest.c.distance))
+            .order_by(nearest.c.distance)
+            .limit(bindparam('limit'))
+        )
+
+    if by_similarity:
+        query = select(*_memory_columns(space, fields), label('similarity', text(f"1 - ({_exact_distance(space)})")))
+    else:
+        query = select(*_memory_columns(space, fields))
+
+    query = query.where(and_(*conditions))
+
+    if by_similarity:
+        # Order by the bare distance so the HNSW index (vector_cosine_ops) can serve the
+        # ORDER BY ... LIMIT. Ordering by the derived similarity forces a scan and sort.
+        query = query.order_by(text(_exact_distance(space)))
+    else:
+        query = query.order_by(desc(MEMORY_TABLE.c.created_at))
+
+    if limited:
+        query = query.limit(bindparam('limit'))
+    return query
+
+@lru_cache(maxsize=None)
+def _hybrid_memories_statement(
+    by_vector: bool,
+    by_lexical: bool,
+    by_session: bool,
+    by_user: bool,
+    by_agent: bool,
+    by_memory_type: bool,
+    quantization: str = 'none',
+    space: str = 'current',
+    fields: Tuple[str, ...] = DEFAULT_MEMORY_FIELDS
+) -> Select:
+    """
+    Rank memories by vector distance and by full text match in one statement and fuse the two
+    rankings with weighted reciprocal rank fusion. Each search is an index-backed top-k over
+    :candidates rows (HNSW and GIN), only the fused top :limit memories are read in full.
+    The fused score is returned as similarity.
+    """
+    conditions = _memory_conditions(by_session, by_user, by_agent, by_memory_type)
+    ranked = []
+
+    if by_vector and quantization != 'none':
+        nearest = _nearest_memories([MEMORY_TABLE.c.memory_id], conditions, quantization, space)
+        vector_hits = (
+            select(nearest.c.memory_id, func.row_number().over(order_by=nearest.c.distance).label('rank'))
+            .order_by(nearest.c.distance)
+            .limit(bindparam('candidates'))
+            .cte('vector_hits')
+        )
+        ranked.append((vector_hits, bindparam('vector_weight', type_=Float)))
+    elif by_vector:
+        distance = text(_exact_distance(space))
+        vector_hits = (
+            select(MEMORY_TABLE.c.memory_id, func.row_number().over(order_by=distance).label('rank'))
+            .where(and_(*conditions))
+            .order_by(distance)
+            .limit(bindparam('candidates'))
+            .cte('vector_hits')
+        )
+        ranked.append((vector_hits, bindparam('vector_weight', type_=Float)))
+
+    if by_lexical:
+        tsquery = func.websearch_to_tsquery(literal_column(f"'{TEXT_SEARCH_CONFIG}'"), bindparam('query_text'))
+        text_rank = func.ts_rank_cd(MEMORY_TABLE.c.content_tsv, tsquery)
+        lexical_hits = (
+            select(MEMORY_TABLE.c.memory_id, func.row_number().over(order_by=desc(text_rank)).label('rank'))
+            .where(and_(MEMORY_TABLE.c.content_tsv.op('@@')(tsquery), *conditions))
+            .order_by(desc(text_rank))
+            .limit(bindparam('candidates'))
+            .cte('lexical_hits')
+        )
+        ranked.append((lexical_hits, bindparam('lexical_weight', type_=Float)))
+
+    scores = union_all(*[
+        select(hits.c.memory_id, (weight / (literal_column(str(RRF_K)) + hits.c.rank)).label('score'))
+        for hits, weight in ranked
+    ]).subquery('scores')
+    fused = (
+        select(scores.c.memory_id, func.sum(scores.c.score).label('score'))
+        .group_by(scores.c.memory_id)
+        .cte('fused')
+    )
+
+    return (
+        select(*_memory_columns(space, fields), label('similarity', fused.c.score))
+        .select_from(fused.join(MEMORY_TABLE, MEMORY_TABLE.c.memory_id == fused.c.memory_id))
+        # Repeating the filters lets the final lookup prune partitions as well.
+        .where(and_(*conditions))
+        .order_by(desc(fused.c.score))
+        .limit(bindparam('limit'))
+    )
+
+@lru_cache(maxsize=None)
+def _memories_batch_statement(
+    by_session: bool,
+    by_user: bool,
+    by_agent: bool,
+    quantization: str = 'none',
+    space: str = 'current',
+    fields: Tuple[str, ...] = DEFAULT_MEMORY_FIELDS
+) -> Select:
+    """
+    The :limit nearest memories of each of the :embeddings in one statement. The query vectors
+    are unnested with their position and each runs its own index-backed top-k in a LATERAL
+    subquery with the shared filters. Rows carry the position of their query as query_index.
+    """
+    conditions = _memory_conditions(by_session, by_user, by_agent, False)
+    queries = (
+        func.unnest(type_coerce(text("CAST(:embeddings AS vector[])"), NullType()))
+        .table_valued('embedding', with_ordinality='query_position')
+        .render_derived('queries')
+    )
+    query = 'queries.embedding'
+
+    if quantization != 'none':
+        nearest = _nearest_memories(_memory_columns(space, fields), conditions, quantization, space, query)
+        hits = (
+            select(*[column for column in nearest.c if column.name != 'distance'],
+                   label('similarity', literal_column('1') - nearest.c.distance))
+            .order_by(nearest.c.distance)
+            .limit(bindparam('limit'))
+        )
+    else:
+        distance = text(f"({_exact_distance(space, query=query)})")
+        hits = (
+            select(*_memory_columns(space, fields), label('similarity', literal_column('1') - type_coerce(distance, Float)))
+            .where(and_(*conditions))
+            # The bare distance, so the HNSW index serves each top-k like a single search.
+            .order_by(distance)
+            .limit(bindparam('limit'))
+        )
+    hits = hits.lateral('hits')
+
+    return (
+        select((queries.c.query_position - literal_column('1')).label('query_index'), *hits.c)
+        .select_from(queries.join(hits, true()))
+        .order_by(queries.c.query_position, desc(hits.c.similarity))
+    )
+
+@lru_cache(maxsize=None)
+def _memory_insert_statement(dual_write: bool = False) -> Insert:
+    """Insert a memory. The columns are taken from the bound row."""
+    # Bypass the Vector type's text conversion so the pgvector adapter binds the embedding in binary.
+    embeddings = {'embedding': type_coerce(bindparam('embedding'), NullType())}
+    if dual_write:
+        embeddings['embedding_next'] = type_coerce(bindparam('embedding_next'), NullType())
+    return insert(MEMORY_TABLE).values(**embeddings)
+
+@lru_cache(maxsize=None)
+def _memory_batch_insert_statement(dual_write: bool = False) -> Insert:
+    """
+    Insert several memories, executed with a list of rows. RETURNING makes SQLAlchemy send
+    the rows as multi-row VALUES statements instead of one INSERT per row.
+    """
+    return _memory_insert_statement(dual_write).returning(MEMORY_TABLE.c.memory_id)
+
+_MEMORY_WRITE_FIELDS: Tuple[str, ...] = (
+    'memory_id', 'session_id', 'user_id', 'agent_id', 'memory_type',
+    'content', 'embedding_model', 'embedding', 'created_at', 'updated_at'
+)
+_NEXT_EMBEDDING_WRITE_FIELDS: Tuple[str, ...] = ('embedding_next', 'embedding_next_model')
+# Database column names of the embedding fields, for statements written in SQL.
+_EMBEDDING_COLUMN_NAMES: Dict[str, str] = {
+    'embedding': EMBEDDING_COLUMN,
+    'embedding_model': f'{EMBEDDING_COLUMN}_model',
+    'embedding_next': NEXT_EMBEDDING_COLUMN,
+    'embedding_next_model': f'{NEXT_EMBEDDING_COLUMN}_model',
+}
+
+# Postgres types of the write fields, for binding a batch of memories as one array per field.
+_WRITE_FIELD_TYPES: Dict[str, str] = {
+    'memory_id': 'uuid', 'session_id': 'uuid', 'user_id': 'text', 'agent_id': 'uuid', 'memory_type': 'text',
+    'content': 'text', 'embedding_model': 'text', 'embedding': 'vector', 'created_at': 'timestamptz',
+    'updated_at': 'timestamptz', 'summary': 'text', 'embedding_next': 'vector', 'embedding_next_model': 'text',
+}
+
+def _dedup_param(space: str) -> str:
+    """
+    Duplicates are searched in the space searches read, with the new memory's embedding of that
+    space. The bind is the memory row field, whichever column the space lives in.
+    """
+    return 'embedding_next' if space == 'next' else 'embedding'
+
+def _duplicate_search(quantization: str, space: str, param: str, user_id: str, query: Optional[str] = None) -> str:
+    """
+    The nearest memory of user_id within :max_distance of the :param vector, or the query
+    expression. The usual index-backed nearest neighbour query, so it costs about a top-1 search.
+    """
+    exact_distance = _exact_distance(space, param, query)
+    if quantization == 'none':
+        return f"""
+        SELECT memory_id, user_id FROM memory
+        WHERE user_id = {user_id} AND ({exact_distance}) <= :max_distance
+        ORDER BY {exact_distance}
+        LIMIT 1"""
+    return f"""
+        SELECT memory_id, user_id FROM (
+            SELECT memory_id, user_id, {exact_distance} AS distance FROM memory
+            WHERE user_id = {user_id}
+            ORDER BY {_quantized_distance(quantization, space, param, query)}
+            LIMIT :rerank_candidates
+        ) AS nearest
+        WHERE distance <= :max_distance
+        ORDER BY distance
+        LIMIT 1"""
+
+@lru_cache(maxsize=None)
+def _memory_dedup_statement(
+    quantization: str,
+    append_content: bool,
+    space: str = 'current',
+    dual_write: bool = False
+) -> TextClause:
+    """
+    Insert a memory unless the user already has one within :max_distance, in which case that
+    memory is refreshed instead. The duplicate search is the usual index-backed nearest
+    neighbour query for one row, so the check costs about as much as a top-1 search.
+    Returns the written memory with deduplicated telling which of the two happened.
+    """
+    duplicate = _duplicate_search(quantization, space, _dedup_param(space), ':user_id')
+    content_update = ", content = memory.content || E'\\n' || :content" if append_content else ""
+    fields = _MEMORY_WRITE_FIELDS + ('summary',) + (_NEXT_EMBEDDING_WRITE_FIELDS if dual_write else ())
+    columns = [_EMBEDDING_COLUMN_NAMES.get(field, field) for field in fields]
+    next_values = ", :embedding_next, :embedding_next_model" if dual_write else ""
+
+    return text(f"""
+    WITH duplicate AS ({duplicate}
+    ),
+    refreshed AS (
+        UPDATE memory SET updated_at = now(){content_update}
+        FROM duplicate
+        WHERE memory.user_id = duplicate.user_id AND memory.memory_id = duplicate.memory_id
+        RETURNING memory.memory_id, memory.content, memory.created_at, memory.updated_at
+    ),
+    inserted AS (
+        INSERT INTO memory ({', '.join(columns)})
+        SELECT CAST(:memory_id AS UUID), CAST(:session_id AS UUID), :user_id, CAST(:agent_id AS UUID),
+               :memory_type, :content, :embedding_model, :embedding, :created_at, :updated_at, :summary{next_values}
+        WHERE NOT EXISTS (SELECT 1 FROM duplicate)
+        RETURNING memory_id, content, created_at, updated_at
+    )
+    SELECT *, true AS deduplicated FROM refreshed
+    UNION ALL
+    SELECT *, false AS deduplicated FROM inserted
+    """)
+
+@lru_cache(maxsize=None)
+def _memory_batch_dedup_statement(
+    quantization: str,
+    append_content: bool,
+    space: str = 'current',
+    dual_write: bool = False
+) -> TextClause:
+    """
+    The dedup statement for a batch of memories, bound as one array per field and unnested
+    with their 1-based position. :batch_leader holds the position of the memory each one is
+    stored as: its own, or that of an earlier near duplicate in the batch. Only the leaders
+    are searched for a duplicate, then inserted or refresh it. Returns one row per memory in
+    batch order, a memory folded into its leader counts as deduplicated.
+    """
+    param = _dedup_param(space)
+    fields = _MEMORY_WRITE_FIELDS + ('summary',) + (_NEXT_EMBEDDING_WRITE_FIELDS if dual_write else ())
+    arrays = ', '.join(f"CAST(:{field} AS {_WRITE_FIELD_TYPES[field]}[])" for field in fields)
+    duplicate = _duplicate_search(quantization, space, param, 'leaders.user_id', f'leaders.{param}')
+    columns = ', '.join(_EMBEDDING_COLUMN_NAMES.get(field, field) for field in fields)
+    content_update = ", content = memory.content || E'\\n' || matched.content" if append_content else ""
+
+    return text(f"""
+    WITH batch AS (
+        SELECT * FROM unnest({arrays}, CAST(:batch_leader AS int[]))
+            WITH ORDINALITY AS batch({', '.join(fields)}, batch_leader, batch_position)
+    ),
+    leaders AS (
+        SELECT * FROM batch WHERE batch_leader = batch_position
+    ),
+    duplicate AS (
+        SELECT leaders.batch_position, leaders.content, nearest.memory_id, nearest.user_id
+        FROM leaders CROSS JOIN LATERAL ({duplicate}
+        ) AS nearest
+    ),
+    matched AS (
+        SELECT memory_id, user_id, string_agg(content, E'\\n' ORDER BY batch_position) AS content
+        FROM duplicate
+        GROUP BY memory_id, user_id
+    ),
+    refreshed AS (
+        UPDATE memory SET updated_at = now(){content_update}
+        FROM matched
+        WHERE memory.user_id = matched.user_id AND memory.memory_id = matched.memory_id
+        RETURNING memory.memory_id, memory.content, memory.created_at, memory.updated_at
+    ),
+    inserted AS (
+        INSERT INTO memory ({columns})
+        SELECT {', '.join(fields)} FROM leaders
+        WHERE NOT EXISTS (SELECT 1 FROM duplicate WHERE duplicate.batch_position = leaders.batch_position)
+        RETURNING memory_id, content, created_at, updated_at
+    ),
+    stored AS (
+        SELECT duplicate.batch_position, refreshed.*, true AS deduplicated
+        FROM duplicate JOIN refreshed ON refreshed.memory_id = duplicate.memory_id
+        UNION ALL
+        SELECT leaders.batch_position, inserted.*, false AS deduplicated
+        FROM leaders JOIN inserted ON inserted.memory_id = leaders.memory_id
+    )
+    SELECT batch.batch_position, stored.memory_id, stored.content, stored.created_at, stored.updated_at,
+           stored.deduplicated OR batch.batch_leader <> batch.batch_position AS deduplicated
+    FROM batch JOIN stored ON stored.batch_position = batch.batch_leader
+    ORDER BY batch.batch_position
+    """)
+
+@lru_cache(maxsize=None)
+def _watermark_statement() -> Select:
+    """Extraction watermarks of a list of sessions"""
+    w = MEMORY_WATERMARK_TABLE.c
+    return select(w.session_id, w.message_count).where(w.session_id == any_(bindparam('session_ids')))
+
+@lru_cache(maxsize=None)
+def _watermark_upsert_statement() -> Insert:
+    """
+    Advance the watermark of a session. It never moves back, e.g. for a job with an older
+    transcript. Returns the sessions it advanced: the row lock of the upsert orders concurrent
+    extractions of a session, one that distilled no more messages than the last gets no row.
+    """
+    stmt = insert(MEMORY_WATERMARK_TABLE).values(
+        session_id=bindparam('session_id'),
+        user_id=bindparam('user_id'),
+        message_count=bindparam('message_count')
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=['session_id'],
+        set_={'message_count': stmt.excluded.message_count, 'updated_at': func.now()},
+        where=MEMORY_WATERMARK_TABLE.c.message_count < stmt.excluded.message_count
+    ).returning(MEMORY_WATERMARK_TABLE.c.session_id)
+
+def clear_statement_cache() -> None:
+    """Drop the cached statements, e.g. after the table definitions were patched in tests"""
+    _session_context_statement.cache_clear()
+    _session_list_statement.cache_clear()
+    _session_context_upsert_statement.cache_clear()
+    _session_message_append_statement.cache_clear()
+    _memories_statement.cache_clear()
+    _hybrid_memories_statement.cache_clear()
+    _decayed_memories_statement.cache_clear()
+    _memories_batch_statement.cache_clear()
+    _memory_insert_statement.cache_clear()
+    _memory_batch_insert_statement.cache_clear()
+    _memory_dedup_statement.cache_clear()
+    _memory_batch_dedup_statement.cache_clear()
+    _watermark_statement.cache_clear()
+    _watermark_upsert_statement.cache_clear()
 
 class PGMemoryClient:
 
@@ -79,169 +879,541 @@ class PGMemoryClient:
         """
         Retrieves session contexts based on user_id or session_id using SQLAlchemy Core.
         """
-        logger.info(f"Getting session context for request: {request}")
-
-        # Start with a base query selecting all columns
-        query = select(SESSION_CONTEXT_TABLE)
-        # Build conditions list
-        conditions = []
-        # Add conditions based on request parameters
-        if request.session_id:
-            conditions.append(SESSION_CONTEXT_TABLE.c.session_id == request.session_id)
+        logger.debug("Getting session context for request: %s", request)
+        query, params = cls._build_session_context_query(request)
+        keys = consistency_keys(request.session_id, request.user_id)
         
-        if request.user_id:
-            conditions.append(SESSION_CONTEXT_TABLE.c.user_id == request.user_id)
-        
-        # Add all conditions to the query if any exist
-        query = query.where(and_(*conditions))
-        # Add ordering
-        query = query.order_by(desc(SESSION_CONTEXT_TABLE.c.created_at))
-        
-        # Add limit if specified
-        if hasattr(request, 'limit') and request.limit:
-            query = query.limit(request.limit)
-        
-        # Execute the query
-        with read_db.connect() as conn:
-            result = conn.execute(query)
-            session_contexts = [dict(row._mapping) for row in result]
-
-        logger.debug(session_contexts)
+        session_contexts = cls._read_rows(query, params, keys, WorkloadProfile.INTERACTIVE_READ)
+        return cls._to_session_context_response(session_contexts, request.last_n_messages)
+    
+    @classmethod
+    def list_sessions(cls, request: ListSessionsRequest) -> ListSessionsResponse:
+        """
+        Lists a user's sessions newest first with keyset pagination. Returns metadata only.
+        """
+        query, params = cls._build_session_list_query(request)
+        keys = consistency_keys(None, request.user_id)
 
-        # Convert UUID objects to strings
-        for context in session_contexts:
-            if 'session_id' in context and isinstance(context['session_id'], uuid.UUID):
-                context['session_id'] = str(context['session_id'])
+        sessions = cls._read_rows(query, params, keys, WorkloadProfile.INTERACTIVE_READ)
+        return cls._to_session_list_response(sessions, request.limit)
 
-        contexts: List[SessionContext] = [SessionContext(**c) for c in session_contexts]
-        return GetSessionContextResponse(results=contexts)
-    
     @classmethod
     def upsert_session_context(cls, request: UpsertSessionContextRequest) -> UpsertSessionContextResponse:
         """
         Upserts a session context using SQLAlchemy's PostgreSQL dialect.
         Updates all non-primary key fields on conflict.
         """
-        # Get data as a JSON-serializable dict
-        data = json.loads(request.session_context.model_dump_json())
-        logger.info(f"Upserting session context: {data}")
+        stmt, params = cls._build_session_context_upsert(request)
+        session_context = request.session_context
         
         with write_db.connect() as conn:
-            # Create the upsert statement in one clean chain
-            stmt = insert(SESSION_CONTEXT_TABLE).values(data)
-            
-            # Set up on_conflict to update all fields except primary key and created_at
-            stmt = stmt.on_conflict_do_update(
-                index_elements=['session_id'],
-                set_={
-                    'user_id': data.get('user_id'),
-                    'agent_id': data.get('agent_id'),
-                    'system_prompt': data.get('system_prompt'),
-                    'messages': data.get('messages'),
-                    'session_metadata': data.get('session_metadata'),
-                    'updated_at': func.now()
-                }
-            )
-            
-            conn.execute(stmt)
+            conn.execute(stmt, params)
             conn.commit()
-            logger.info(f"Executed stmt: {stmt}")
+            logger.debug("Upserted session context %s", session_context.session_id)
+            get_db().read_your_writes.record_write(
+                conn, consistency_keys(session_context.session_id, session_context.user_id)
+            )
         
         return UpsertSessionContextResponse(session_context=request.session_context)
 
+    @classmethod
+    def append_session_messages(cls, request: AppendSessionMessagesRequest) -> AppendSessionMessagesResponse:
+        """
+        Appends the new messages of a turn as session_message rows. Only the new
+        messages are written, the existing conversation isn't touched.
+        """
+        stmt, params = cls._build_session_message_append(request)
+
+        with write_db.connect() as conn:
+            sequences = [row.sequence for row in conn.execute(stmt, params)]
+            conn.commit()
+            logger.debug("Appended %d messages to session %s", len(sequences), request.session_id)
+            get_db().read_your_writes.record_write(conn, consistency_keys(request.session_id, request.user_id))
+
+        return cls._to_append_response(request, sequences)
+
     @classmethod
     def get_memories(cls, request: GetMemoriesRequest) -> GetMemoriesResponse:
         """
         Retrieves memories based on user_id, session_id, or agent_id using SQLAlchemy Core.
         """
-        # Start with a base query selecting all columns
-        if request.embedding:
-            # Use raw SQL expression for cosine distance calculation
-            from sqlalchemy.sql import text
-            
-            # Create a properly aliased similarity expression with parameters
-            from sqlalchemy import label
-            similarity_expr = text("1 - (memory.embedding <=> :embedding)").bindparams(embedding=str(request.embedding))
-            # Use the label function from sqlalchemy instead of as a method
-            query = select(MEMORY_TABLE, label('similarity', similarity_expr))
-        else:
-            query = select(MEMORY_TABLE)
-
-        # Build conditions list
-        conditions = []
-        if request.session_id:
-            conditions.append(MEMORY_TABLE.c.session_id == request.session_id)
-        if request.user_id:
-            conditions.append(MEMORY_TABLE.c.user_id == request.user_id)
-        if request.agent_id:
-            # Convert agent_id to UUID if it's not already a UUID
-            agent_id = request.agent_id
-            if agent_id and not isinstance(agent_id, uuid.UUID):
-                try:
-                    agent_id = uuid.UUID(agent_id)
-                except ValueError:
-                    # If agent_id is not a valid UUID string, generate a new UUID based on the string
-                    agent_id = uuid.uuid5(uuid.NAMESPACE_DNS, agent_id)
-            conditions.append(MEMORY_TABLE.c.agent_id == agent_id)
-
-        # Add memory_type condition if present
-        if hasattr(request, 'memory_type') and request.memory_type:
-            conditions.append(MEMORY_TABLE.c.memory_type == request.memory_type)
-        
-        # Add all conditions to the query if any exist
-        query = query.where(and_(*conditions))
-        # Add ordering
-        if request.embedding:
-            # Use the desc function directly instead of as a method
-            query = query.order_by(desc(text('similarity')))
-        else:
-            query = query.order_by(desc(MEMORY_TABLE.c.created_at))
-        
-        # Add limit if specified    
-        if hasattr(request, 'limit') and request.limit:
-            query = query.limit(request.limit)
-        
-        # Execute the query
-        with read_db.connect() as conn:
-            print(f"Executing query {query}")
-            result = conn.execute(query)
-            memories = [dict(row._mapping) for row in result]
+        query, params = cls._build_memories_query(request)
+        keys = consistency_keys(request.session_id, request.user_id)
         
-        # Convert UUID objects to strings
-        for memory in memories:
-            if 'memory_id' in memory and isinstance(memory['memory_id'], uuid.UUID):
-                memory['memory_id'] = str(memory['memory_id'])
-            if 'session_id' in memory and isinstance(memory['session_id'], uuid.UUID):
-                memory['session_id'] = str(memory['session_id'])
-            if 'agent_id' in memory and isinstance(memory['agent_id'], uuid.UUID):
-                memory['agent_id'] = str(memory['agent_id'])
-        
-        memory_objects = [Memory(**m) for m in memories]
-        return GetMemoriesResponse(memories=memory_objects)
+        memories = cls._read_rows(query, params, keys, cls._memories_profile(request), cls._to_memory_view)
+        return GetMemoriesResponse(memories=memories)
+
+    @classmethod
+    def get_memories_batch(cls, request: GetMemoriesBatchRequest) -> GetMemoriesBatchResponse:
+        """
+        Runs a similarity search per query embedding with shared filters in one statement.
+        """
+        query, params = cls._build_memories_batch_query(request)
+        keys = consistency_keys(request.session_id, request.user_id)
+
+        rows = cls._read_rows(query, params, keys, WorkloadProfile.VECTOR_SEARCH, cls._to_indexed_memory_view)
+        return cls._to_memories_batch_response(rows, len(request.embeddings))
 
     @classmethod
     def create_memory(cls, request: CreateMemoryRequest) -> CreateMemoryResponse:
         """
         This class is interesting. We first need to call an LLM to get something "embeddable" from the history.
         Then we need to store the history, and then we need to embed the history and store the embedding.
+        Only the messages after the session's extraction watermark go to the LLM.
+        """
+        watermark_stmt, watermark_params = cls._build_watermark_query([request.session_id])
+        with write_db.connect() as conn:
+            watermarks = cls._to_watermarks(conn.execute(watermark_stmt, watermark_params))
+
+        memory: Memory = cls._extract_memory(request, watermarks.get(request.session_id))
+        stmt, params, deduplicating = cls._build_memory_write(memory)
+            
+        with write_db.connect() as conn:
+            # The watermark goes first, an extraction that lost the race for the session writes nothing.
+            if conn.execute(_watermark_upsert_statement(), cls._watermark_row(request)).first() is None:
+                conn.rollback()
+                raise cls._superseded(request)
+            result = conn.execute(stmt, params)
+            rows = list(result) if deduplicating else []
+            conn.commit()
+            get_db().read_your_writes.record_write(conn, consistency_keys(memory.session_id, memory.user_id))
+
+        return cls._to_create_memory_response(memory, rows)
+
+    ##########################################################################
+    # Backfills. One COPY per batch instead of one INSERT and commit per row.
+    ##########################################################################
+
+    @classmethod
+    def bulk_load_memories(
+        cls,
+        memories: Iterable[Memory],
+        batch_size: int = 10000,
+        use_staging: bool = False,
+        on_progress: Optional[Callable[[BulkLoadProgress], None]] = None
+    ) -> BulkLoadProgress:
+        """Backfill already embedded memories. Memories are streamed, the iterable can be a generator."""
+        rows = (cls._to_memory_row(memory) for memory in memories)
+        return cls._bulk_load(MEMORY_TABLE, rows, batch_size, use_staging, on_progress)
+
+    @classmethod
+    def bulk_load_session_contexts(
+        cls,
+        session_contexts: Iterable[SessionContext],
+        batch_size: int = 10000,
+        use_staging: bool = False,
+        on_progress: Optional[Callable[[BulkLoadProgress], None]] = None
+    ) -> BulkLoadProgress:
+        """Backfill session contexts. With use_staging existing sessions are updated."""
+        rows = (
+            cls._build_session_context_upsert(UpsertSessionContextRequest(session_context=context))[1]
+            for context in session_contexts
+        )
+        return cls._bulk_load(SESSION_CONTEXT_TABLE, rows, batch_size, use_staging, on_progress)
+
+    @classmethod
+    def _bulk_load(
+        cls,
+        table: Table,
+        rows: Iterable[Dict[str, Any]],
+        batch_size: int,
+        use_staging: bool,
+        on_progress: Optional[Callable[[BulkLoadProgress], None]]
+    ) -> BulkLoadProgress:
+        engine = get_db().create_bulk_engine()
+        try:
+            loader = BulkLoader(engine, batch_size=batch_size, use_staging=use_staging, on_progress=on_progress)
+            return loader.load(table, rows)
+        finally:
+            engine.dispose()
+
+    @classmethod
+    @retry_on_disconnect
+    def _read_rows(
+        cls,
+        query: Select,
+        params: Dict[str, Any],
+        keys: List[str],
+        profile: WorkloadProfile,
+        to_row: Optional[Callable[[Any], Any]] = None
+    ) -> List[Any]:
+        """
+        Run a read on the reader, or on the writer if the reader hasn't caught up with our last
+        write. Rows are converted by to_row, into dicts by default.
+        """
+        to_row = to_row or _row_dict
+        with session_profile(profile):
+            with get_db().read_your_writes.read_connection(read_db, write_db, keys) as conn:
+                result = conn.execute(query, params)
+                return [to_row(row) for row in result]
+
+    ##########################################################################
+    # Statement builders and row converters. These are shared with the
+    # AsyncPGMemoryClient so both clients issue exactly the same SQL.
+    ##########################################################################
+
+    @classmethod
+    def _build_session_context_query(cls, request: GetSessionContextRequest) -> Tuple[Select, Dict[str, Any]]:
+        """Pick the cached select for get_session_context and bind the request values."""
+        params: Dict[str, Any] = {}
+        if request.session_id:
+            params['session_id'] = request.session_id
+        if request.user_id:
+            params['user_id'] = request.user_id
+        if request.last_n_messages:
+            params['last_n_messages'] = request.last_n_messages
+
+        query = _session_context_statement(
+            by_session='session_id' in params,
+            by_user='user_id' in params,
+            windowed='last_n_messages' in params
+        )
+        return query, params
+
+    @classmethod
+    def _to_session_context_response(
+        cls,
+        session_contexts: List[Dict[str, Any]],
+        last_n_messages: Optional[int] = None
+    ) -> GetSessionContextResponse:
+        """Convert session_context rows into the API response."""
+        # Convert UUID objects to strings
+        for context in session_contexts:
+            if 'session_id' in context and isinstance(context['session_id'], uuid.UUID):
+                context['session_id'] = str(context['session_id'])
+
+            # Appended messages follow the ones stored with the last full upsert.
+            messages = list(context.get('messages') or []) + list(context.pop('appended_messages', None) or [])
+            context['messages'] = decode_messages(messages[-last_n_messages:] if last_n_messages else messages)
+
+        contexts: List[SessionContext] = [SessionContext(**c) for c in session_contexts]
+        return GetSessionContextResponse(results=contexts)
+
+    @classmethod
+    def _build_session_list_query(cls, request: ListSessionsRequest) -> Tuple[Select, Dict[str, Any]]:
+        """Pick the cached listing select. One extra row is fetched to tell if there is a next page."""
+        params: Dict[str, Any] = {'user_id': request.user_id, 'limit': request.limit + 1}
+        if request.cursor:
+            params['cursor_created_at'], params['cursor_session_id'] = cls._decode_cursor(request.cursor)
+
+        return _session_list_statement(paged=request.cursor is not None), params
+
+    @classmethod
+    def _to_session_list_response(cls, sessions: List[Dict[str, Any]], limit: int) -> ListSessionsResponse:
+        """Convert listing rows into the API response."""
+        page = sessions[:limit]
+        for session in page:
+            session['session_id'] = str(session['session_id'])
+
+        next_cursor = None
+        if len(sessions) > limit:
+            last = page[-1]
+            next_cursor = cls._encode_cursor(last['created_at'], last['session_id'])
+        return ListSessionsResponse(sessions=[SessionSummary(**s) for s in page], next_cursor=next_cursor)
+
+    @classmethod
+    def _encode_cursor(cls, created_at: datetime, session_id: str) -> str:
+        """Opaque cursor holding the keyset position of the last session of a page."""
+        position = f"{created_at.isoformat()}|{session_id}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    @classmethod
+    def _decode_cursor(cls, cursor: str) -> Tuple[datetime, uuid.UUID]:
+        try:
+            created_at, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return datetime.fromisoformat(created_at), uuid.UUID(session_id)
+        except ValueError as e:
+            raise ValueError(f"Invalid session cursor: {cursor}") from e
+
+    @classmethod
+    def _build_session_context_upsert(cls, request: UpsertSessionContextRequest) -> Tuple[Insert, Dict[str, Any]]:
+        """Pick the cached upsert for upsert_session_context and bind the session context."""
+        # Get data as a JSON-serializable dict
+        data = json.loads(request.session_context.model_dump_json())
+        params = {field: data.get(field) for field in _SESSION_CONTEXT_FIELDS}
+        params['messages'] = cls._encode_messages(params['messages'] or [])
+        return _session_context_upsert_statement(), params
+
+    @classmethod
+    def _build_session_message_append(cls, request: AppendSessionMessagesRequest) -> Tuple[Insert, Dict[str, Any]]:
+        """Pick the cached append statement and bind the new messages as one JSONB array."""
+        params = {
+            'session_id': request.session_id,
+            'user_id': request.user_id,
+            'agent_id': request.agent_id,
+            'messages': cls._encode_messages([json.loads(message.model_dump_json()) for message in request.messages]),
+            'message_count': len(request.messages)
+        }
+        return _session_message_append_statement(), params
+
+    @classmethod
+    def _encode_messages(cls, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Storage form of JSON-mode message dumps. Reads decode either form."""
+        if SESSION_MESSAGE_ENCODING == 'json':
+            return messages
+        return encode_messages(messages)
+
+    @classmethod
+    def _to_append_response(cls, request: AppendSessionMessagesRequest, sequences: List[int]) -> AppendSessionMessagesResponse:
+        """RETURNING doesn't guarantee row order, the sequences are consecutive either way."""
+        return AppendSessionMessagesResponse(
+            session_id=request.session_id,
+            first_sequence=min(sequences),
+            last_sequence=max(sequences)
+        )
+
+    @classmethod
+    def _build_memories_query(cls, request: GetMemoriesRequest) -> Tuple[Select, Dict[str, Any]]:
+        """Pick the cached select for get_memories and bind the request values."""
+        params: Dict[str, Any] = {}
+        if request.embedding:
+            # Bound in binary by the pgvector adapter from a float32 buffer, not formatted as text.
+            params['embedding'] = PGVector(request.embedding)
+        if request.session_id:
+            params['session_id'] = request.session_id
+        if request.user_id:
+            params['user_id'] = request.user_id
+        if request.agent_id:
+            params['agent_id'] = cls._to_agent_uuid(request.agent_id)
+        memory_type = getattr(request, 'memory_type', None)
+        if memory_type:
+            params['memory_type'] = memory_type
+        if getattr(request, 'limit', None):
+            params['limit'] = request.limit
+        space = cls._search_space(request.embedding)
+        fields = cls._memory_fields(request)
+
+        if request.query_text:
+            return cls._build_hybrid_memories_query(request, params, space, fields)
+        if request.recency_half_life_hours:
+            return cls._build_decayed_memories_query(request, params, space, fields)
+
+        query = _memories_statement(
+            by_similarity='embedding' in params,
+            by_session='session_id' in params,
+            by_user='user_id' in params,
+            by_agent='agent_id' in params,
+            by_memory_type='memory_type' in params,
+            limited='limit' in params,
+            quantization=EMBEDDING_QUANTIZATION,
+            space=space,
+            fields=fields
+        )
+        if 'embedding' in params and 'limit' in params and EMBEDDING_QUANTIZATION != 'none':
+            params['rerank_candidates'] = params['limit'] * RERANK_FACTOR
+        return query, params
+
+    @classmethod
+    def _build_hybrid_memories_query(
+        cls,
+        request: GetMemoriesRequest,
+        params: Dict[str, Any],
+        space: str = 'current',
+        fields: Tuple[str, ...] = DEFAULT_MEMORY_FIELDS
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """Pick the cached fused select for a text query, with or without an embedding."""
+        by_vector = 'embedding' in params and request.vector_weight > 0
+        by_lexical = request.lexical_weight > 0 or not by_vector
+        if not by_vector:
+            params.pop('embedding', None)
+
+        params['query_text'] = request.query_text
+        params.setdefault('limit', 2)
+        params['candidates'] = max(params['limit'] * HYBRID_CANDIDATE_FACTOR, HYBRID_MIN_CANDIDATES)
+        if by_vector:
+            params['vector_weight'] = request.vector_weight
+            if EMBEDDING_QUANTIZATION != 'none':
+                params['rerank_candidates'] = params['candidates'] * RERANK_FACTOR
+        if by_lexical:
+            params['lexical_weight'] = request.lexical_weight or 1.0
+
+        query = _hybrid_memories_statement(
+            by_vector=by_vector,
+            by_lexical=by_lexical,
+            by_session='session_id' in params,
+            by_user='user_id' in params,
+            by_agent='agent_id' in params,
+            by_memory_type='memory_type' in params,
+            quantization=EMBEDDING_QUANTIZATION,
+            space=space,
+            fields=fields
+        )
+        return query, params
+
+    @classmethod
+    def _build_decayed_memories_query(
+        cls,
+        request: GetMemoriesRequest,
+        params: Dict[str, Any],
+        space: str = 'current',
+        fields: Tuple[str, ...] = DEFAULT_MEMORY_FIELDS
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """Pick the cached recency-decayed select and bind the scoring parameters."""
+        params.setdefault('limit', 2)
+        params['rerank_candidates'] = params['limit'] * RECENCY_CANDIDATE_FACTOR
+        params['half_life_hours'] = request.recency_half_life_hours
+        if 'embedding' in params:
+            params['recency_weight'] = request.recency_weight
+        if request.memory_type_weights:
+            params['memory_type_weights'] = request.memory_type_weights
+
+        query = _decayed_memories_statement(
+            by_similarity='embedding' in params,
+            by_session='session_id' in params,
+            by_user='user_id' in params,
+            by_agent='agent_id' in params,
+            by_memory_type='memory_type' in params,
+            by_type_weights='memory_type_weights' in params,
+            quantization=EMBEDDING_QUANTIZATION,
+            space=space,
+            fields=fields
+        )
+        return query, params
+
+    @classmethod
+    def _build_memories_batch_query(cls, request: GetMemoriesBatchRequest) -> Tuple[Select, Dict[str, Any]]:
+        """Pick the cached LATERAL select for a batch of searches and bind the query embeddings."""
+        params: Dict[str, Any] = {
+            'embeddings': [PGVector(embedding) for embedding in request.embeddings],
+            'limit': request.limit
+        }
+        if request.session_id:
+            params['session_id'] = request.session_id
+        if request.user_id:
+            params['user_id'] = request.user_id
+        if request.agent_id:
+            params['agent_id'] = cls._to_agent_uuid(request.agent_id)
+        if EMBEDDING_QUANTIZATION != 'none':
+            params['rerank_candidates'] = request.limit * RERANK_FACTOR
+
+        query = _memories_batch_statement(
+            by_session='session_id' in params,
+            by_user='user_id' in params,
+            by_agent='agent_id' in params,
+            quantization=EMBEDDING_QUANTIZATION,
+            # The embeddings all have the same dimensions, the first one tells the space.
+            space=cls._search_space(request.embeddings[0]),
+            fields=cls._memory_fields(request)
+        )
+        return query, params
+
+    @classmethod
+    def _search_space(cls, embedding: Optional[List[float]]) -> str:
+        """
+        Embedding space a search reads. During an embedding migration to other dimensions the
+        query embedding's size tells which model produced it, so callers can switch models
+        independently of the gateway. With equal sizes the migration phase decides.
+        """
+        if not NEXT_EMBEDDING_MODEL:
+            return 'current'
+        if embedding and NEXT_EMBEDDING_DIMENSIONS != EMBEDDING_DIMENSIONS:
+            return 'next' if len(embedding) == NEXT_EMBEDDING_DIMENSIONS else 'current'
+        return 'next' if EMBEDDING_MIGRATION_PHASE == 'cutover' else 'current'
+
+    @classmethod
+    def _memories_profile(cls, request: GetMemoriesRequest) -> WorkloadProfile:
+        """Ranked searches get the tuned search session, plain lookups the interactive one."""
+        return WorkloadProfile.VECTOR_SEARCH if request.embedding or request.query_text else WorkloadProfile.INTERACTIVE_READ
+
+    @classmethod
+    def _memory_fields(cls, request: Union[GetMemoriesRequest, GetMemoriesBatchRequest]) -> Tuple[str, ...]:
+        """Requested fields in a fixed order, so equal projections share a cached statement."""
+        if not request.fields:
+            return DEFAULT_MEMORY_FIELDS
+        return tuple(field for field in MEMORY_FIELDS if field in request.fields)
+
+    @classmethod
+    def _to_memory_view(cls, row: Any) -> MemoryView:
+        """
+        A memory row as returned by the memory statements. The query already returns the
+        response types, so the row is taken as is without validating it again.
+        """
+        return MemoryView.model_construct(**row._mapping)
+
+    @classmethod
+    def _to_indexed_memory_view(cls, row: Any) -> Tuple[int, MemoryView]:
+        """A row of the batch statement with the position of the query embedding it matched."""
+        return row.query_index, MemoryView.model_construct(**row._mapping)
+
+    @classmethod
+    def _to_memories_batch_response(cls, rows: List[Tuple[int, MemoryView]], queries: int) -> GetMemoriesBatchResponse:
+        """Group the rows into one result per query embedding, empty for a query without matches."""
+        results: List[List[MemoryView]] = [[] for _ in range(queries)]
+        for query_index, memory in rows:
+            results[query_index].append(memory)
+        return GetMemoriesBatchResponse(results=[GetMemoriesResponse(memories=memories) for memories in results])
+
+    @classmethod
+    def _to_agent_uuid(cls, agent_id: Any) -> uuid.UUID:
+        """Convert agent_id to UUID if it's not already a UUID"""
+        if agent_id and not isinstance(agent_id, uuid.UUID):
+            try:
+                agent_id = uuid.UUID(agent_id)
+            except ValueError:
+                # If agent_id is not a valid UUID string, generate a new UUID based on the string
+                agent_id = uuid.uuid5(uuid.NAMESPACE_DNS, agent_id)
+        return agent_id
+
+    @classmethod
+    def _extract_memory(cls, request: CreateMemoryRequest, watermark: Optional[int] = None) -> Memory:
+        """
+        Distill the new messages of the session into a memory with the LLM and embed it.
+        These are blocking HTTP calls to the LLM gateway.
+        """
+        transcript: str = cls._extraction_transcript(request, watermark)
+        memory_content: str = cls._summarize_session(transcript)
+
+        embedding_request: EmbedRequest = EmbedRequest(
+            text=memory_content,
+            model_id=EMBEDDING_MODEL,
+            dimensions=EMBEDDING_DIMENSIONS
+        )
+
+        # No need to set auth token in local environment as the BedrockGatewayClient
+        # will now use IAM credentials directly
+            
+        embedding_response: EmbedResponse = LLMGatewayClient.embed_invoke(embedding_request)
+
+        # Dual write during an embedding migration, new memories don't need the backfill.
+        embedding_next: Optional[List[float]] = None
+        if NEXT_EMBEDDING_MODEL:
+            embedding_next = LLMGatewayClient.embed_invoke(EmbedRequest(
+                text=memory_content,
+                model_id=NEXT_EMBEDDING_MODEL,
+                dimensions=NEXT_EMBEDDING_DIMENSIONS
+            )).embedding
+
+        return cls._to_new_memory(request, memory_content, embedding_response.embedding, embedding_next)
+
+    @classmethod
+    def _extraction_transcript(cls, request: CreateMemoryRequest, watermark: Optional[int] = None) -> str:
+        """
+        JSON of the messages to distill: those after the watermark, preceded by up to
+        EXTRACTION_OVERLAP_MESSAGES already distilled ones. The whole session without a watermark.
         """
         logger.info(f"Creating memory for request: {request}")
 
-        # Get the session context from the request
-        session_context: SessionContext = request.session_context
-        if not request.session_context.get_messages():
+        messages: List[Message] = request.session_context.get_messages()
+        if not messages:
             raise ValueError("No messages found in session context")
-        
-        # Convert the messages to a JSON string
+
+        if watermark is not None:
+            if watermark >= len(messages):
+                raise NothingToExtract(f"No messages in session {request.session_id} since the last memory extraction")
+            messages = messages[max(0, watermark - EXTRACTION_OVERLAP_MESSAGES):]
+
         # First convert Message objects to dictionaries using model_dump()
-        messages_dict = [message.model_dump() for message in request.session_context.get_messages()]
-        interaction_json: str = json.dumps(messages_dict)
-        logger.info(f"Interaction JSON: {interaction_json}")
+        return json.dumps([message.model_dump() for message in messages])
+
+    @classmethod
+    def _summarize_session(cls, transcript: str) -> str:
+        """The embeddable memory of a transcript, distilled by the LLM."""
+        logger.info(f"Interaction JSON: {transcript}")
 
         # Construct our memory prompt from our prompt library.
         # Note: This prompt returns XML which we need to regex out before embedding it.
         memory_prompt: CreateMemoryPrompt = CreateMemoryPrompt(
-            inputs={"interaction_json": interaction_json}
+            inputs={"interaction_json": transcript}
         )
         logger.info(f"Memory prompt: {memory_prompt}")
         
@@ -264,40 +1436,168 @@ class PGMemoryClient:
 
         if not memory_content:
             raise Exception("No memory content found in LLM response")
+        return memory_content
 
-        embedding_request: EmbedRequest = EmbedRequest(
-            text=memory_content,
-            model_id=EMBEDDING_MODEL
-        )
+    @classmethod
+    def _embed_contents(cls, contents: List[str]) -> Tuple[List[List[float]], Optional[List[List[float]]]]:
+        """
+        Embed several memories with one request per embedding model. Returns their embeddings
+        and, during an embedding migration, their embeddings in the next space.
+        """
+        embeddings = LLMGatewayClient.embed_batch_invoke(EmbedBatchRequest(
+            texts=contents,
+            model_id=EMBEDDING_MODEL,
+            dimensions=EMBEDDING_DIMENSIONS
+        )).embeddings
 
-        # No need to set auth token in local environment as the BedrockGatewayClient
-        # will now use IAM credentials directly
-            
-        embedding_response: EmbedResponse = LLMGatewayClient.embed_invoke(embedding_request)
+        embeddings_next: Optional[List[List[float]]] = None
+        if NEXT_EMBEDDING_MODEL:
+            embeddings_next = LLMGatewayClient.embed_batch_invoke(EmbedBatchRequest(
+                texts=contents,
+                model_id=NEXT_EMBEDDING_MODEL,
+                dimensions=NEXT_EMBEDDING_DIMENSIONS
+            )).embeddings
+        return embeddings, embeddings_next
 
-        # Convert messages to JSON string for content field
-        messages_dict = [message.model_dump() for message in request.session_context.get_messages()]
-        messages_json = json.dumps(messages_dict)
-        
-        # Convert agent_id to UUID if it's not already a UUID
-        agent_id = request.agent_id
-        if agent_id and not isinstance(agent_id, uuid.UUID):
-            try:
-                agent_id = uuid.UUID(agent_id)
-            except ValueError:
-                # If agent_id is not a valid UUID string, generate a new UUID based on the string
-                agent_id = uuid.uuid5(uuid.NAMESPACE_DNS, agent_id)
+    @classmethod
+    def _to_new_memory(
+        cls,
+        request: CreateMemoryRequest,
+        summary: str,
+        embedding: List[float],
+        embedding_next: Optional[List[float]] = None
+    ) -> Memory:
+        """
+        The memory of a session with its embeddings. Its content is the whole session, also when
+        only the messages after the watermark were distilled, the distilled summary the
+        embeddings were computed from is kept with it.
+        """
+        agent_id = cls._to_agent_uuid(request.agent_id)
+        transcript = json.dumps([message.model_dump() for message in request.session_context.get_messages()])
         
-        memory: Memory = Memory(
+        return Memory(
             session_id=request.session_id,
             user_id=request.user_id,
             agent_id=str(agent_id),  # Convert UUID back to string for the model
-            content=messages_json,  # Use JSON string instead of Message objects
+            content=transcript,  # Use JSON string instead of Message objects
+            summary=summary,
             embedding_model=EMBEDDING_MODEL,  # Add the embedding model
-            embedding=embedding_response.embedding
+            embedding=embedding,
+            embedding_next=embedding_next
         )
 
-        # Prepare the data for insertion, ensuring agent_id is a UUID object
+    @classmethod
+    def _build_watermark_query(cls, session_ids: List[str]) -> Tuple[Select, Dict[str, Any]]:
+        """Read the watermarks on the writer, a lagging reader would have the sessions extracted twice."""
+        return _watermark_statement(), {'session_ids': [uuid.UUID(session_id) for session_id in session_ids]}
+
+    @classmethod
+    def _to_watermarks(cls, rows: Iterable[Any]) -> Dict[str, int]:
+        return {str(row.session_id): row.message_count for row in rows}
+
+    @classmethod
+    def _superseded(cls, request: CreateMemoryRequest) -> NothingToExtract:
+        return NothingToExtract(f"Session {request.session_id} was extracted concurrently up to its last message")
+
+    @classmethod
+    def _watermark_row(cls, request: CreateMemoryRequest) -> Dict[str, Any]:
+        """The watermark after distilling a request: all of its messages."""
+        return {
+            'session_id': uuid.UUID(request.session_id),
+            'user_id': request.user_id,
+            'message_count': len(request.session_context.get_messages())
+        }
+
+    @classmethod
+    def _build_memory_write(cls, memory: Memory) -> Tuple[Executable, Dict[str, Any], bool]:
+        """
+        Pick the statement that stores a new memory. Returns the statement, its params and
+        whether it deduplicates, in which case it returns the written row.
+        """
+        row = cls._to_memory_row(memory)
+        dual_write = 'embedding_next' in row
+        if DEDUP_SIMILARITY is None or row.get('embedding') is None:
+            return _memory_insert_statement(dual_write), row, False
+
+        fields = _MEMORY_WRITE_FIELDS + ('summary',) + (_NEXT_EMBEDDING_WRITE_FIELDS if dual_write else ())
+        params = {field: row.get(field) for field in fields}
+        params['memory_type'] = params['memory_type'] or DEFAULT_MEMORY_TYPE
+        params['max_distance'] = 1 - DEDUP_SIMILARITY
+        if EMBEDDING_QUANTIZATION != 'none':
+            params['rerank_candidates'] = RERANK_FACTOR
+        # After the cutover duplicates are searched where searches read.
+        space = 'next' if dual_write and EMBEDDING_MIGRATION_PHASE == 'cutover' else 'current'
+        return _memory_dedup_statement(EMBEDDING_QUANTIZATION, DEDUP_APPEND_CONTENT, space, dual_write), params, True
+
+    @classmethod
+    def _build_memory_batch_write(cls, memories: List[Memory]) -> Tuple[Executable, Any, bool]:
+        """
+        The statement that stores several memories at once, its params and whether it deduplicates,
+        in which case it returns one row per memory. Without dedup it is a multi-row insert.
+        """
+        rows = [cls._to_memory_row(memory) for memory in memories]
+        dual_write = 'embedding_next' in rows[0]
+        if DEDUP_SIMILARITY is None or any(row.get('embedding') is None for row in rows):
+            return _memory_batch_insert_statement(dual_write), rows, False
+
+        space = 'next' if dual_write and EMBEDDING_MIGRATION_PHASE == 'cutover' else 'current'
+        leaders = cls._batch_leaders(memories, _dedup_param(space))
+        if DEDUP_APPEND_CONTENT:
+            # A folded memory's content goes with its leader's to the memory that is stored.
+            for position, (row, leader) in enumerate(zip(rows, leaders), start=1):
+                if leader != position:
+                    rows[leader - 1]['content'] += '\n' + row['content']
+
+        fields = _MEMORY_WRITE_FIELDS + ('summary',) + (_NEXT_EMBEDDING_WRITE_FIELDS if dual_write else ())
+        params: Dict[str, Any] = {field: [row.get(field) for row in rows] for field in fields}
+        params['memory_type'] = [memory_type or DEFAULT_MEMORY_TYPE for memory_type in params['memory_type']]
+        params['batch_leader'] = leaders
+        params['max_distance'] = 1 - DEDUP_SIMILARITY
+        if EMBEDDING_QUANTIZATION != 'none':
+            params['rerank_candidates'] = RERANK_FACTOR
+        stmt = _memory_batch_dedup_statement(EMBEDDING_QUANTIZATION, DEDUP_APPEND_CONTENT, space, dual_write)
+        return stmt, params, True
+
+    @classmethod
+    def _batch_leaders(cls, memories: List[Memory], field: str) -> List[int]:
+        """
+        1-based position of the memory each memory of a batch is stored as. A memory within the
+        dedup threshold of an earlier leader of the same user is folded into the most similar one,
+        the statement can't see duplicates that aren't written yet.
+        """
+        leaders: List[int] = []
+        kept: List[Tuple[int, Optional[str], List[float]]] = []
+        for position, memory in enumerate(memories, start=1):
+            vector = _unit_vector(getattr(memory, field))
+            leader, best = position, DEDUP_SIMILARITY
+            for kept_position, user_id, kept_vector in kept:
+                similarity = sum(a * b for a, b in zip(kept_vector, vector))
+                if user_id == memory.user_id and similarity >= best:
+                    leader, best = kept_position, similarity
+            if leader == position:
+                kept.append((position, memory.user_id, vector))
+            leaders.append(leader)
+        return leaders
+
+    @classmethod
+    def _to_create_memory_response(cls, memory: Memory, rows: List[Any]) -> CreateMemoryResponse:
+        """The stored memory, which is the existing one if the new memory was a near duplicate."""
+        if not rows or not rows[0].deduplicated:
+            return CreateMemoryResponse(memory=memory)
+
+        row = rows[0]
+        logger.info("Memory for user %s matched existing memory %s, refreshed it", memory.user_id, row.memory_id)
+        existing = memory.model_copy(update={
+            'memory_id': str(row.memory_id),
+            'content': row.content,
+            'created_at': row.created_at,
+            'updated_at': row.updated_at
+        })
+        return CreateMemoryResponse(memory=existing, deduplicated=True)
+
+    @classmethod
+    def _to_memory_row(cls, memory: Memory) -> Dict[str, Any]:
+        """Prepare the data for insertion, ensuring agent_id is a UUID object"""
         memory_data = memory.model_dump()
         # Remove the similarity field as it's not a column in the database table
         if 'similarity' in memory_data:
@@ -305,12 +1605,13 @@ class PGMemoryClient:
             
         if 'agent_id' in memory_data and memory_data['agent_id']:
             # Convert string agent_id back to UUID for database insertion
-            memory_data['agent_id'] = agent_id
-            
-        with write_db.connect() as conn:
-            conn.execute(
-                insert(MEMORY_TABLE).values(memory_data)
-            )
-            conn.commit()
+            memory_data['agent_id'] = cls._to_agent_uuid(memory_data['agent_id'])
+
+        if memory_data.get('embedding') is not None:
+            memory_data['embedding'] = PGVector(memory_data['embedding'])
+
+        if NEXT_EMBEDDING_MODEL and memory.embedding_next is not None:
+            memory_data['embedding_next'] = PGVector(memory.embedding_next)
+            memory_data['embedding_next_model'] = NEXT_EMBEDDING_MODEL
 
-        return CreateMemoryResponse(memory=memory)
+        return memory_data
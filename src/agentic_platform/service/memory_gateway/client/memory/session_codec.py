@@ -0,0 +1,90 @@
+from typing import Any, Dict, List
+
+##############################################################################
+# Compact storage encoding of conversation messages. A pydantic dump of a
+# Message is mostly structure: {"type": "text"} wrappers, empty tool lists
+# and long keys. Stored messages use short keys, leave out defaults and
+# store text content as a bare string:
+#
+#   {"role": "user", "content": [{"type": "text", "text": "Hi"}],
+#    "tool_calls": [], "tool_results": [], "timestamp": 1760000000.123456}
+#   -> {"r": "u", "c": ["Hi"], "t": 1760000000123}
+#
+# It stays JSON so the messages can still be read in SQL. Messages in the
+# pydantic format (they have a "role" key) decode unchanged, rows written
+# before the compact encoding don't need a migration.
+##############################################################################
+
+_ROLES: Dict[str, str] = {'user': 'u', 'assistant': 'a'}
+_ROLE_NAMES: Dict[str, str] = {short: role for role, short in _ROLES.items()}
+
+def encode_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact form of a JSON-mode Message dump. Timestamps are kept to the millisecond."""
+    compact: Dict[str, Any] = {'r': _ROLES[message['role']]}
+    if message.get('content') is not None:
+        compact['c'] = [_encode_content(item) for item in message['content']]
+    if message.get('tool_calls'):
+        compact['tc'] = [_encode_tool_call(call) for call in message['tool_calls']]
+    if message.get('tool_results'):
+        compact['tr'] = [_encode_tool_result(result) for result in message['tool_results']]
+    if message.get('timestamp') is not None:
+        compact['t'] = round(message['timestamp'] * 1000)
+    return compact
+
+def decode_message(stored: Dict[str, Any]) -> Dict[str, Any]:
+    """Message fields of a stored message, in either encoding"""
+    if 'role' in stored:
+        return stored
+
+    message: Dict[str, Any] = {
+        'role': _ROLE_NAMES[stored['r']],
+        'content': [_decode_content(item) for item in stored['c']] if 'c' in stored else None,
+        'tool_calls': [_decode_tool_call(call) for call in stored.get('tc', [])],
+        'tool_results': [_decode_tool_result(result) for result in stored.get('tr', [])]
+    }
+    if 't' in stored:
+        message['timestamp'] = stored['t'] / 1000
+    return message
+
+def encode_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [encode_message(message) for message in messages]
+
+def decode_messages(stored: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [decode_message(message) for message in stored]
+
+def _encode_content(item: Dict[str, Any]) -> Any:
+    # Text is by far the most common content, other types keep their (discriminated) dump.
+    if item.get('type') == 'text':
+        return item['text']
+    return item
+
+def _decode_content(item: Any) -> Dict[str, Any]:
+    if isinstance(item, str):
+        return {'type': 'text', 'text': item}
+    return item
+
+def _encode_tool_call(call: Dict[str, Any]) -> Dict[str, Any]:
+    compact: Dict[str, Any] = {'n': call['name']}
+    if call.get('arguments'):
+        compact['a'] = call['arguments']
+    if call.get('id') is not None:
+        compact['i'] = call['id']
+    return compact
+
+def _decode_tool_call(call: Dict[str, Any]) -> Dict[str, Any]:
+    return {'name': call['n'], 'arguments': call.get('a', {}), 'id': call.get('i')}
+
+def _encode_tool_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    compact: Dict[str, Any] = {'c': [_encode_content(item) for item in result['content']]}
+    if result.get('id') is not None:
+        compact['i'] = result['id']
+    if result.get('isError'):
+        compact['e'] = True
+    return compact
+
+def _decode_tool_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': result.get('i'),
+        'content': [_decode_content(item) for item in result['c']],
+        'isError': result.get('e', False)
+    }
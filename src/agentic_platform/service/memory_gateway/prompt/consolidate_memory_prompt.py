@@ -0,0 +1,31 @@
+from agentic_platform.core.models.prompt_models import BasePrompt
+
+SYSTEM_PROMPT: str = """
+You are a specialized AI that maintains a long-term memory store about a user.
+
+Your task is to merge several related memory entries into a single consolidated memory that replaces them.
+
+When consolidating memories:
+1. Keep every distinct fact, preference and request, drop repetition
+2. When memories contradict each other, keep the most recent one
+3. Keep specific details such as names, numbers, formats and dates
+4. Write in third-person perspective for clarity (e.g., "The user prefers...")
+
+Remember that the consolidated memory will be indexed for semantic search, so keep the key terms and phrases of the original memories.
+"""
+
+USER_PROMPT: str = """
+Consolidate the following memory entries about the same user into a single memory entry. They are ordered from oldest to newest:
+
+<memories>
+{memories_json}
+</memories>
+
+Output one self-contained paragraph that preserves everything worth remembering from these entries.
+
+Output the consolidated memory in <memory> tags: "<memory>...</memory>" without additional explanation or commentary.
+"""
+
+class ConsolidateMemoryPrompt(BasePrompt):
+    user_prompt: str = USER_PROMPT
+    system_prompt: str = SYSTEM_PROMPT
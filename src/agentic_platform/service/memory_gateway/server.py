@@ -1,22 +1,49 @@
 # Continue with regular imports.
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from fastapi import FastAPI
+from agentic_platform.core.db.postgres import get_db, dispose_db
 from agentic_platform.core.models.memory_models import (
     GetSessionContextRequest,
     GetSessionContextResponse,
     UpsertSessionContextRequest,
     UpsertSessionContextResponse,
+    ListSessionsRequest,
+    ListSessionsResponse,
+    AppendSessionMessagesRequest,
+    AppendSessionMessagesResponse,
     GetMemoriesRequest,
     GetMemoriesResponse,
+    GetMemoriesBatchRequest,
+    GetMemoriesBatchResponse,
     CreateMemoryRequest,
-    CreateMemoryResponse
+    CreateMemoryJobResponse,
+    GetMemoryJobRequest,
+    GetMemoryJobResponse
 )
 from agentic_platform.core.middleware.configure_middleware import configuration_server_middleware
 from agentic_platform.service.memory_gateway.api.get_session_controller import GetSessionContextController
+from agentic_platform.service.memory_gateway.api.list_sessions_controller import ListSessionsController
 from agentic_platform.service.memory_gateway.api.upsert_session_controller import UpsertSessionContextController
+from agentic_platform.service.memory_gateway.api.append_session_messages_controller import AppendSessionMessagesController
 from agentic_platform.service.memory_gateway.api.get_memory_controller import GetMemoriesController
+from agentic_platform.service.memory_gateway.api.get_memories_batch_controller import GetMemoriesBatchController
 from agentic_platform.service.memory_gateway.api.create_memory_controller import CreateMemoryController
+from agentic_platform.service.memory_gateway.api.get_memory_job_controller import GetMemoryJobController
+from agentic_platform.service.memory_gateway.worker.memory_pipeline import MemoryPipeline
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the database pools and start the create-memory workers at startup, stop both on shutdown."""
+    db = get_db()
+    db.get_async_read_engine()
+    db.get_async_write_engine()
+    await MemoryPipeline.start()
+    yield
+    await MemoryPipeline.stop()
+    await dispose_db()
+
+app = FastAPI(lifespan=lifespan)
 
 # Configure middelware that's common to all servers.
 configuration_server_middleware(app, path_prefix="/api/memory-gateway")
@@ -24,22 +51,57 @@ configuration_server_middleware(app, path_prefix="/api/memory-gateway")
 @app.post("/get-session-context")
 async def get_session_context(request: GetSessionContextRequest) -> GetSessionContextResponse:
     """Get the session context for a given session id."""
-    return GetSessionContextController.get_session_context(request)
+    return await GetSessionContextController.get_session_context(request)
+
+@app.post("/list-sessions")
+async def list_sessions(request: ListSessionsRequest) -> ListSessionsResponse:
+    """List a user's sessions, newest first, without their messages."""
+    return await ListSessionsController.list_sessions(request)
 
 @app.post("/upsert-session-context")
 async def upsert_session_context(request: UpsertSessionContextRequest) -> UpsertSessionContextResponse:
     """Upsert the session context for a given session id."""
-    return UpsertSessionContextController.upsert_session_context(request)
+    return await UpsertSessionContextController.upsert_session_context(request)
+
+@app.post("/append-session-messages")
+async def append_session_messages(request: AppendSessionMessagesRequest) -> AppendSessionMessagesResponse:
+    """Append new messages to a session without rewriting the conversation."""
+    return await AppendSessionMessagesController.append_session_messages(request)
 
 @app.post("/get-memories")
 async def get_memories(request: GetMemoriesRequest) -> GetMemoriesResponse:
     """Get the memories for a given session id."""
-    return GetMemoriesController.get_memories(request)
+    return await GetMemoriesController.get_memories(request)
+
+@app.post("/get-memories-batch")
+async def get_memories_batch(request: GetMemoriesBatchRequest) -> GetMemoriesBatchResponse:
+    """Get the memories for several query embeddings with the same filters, one result per embedding."""
+    return await GetMemoriesBatchController.get_memories_batch(request)
+
+@app.post("/create-memory", status_code=202)
+async def create_memory(request: CreateMemoryRequest) -> CreateMemoryJobResponse:
+    """
+    Queue the creation of a memory for a given session id. Poll /get-memory-job for the result.
+    Jobs are queued in this pod's memory, the job is only known to the pod that accepted it.
+    """
+    return await CreateMemoryController.create_memory(request)
+
+@app.post("/get-memory-job")
+async def get_memory_job(request: GetMemoryJobRequest) -> GetMemoryJobResponse:
+    """
+    Get the status of a create-memory job, and the memory once it completed. Job status is
+    kept per pod: behind a load balancer the poll needs session affinity with /create-memory,
+    other replicas answer 404.
+    """
+    return await GetMemoryJobController.get_memory_job(request)
 
-@app.post("/create-memory")
-async def create_memory(request: CreateMemoryRequest) -> CreateMemoryResponse:
-    """Create a memory for a given session id."""
-    return CreateMemoryController.create_memory(request)
+@app.get("/pool-stats")
+async def pool_stats():
+    """
+    Recommended connection pool sizes from the concurrency observed on this pod.
+    """
+    recommendations = get_db().recommend_pool_sizes()
+    return {name: asdict(rec) if rec else None for name, rec in recommendations.items()}
 
 @app.get("/health")
 async def health():
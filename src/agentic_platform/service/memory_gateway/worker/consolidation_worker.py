@@ -0,0 +1,389 @@
+from agentic_platform.core.db.postgres import EngineType, LazyEngine
+from agentic_platform.core.db.session_profiles import WorkloadProfile, session_profile
+from agentic_platform.core.models.llm_models import LLMRequest, LLMResponse, Message
+from agentic_platform.core.models.embedding_models import EmbedRequest, EmbedResponse
+from agentic_platform.core.formatter.extract_regex_formatter import ExtractRegexFormatter
+from agentic_platform.core.client.llm_gateway.llm_gateway_client import LLMGatewayClient
+from agentic_platform.service.memory_gateway.prompt.consolidate_memory_prompt import ConsolidateMemoryPrompt
+from agentic_platform.service.memory_gateway.client.memory.pg_memory_client import (
+    EMBEDDING_MODEL,
+    EMBEDDING_DIMENSIONS,
+    NEXT_EMBEDDING_MODEL,
+    NEXT_EMBEDDING_DIMENSIONS,
+    MEMORY_TABLE,
+    DEFAULT_MEMORY_TYPE,
+    metadata,
+    _MEMORY_WRITE_FIELDS,
+    _NEXT_EMBEDDING_WRITE_FIELDS,
+    _EMBEDDING_COLUMN_NAMES
+)
+
+import os
+import math
+import time
+import uuid
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+from pgvector import Vector as PGVector
+from sqlalchemy import Table, Column, Text, DateTime, Engine, select, func, bindparam, text
+from sqlalchemy import Select
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.dialects.postgresql import insert, Insert
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    # Add basic configuration if none exists
+    logging.basicConfig(level=logging.INFO)
+
+# Only memories not written or refreshed for this long are consolidated.
+MIN_AGE_DAYS: float = float(os.getenv("MEMORY_CONSOLIDATION_MIN_AGE_DAYS", "30"))
+# Users with fewer old memories than this are left alone.
+MIN_USER_MEMORIES: int = int(os.getenv("MEMORY_CONSOLIDATION_MIN_USER_MEMORIES", "50"))
+# Old memories of one user clustered per pass, the oldest first. The rest wait for the next pass.
+MAX_USER_MEMORIES: int = int(os.getenv("MEMORY_CONSOLIDATION_MAX_USER_MEMORIES", "500"))
+# Users fetched per batch. The checkpoint advances after every user.
+USER_BATCH_SIZE: int = int(os.getenv("MEMORY_CONSOLIDATION_USER_BATCH_SIZE", "100"))
+# Cosine similarity to the centroid of a cluster a memory needs to join it.
+CLUSTER_SIMILARITY: float = float(os.getenv("MEMORY_CONSOLIDATION_CLUSTER_SIMILARITY", "0.8"))
+MIN_CLUSTER_SIZE: int = int(os.getenv("MEMORY_CONSOLIDATION_MIN_CLUSTER_SIZE", "3"))
+# Keeps the summarization prompt bounded. A larger group becomes several clusters.
+MAX_CLUSTER_SIZE: int = int(os.getenv("MEMORY_CONSOLIDATION_MAX_CLUSTER_SIZE", "20"))
+# archive moves the originals to memory_archive, delete drops them.
+CONSOLIDATION_MODES: Sequence[str] = ('archive', 'delete')
+CONSOLIDATION_MODE: str = os.getenv("MEMORY_CONSOLIDATION_MODE", "archive").lower()
+INTERVAL_SECONDS: float = float(os.getenv("MEMORY_CONSOLIDATION_INTERVAL_SECONDS", "3600"))
+# Name of the checkpoint row. Workers consolidating disjoint sets of users need different names.
+WORKER_NAME: str = os.getenv("MEMORY_CONSOLIDATION_WORKER", "default")
+
+if CONSOLIDATION_MODE not in CONSOLIDATION_MODES:
+    raise ValueError(f"MEMORY_CONSOLIDATION_MODE must be one of {CONSOLIDATION_MODES}, got {CONSOLIDATION_MODE}")
+
+# Reads and writes both go to the writer, the worker deletes what it read.
+write_db: Engine = LazyEngine(EngineType.WRITER)
+
+CONSOLIDATION_CHECKPOINT_TABLE: Table = Table(
+    "memory_consolidation_checkpoint", metadata,
+    Column('worker', Text, primary_key=True),
+    Column('last_user_id', Text, nullable=False),
+    Column('updated_at', DateTime(timezone=True), server_default='now()'),
+)
+
+
+@dataclass
+class ConsolidationProgress:
+    """Progress of a consolidation pass"""
+    users: int = 0
+    clusters: int = 0
+    memories_consolidated: int = 0
+    failed_clusters: int = 0
+    last_user_id: str = ''
+
+##########################################################################
+# Statements. Cached like the memory client's, they only differ by mode.
+##########################################################################
+
+def _last_touched():
+    return func.coalesce(MEMORY_TABLE.c.updated_at, MEMORY_TABLE.c.created_at)
+
+@lru_cache(maxsize=None)
+def _consolidation_users_statement() -> Select:
+    """Next users, in user_id order, with at least :min_memories memories older than :older_than"""
+    user_id = MEMORY_TABLE.c.user_id
+    return (
+        select(user_id)
+        .where(user_id > bindparam('after_user_id'), _last_touched() < bindparam('older_than'))
+        .group_by(user_id)
+        .having(func.count() >= bindparam('min_memories'))
+        .order_by(user_id)
+        .limit(bindparam('users'))
+    )
+
+@lru_cache(maxsize=None)
+def _consolidation_candidates_statement() -> Select:
+    """
+    A user's oldest memories past the age threshold. Only hits the user's partition.
+    Session memories are summarized from their distilled summary, not the full transcript.
+    """
+    memory = MEMORY_TABLE.c
+    return (
+        select(memory.memory_id, memory.session_id, memory.agent_id, memory.memory_type,
+               func.coalesce(memory.summary, memory.content).label('content'),
+               memory.embedding.label('embedding'), memory.created_at)
+        .where(memory.user_id == bindparam('user_id'), _last_touched() < bindparam('older_than'))
+        .order_by(memory.created_at, memory.memory_id)
+        .limit(bindparam('max_memories'))
+    )
+
+@lru_cache(maxsize=None)
+def _consolidation_write_statement(mode: str, dual_write: bool = False) -> TextClause:
+    """
+    Insert the consolidated memory and remove the cluster's memories in one statement.
+    Returns how many memories were removed, fewer than the cluster means a concurrent
+    writer deleted some and the transaction has to be rolled back.
+    """
+    # The archive keeps the embedding of the current model under its fixed column names.
+    archive_columns = ', '.join(_MEMORY_WRITE_FIELDS + ('summary',))
+    columns = ', '.join(_EMBEDDING_COLUMN_NAMES.get(field, field) for field in _MEMORY_WRITE_FIELDS)
+    archived = f""",
+    archived AS (
+        INSERT INTO memory_archive ({archive_columns}, consolidated_into)
+        SELECT {columns}, summary, CAST(:memory_id AS UUID) FROM removed
+    )""" if mode == 'archive' else ""
+
+    inserted = columns
+    next_values = ""
+    if dual_write:
+        inserted += ''.join(f", {_EMBEDDING_COLUMN_NAMES[field]}" for field in _NEXT_EMBEDDING_WRITE_FIELDS)
+        next_values = ", :embedding_next, :embedding_next_model"
+
+    return text(f"""
+    WITH consolidated AS (
+        INSERT INTO memory ({inserted})
+        VALUES (CAST(:memory_id AS UUID), CAST(:session_id AS UUID), :user_id, CAST(:agent_id AS UUID),
+                :memory_type, :content, :embedding_model, :embedding, :created_at, now(){next_values})
+    ),
+    removed AS (
+        DELETE FROM memory
+        WHERE user_id = :user_id AND memory_id = ANY(:memory_ids)
+        RETURNING {columns}, summary
+    ){archived}
+    SELECT count(*) AS removed FROM removed
+    """)
+
+@lru_cache(maxsize=None)
+def _checkpoint_upsert_statement() -> Insert:
+    stmt = insert(CONSOLIDATION_CHECKPOINT_TABLE).values(
+        worker=bindparam('worker'),
+        last_user_id=bindparam('last_user_id'),
+        updated_at=func.now()
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=['worker'],
+        set_={'last_user_id': stmt.excluded.last_user_id, 'updated_at': stmt.excluded.updated_at}
+    )
+
+def clear_statement_cache() -> None:
+    """Drop the cached statements, e.g. after the table definitions were patched in tests"""
+    _consolidation_users_statement.cache_clear()
+    _consolidation_candidates_statement.cache_clear()
+    _consolidation_write_statement.cache_clear()
+    _checkpoint_upsert_statement.cache_clear()
+
+##########################################################################
+# Clustering. Greedy leader clustering over unit vectors, one pass over
+# the memories in age order. Bounded by MAX_USER_MEMORIES per user.
+##########################################################################
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
+def cluster_memories(
+    memories: List[Dict[str, Any]],
+    similarity: float = CLUSTER_SIMILARITY,
+    min_size: int = MIN_CLUSTER_SIZE,
+    max_size: int = MAX_CLUSTER_SIZE
+) -> List[List[Dict[str, Any]]]:
+    """
+    Group memories of the same memory_type whose embeddings are within the cosine similarity
+    of a cluster's centroid. Only clusters of at least min_size memories are returned.
+    """
+    clusters: List[Dict[str, Any]] = []
+    for memory in memories:
+        if memory.get('embedding') is None:
+            continue
+        vector = _normalize(memory['embedding'])
+        memory_type = memory.get('memory_type') or DEFAULT_MEMORY_TYPE
+
+        best, best_similarity = None, similarity
+        for cluster in clusters:
+            if cluster['memory_type'] != memory_type or len(cluster['memories']) >= max_size:
+                continue
+            centroid_similarity = sum(a * b for a, b in zip(cluster['centroid'], vector))
+            if centroid_similarity >= best_similarity:
+                best, best_similarity = cluster, centroid_similarity
+
+        if best is None:
+            clusters.append({'memory_type': memory_type, 'memories': [memory], 'sum': vector, 'centroid': vector})
+            continue
+        best['memories'].append(memory)
+        best['sum'] = [a + b for a, b in zip(best['sum'], vector)]
+        best['centroid'] = _normalize(best['sum'])
+
+    return [cluster['memories'] for cluster in clusters if len(cluster['memories']) >= min_size]
+
+class MemoryConsolidationWorker:
+    """
+    Periodically replaces clusters of a user's old, similar memories with one consolidated
+    memory summarized by the LLM gateway, which keeps each user's working set bounded.
+
+    Users are processed in user_id order and the last finished user is checkpointed, so a
+    restarted worker resumes where it stopped. Every cluster is written in its own
+    transaction: the consolidated memory appears and its originals disappear together.
+    The consolidated memory counts as fresh, it isn't consolidated again before MIN_AGE_DAYS.
+    """
+
+    @classmethod
+    def run_forever(cls, interval_seconds: float = INTERVAL_SECONDS) -> None:
+        """Run a pass, sleep, repeat. A failed pass is logged and retried after the interval."""
+        while True:
+            try:
+                cls.run_pass()
+            except Exception:
+                logger.exception("Memory consolidation pass failed")
+            time.sleep(interval_seconds)
+
+    @classmethod
+    def run_pass(cls, max_users: Optional[int] = None) -> ConsolidationProgress:
+        """
+        Consolidate users from the checkpoint onwards until every eligible user was visited,
+        or max_users were. The checkpoint is reset once the pass reaches the last user.
+        """
+        progress = ConsolidationProgress(last_user_id=cls._load_checkpoint())
+        older_than = datetime.now(timezone.utc) - timedelta(days=MIN_AGE_DAYS)
+
+        while max_users is None or progress.users < max_users:
+            user_ids = cls._next_users(progress.last_user_id, older_than)
+            if not user_ids:
+                # Pass complete, the next one starts from the first user again.
+                cls._save_checkpoint('')
+                break
+            for user_id in user_ids:
+                if max_users is not None and progress.users >= max_users:
+                    break
+                cls.consolidate_user(user_id, older_than, progress)
+                progress.users += 1
+                progress.last_user_id = user_id
+                cls._save_checkpoint(user_id)
+
+        logger.info("Memory consolidation pass: %s", progress)
+        return progress
+
+    @classmethod
+    def consolidate_user(cls, user_id: str, older_than: datetime, progress: ConsolidationProgress) -> None:
+        """Cluster one batch of the user's old memories and consolidate every cluster."""
+        memories = cls._read_candidates(user_id, older_than)
+        for cluster in cluster_memories(memories):
+            try:
+                consolidated = cls._summarize(user_id, cluster)
+                if cls._write_cluster(user_id, consolidated, cluster):
+                    progress.clusters += 1
+                    progress.memories_consolidated += len(cluster)
+                else:
+                    progress.failed_clusters += 1
+            except Exception:
+                # The cluster is left as is and picked up again by a later pass.
+                logger.exception("Failed to consolidate %s memories of user %s", len(cluster), user_id)
+                progress.failed_clusters += 1
+
+    ##########################################################################
+    # Database access
+    ##########################################################################
+
+    @classmethod
+    def _load_checkpoint(cls) -> str:
+        query = select(CONSOLIDATION_CHECKPOINT_TABLE.c.last_user_id).where(
+            CONSOLIDATION_CHECKPOINT_TABLE.c.worker == WORKER_NAME
+        )
+        with write_db.connect() as conn:
+            return conn.execute(query).scalar() or ''
+
+    @classmethod
+    def _save_checkpoint(cls, last_user_id: str) -> None:
+        with write_db.connect() as conn:
+            conn.execute(_checkpoint_upsert_statement(), {'worker': WORKER_NAME, 'last_user_id': last_user_id})
+            conn.commit()
+
+    @classmethod
+    def _next_users(cls, after_user_id: str, older_than: datetime) -> List[str]:
+        params = {
+            'after_user_id': after_user_id,
+            'older_than': older_than,
+            'min_memories': MIN_USER_MEMORIES,
+            'users': USER_BATCH_SIZE
+        }
+        with session_profile(WorkloadProfile.ANALYTICS_EXPORT):
+            with write_db.connect() as conn:
+                return list(conn.execute(_consolidation_users_statement(), params).scalars())
+
+    @classmethod
+    def _read_candidates(cls, user_id: str, older_than: datetime) -> List[Dict[str, Any]]:
+        params = {'user_id': user_id, 'older_than': older_than, 'max_memories': MAX_USER_MEMORIES}
+        with session_profile(WorkloadProfile.BULK_WRITE):
+            with write_db.connect() as conn:
+                result = conn.execute(_consolidation_candidates_statement(), params)
+                return [dict(row._mapping) for row in result]
+
+    @classmethod
+    def _write_cluster(cls, user_id: str, consolidated: Dict[str, Any], cluster: List[Dict[str, Any]]) -> bool:
+        """Swap the cluster for the consolidated memory. False if the cluster changed meanwhile."""
+        params = dict(consolidated, memory_ids=[memory['memory_id'] for memory in cluster])
+        with session_profile(WorkloadProfile.BULK_WRITE):
+            with write_db.connect() as conn:
+                stmt = _consolidation_write_statement(CONSOLIDATION_MODE, 'embedding_next' in params)
+                removed = conn.execute(stmt, params).scalar()
+                if removed != len(cluster):
+                    conn.rollback()
+                    logger.warning("Memories of user %s changed during consolidation, skipped a cluster", user_id)
+                    return False
+                conn.commit()
+        return True
+
+    ##########################################################################
+    # LLM gateway. Blocking HTTP calls, like the memory client's extraction.
+    ##########################################################################
+
+    @classmethod
+    def _summarize(cls, user_id: str, cluster: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Summarize the cluster into one memory and embed it. Returns the row to insert."""
+        memories_json: str = json.dumps([
+            {'created_at': memory['created_at'].isoformat(), 'content': memory['content']}
+            for memory in cluster
+        ])
+        prompt: ConsolidateMemoryPrompt = ConsolidateMemoryPrompt(inputs={"memories_json": memories_json})
+
+        llm_request: LLMRequest = LLMRequest(
+            model_id=prompt.model_id,
+            system_prompt=prompt.system_prompt,
+            messages=[Message(role="user", text=prompt.user_prompt)],
+            hyperparams=prompt.hyperparams
+        )
+        response: LLMResponse = LLMGatewayClient.chat_invoke(llm_request)
+        content: str | None = ExtractRegexFormatter.extract_response(response.text, r'<memory>(.*?)</memory>')
+        if not content:
+            raise Exception("No memory content found in LLM response")
+
+        embedding: EmbedResponse = LLMGatewayClient.embed_invoke(
+            EmbedRequest(text=content, model_id=EMBEDDING_MODEL, dimensions=EMBEDDING_DIMENSIONS)
+        )
+
+        # The newest memory of the cluster is the most relevant one to attribute it to.
+        newest = cluster[-1]
+        row = {
+            'memory_id': str(uuid.uuid4()),
+            'session_id': str(newest['session_id']) if newest.get('session_id') else None,
+            'user_id': user_id,
+            'agent_id': str(newest['agent_id']) if newest.get('agent_id') else None,
+            'memory_type': newest.get('memory_type') or DEFAULT_MEMORY_TYPE,
+            'content': content,
+            'embedding_model': EMBEDDING_MODEL,
+            'embedding': PGVector(embedding.embedding),
+            # Keeps the age of the oldest original. updated_at is now, so it isn't picked up again right away.
+            'created_at': cluster[0]['created_at']
+        }
+        # Dual write during an embedding migration, like the memory client.
+        if NEXT_EMBEDDING_MODEL:
+            embedding_next: EmbedResponse = LLMGatewayClient.embed_invoke(
+                EmbedRequest(text=content, model_id=NEXT_EMBEDDING_MODEL, dimensions=NEXT_EMBEDDING_DIMENSIONS)
+            )
+            row['embedding_next'] = PGVector(embedding_next.embedding)
+            row['embedding_next_model'] = NEXT_EMBEDDING_MODEL
+        return row
+
+if __name__ == "__main__":
+    MemoryConsolidationWorker.run_forever()
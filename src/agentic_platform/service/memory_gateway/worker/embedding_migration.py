@@ -0,0 +1,329 @@
+from agentic_platform.core.db.postgres import EngineType, LazyEngine
+from agentic_platform.core.db.session_profiles import WorkloadProfile, session_profile
+from agentic_platform.core.models.embedding_models import EmbedRequest
+from agentic_platform.core.client.llm_gateway.llm_gateway_client import LLMGatewayClient
+from agentic_platform.service.memory_gateway.client.memory.pg_memory_client import (
+    EMBEDDING_COLUMN,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_QUANTIZATION,
+    EMBEDDING_QUANTIZATIONS,
+    NEXT_EMBEDDING_MODEL,
+    NEXT_EMBEDDING_DIMENSIONS,
+    NEXT_EMBEDDING_COLUMN,
+    MEMORY_TABLE
+)
+
+import os
+import time
+import uuid
+import logging
+import argparse
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional
+
+from pgvector import Vector as PGVector
+from sqlalchemy import Engine, Connection, select, update, func, bindparam, text, tuple_, type_coerce
+from sqlalchemy import Select, Update
+from sqlalchemy.types import NullType
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    # Add basic configuration if none exists
+    logging.basicConfig(level=logging.INFO)
+
+BACKFILL_BATCH_SIZE: int = int(os.getenv("MEMORY_EMBEDDING_BACKFILL_BATCH_SIZE", "200"))
+HNSW_M: int = int(os.getenv("MEMORY_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION: int = int(os.getenv("MEMORY_HNSW_EF_CONSTRUCTION", "64"))
+HNSW_MAINTENANCE_WORK_MEM: str = os.getenv("MEMORY_HNSW_MAINTENANCE_WORK_MEM", "1GB")
+
+write_db: Engine = LazyEngine(EngineType.WRITER)
+
+@dataclass
+class EmbeddingBackfillProgress:
+    """Progress of a backfill, reported after every committed batch"""
+    memories: int = 0
+    failed: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def memories_per_second(self) -> float:
+        return self.memories / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+def _index_definition(column: str, dimensions: int, quantization: str) -> str:
+    """HNSW index expression and operator class, matching the memory client's distances"""
+    if quantization == 'halfvec':
+        return f"({column}::halfvec({dimensions})) halfvec_cosine_ops"
+    if quantization == 'binary':
+        return f"(binary_quantize({column})::bit({dimensions})) bit_hamming_ops"
+    return f"{column} vector_cosine_ops"
+
+def _index_name(column: str, quantization: str) -> str:
+    return f"idx_memory_{column}_{'hnsw' if quantization == 'none' else quantization}"
+
+@lru_cache(maxsize=None)
+def _backfill_batch_statement() -> Select:
+    """
+    Next memories without a next-model embedding, in primary key order after the cursor, with
+    the text their embeddings are computed from: the summary of session memories, else content.
+    """
+    memory = MEMORY_TABLE.c
+    return (
+        select(memory.user_id, memory.memory_id, func.coalesce(memory.summary, memory.content).label('content'))
+        .where(
+            memory.embedding_next.is_(None),
+            tuple_(memory.user_id, memory.memory_id) > tuple_(bindparam('after_user_id'), bindparam('after_memory_id'))
+        )
+        .order_by(memory.user_id, memory.memory_id)
+        .limit(bindparam('batch_size'))
+    )
+
+@lru_cache(maxsize=None)
+def _backfill_update_statement() -> Update:
+    """Set the next-model embedding of one memory unless a dual write got there first"""
+    memory = MEMORY_TABLE.c
+    return (
+        update(MEMORY_TABLE)
+        .where(
+            memory.user_id == bindparam('b_user_id'),
+            memory.memory_id == bindparam('b_memory_id'),
+            memory.embedding_next.is_(None)
+        )
+        .values(
+            embedding_next=type_coerce(bindparam('b_embedding'), NullType()),
+            embedding_next_model=bindparam('b_embedding_model')
+        )
+    )
+
+def clear_statement_cache() -> None:
+    """Drop the cached statements, e.g. after the table definitions were patched in tests"""
+    _backfill_batch_statement.cache_clear()
+    _backfill_update_statement.cache_clear()
+
+class EmbeddingMigration:
+    """
+    Moves the memory table to another embedding model or dimensions without taking search down.
+    The steps alternate with deployments of the memory gateway:
+
+    1. prepare: add the next column and its index.
+    2. Deploy with MEMORY_NEXT_EMBEDDING_MODEL, _DIMENSIONS and _COLUMN. New memories get both embeddings.
+    3. backfill: re-embed the existing memories into the next column. Resumable, safe to re-run.
+    4. Deploy with MEMORY_EMBEDDING_MIGRATION_PHASE=cutover, searches read the next column.
+    5. Deploy with the next model, dimensions and column as MEMORY_EMBEDDING_MODEL, _DIMENSIONS
+       and _COLUMN, without a next model.
+    6. finalize: drop the previous column.
+
+    index builds the search index of the current column for a quantization, outside of a migration.
+
+    Schema steps live here rather than in alembic because they repeat for every model change,
+    with the two columns swapping roles.
+    """
+
+    @classmethod
+    def prepare(cls) -> None:
+        """Add the next embedding column and build its HNSW index, concurrently per partition."""
+        cls._require_next_model()
+        column = NEXT_EMBEDDING_COLUMN
+        with cls._autocommit() as conn:
+            conn.execute(text("SET statement_timeout = 0"))
+            conn.execute(text(f"SET maintenance_work_mem = '{HNSW_MAINTENANCE_WORK_MEM}'"))
+            # Nullable columns without a default, no table rewrite.
+            conn.execute(text(f'''
+            ALTER TABLE memory
+                ADD COLUMN IF NOT EXISTS {column} vector({NEXT_EMBEDDING_DIMENSIONS}),
+                ADD COLUMN IF NOT EXISTS {column}_model TEXT,
+                ALTER COLUMN {EMBEDDING_COLUMN}_model DROP NOT NULL
+            '''))
+            # Once the next model is current, memories are written without the previous embedding.
+            # Archived embeddings keep their dimensions, whatever the model.
+            conn.execute(text('ALTER TABLE IF EXISTS memory_archive ALTER COLUMN embedding TYPE vector'))
+
+            definition = _index_definition(column, NEXT_EMBEDDING_DIMENSIONS, EMBEDDING_QUANTIZATION)
+            cls._create_partitioned_index(conn, _index_name(column, EMBEDDING_QUANTIZATION), definition)
+        logger.info("Prepared %s for %s", column, NEXT_EMBEDDING_MODEL)
+
+    @classmethod
+    def build_index(cls, quantization: str = EMBEDDING_QUANTIZATION, drop_others: bool = False) -> None:
+        """
+        Build the HNSW index searches of the current embedding column use with the quantization,
+        concurrently per partition. Safe to re-run. Turning quantization on or off is this step,
+        then a deployment with MEMORY_EMBEDDING_QUANTIZATION, then this step with drop_others
+        to drop the indexes of the other quantizations and free their memory.
+        """
+        if quantization not in EMBEDDING_QUANTIZATIONS:
+            raise ValueError(f"quantization must be one of {EMBEDDING_QUANTIZATIONS}, got {quantization}")
+        column = EMBEDDING_COLUMN
+        with cls._autocommit() as conn:
+            conn.execute(text("SET statement_timeout = 0"))
+            conn.execute(text(f"SET maintenance_work_mem = '{HNSW_MAINTENANCE_WORK_MEM}'"))
+            name = _index_name(column, quantization)
+            cls._create_partitioned_index(conn, name, _index_definition(column, EMBEDDING_DIMENSIONS, quantization))
+            if drop_others:
+                # CONCURRENTLY isn't supported for partitioned indexes, the drop takes a short exclusive lock.
+                for other in EMBEDDING_QUANTIZATIONS:
+                    if other != quantization:
+                        conn.execute(text(f'DROP INDEX IF EXISTS {_index_name(column, other)}'))
+        logger.info("Built %s on %s", name, column)
+
+    @classmethod
+    def backfill(
+        cls,
+        batch_size: int = BACKFILL_BATCH_SIZE,
+        max_batches: Optional[int] = None,
+        on_progress: Optional[Callable[[EmbeddingBackfillProgress], None]] = None
+    ) -> EmbeddingBackfillProgress:
+        """
+        Embed every memory without a next-model embedding, one committed batch at a time, from
+        the text live writes embed. Memories stored before their summary was kept only have
+        their content. Memories whose embedding fails are skipped and retried by the next run.
+        """
+        cls._require_next_model()
+        progress = EmbeddingBackfillProgress()
+        after_user_id, after_memory_id = '', uuid.UUID(int=0)
+        started = time.perf_counter()
+
+        while max_batches is None or progress.batches < max_batches:
+            params = {'after_user_id': after_user_id, 'after_memory_id': after_memory_id, 'batch_size': batch_size}
+            with session_profile(WorkloadProfile.BULK_WRITE):
+                with write_db.connect() as conn:
+                    batch = list(conn.execute(_backfill_batch_statement(), params))
+            if not batch:
+                break
+
+            # Blocking HTTP calls to the LLM gateway, made outside of a transaction.
+            updates = []
+            for row in batch:
+                embedding = cls._embed(row.content)
+                if embedding is None:
+                    progress.failed += 1
+                    continue
+                updates.append({
+                    'b_user_id': row.user_id,
+                    'b_memory_id': row.memory_id,
+                    'b_embedding': PGVector(embedding),
+                    'b_embedding_model': NEXT_EMBEDDING_MODEL
+                })
+
+            if updates:
+                with session_profile(WorkloadProfile.BULK_WRITE):
+                    with write_db.connect() as conn:
+                        conn.execute(_backfill_update_statement(), updates)
+                        conn.commit()
+
+            after_user_id, after_memory_id = batch[-1].user_id, batch[-1].memory_id
+            progress.memories += len(updates)
+            progress.batches += 1
+            progress.elapsed_seconds = time.perf_counter() - started
+            if on_progress:
+                on_progress(progress)
+
+        logger.info("Embedding backfill: %s", progress)
+        return progress
+
+    @classmethod
+    def remaining(cls) -> int:
+        """Memories still without a next-model embedding. The cutover waits for 0."""
+        cls._require_next_model()
+        query = select(func.count()).select_from(MEMORY_TABLE).where(MEMORY_TABLE.c.embedding_next.is_(None))
+        with session_profile(WorkloadProfile.ANALYTICS_EXPORT):
+            with write_db.connect() as conn:
+                return conn.execute(query).scalar()
+
+    @classmethod
+    def finalize(cls, previous_column: str) -> None:
+        """
+        Drop the previous embedding column and its indexes. Run with the configuration of
+        step 5, after every gateway stopped reading and writing the previous column.
+        """
+        if previous_column in (EMBEDDING_COLUMN, NEXT_EMBEDDING_COLUMN if NEXT_EMBEDDING_MODEL else None):
+            raise ValueError(f"{previous_column} is still configured, deploy the migrated configuration first")
+
+        with cls._autocommit() as conn:
+            missing = conn.execute(text(
+                f"SELECT count(*) FROM memory WHERE {EMBEDDING_COLUMN} IS NULL AND {previous_column} IS NOT NULL"
+            )).scalar()
+            if missing:
+                raise ValueError(f"{missing} memories have no {EMBEDDING_COLUMN} yet, run the backfill first")
+            # Only a catalog change, the space is reclaimed as rows are rewritten.
+            conn.execute(text(f'''
+            ALTER TABLE memory
+                DROP COLUMN IF EXISTS {previous_column},
+                DROP COLUMN IF EXISTS {previous_column}_model
+            '''))
+        logger.info("Dropped embedding column %s", previous_column)
+
+    @classmethod
+    def _embed(cls, content: str) -> Optional[List[float]]:
+        try:
+            return LLMGatewayClient.embed_invoke(EmbedRequest(
+                text=content,
+                model_id=NEXT_EMBEDDING_MODEL,
+                dimensions=NEXT_EMBEDDING_DIMENSIONS
+            )).embedding
+        except Exception:
+            logger.exception("Failed to embed a memory with %s", NEXT_EMBEDDING_MODEL)
+            return None
+
+    @classmethod
+    def _require_next_model(cls) -> None:
+        if not NEXT_EMBEDDING_MODEL:
+            raise ValueError("MEMORY_NEXT_EMBEDDING_MODEL is not set")
+
+    @classmethod
+    @contextmanager
+    def _autocommit(cls) -> Iterator[Connection]:
+        """
+        CREATE INDEX CONCURRENTLY can't run inside a transaction. The steps change session
+        settings, so the connection is discarded instead of returned to the pool with them.
+        """
+        with write_db.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            try:
+                yield conn
+            finally:
+                conn.invalidate()
+
+    @classmethod
+    def _create_partitioned_index(cls, conn: Connection, name: str, definition: str) -> None:
+        """
+        Create the parent index on the parent only, build each partition's index concurrently
+        and attach it. The parent index becomes valid once every partition is attached.
+        """
+        conn.execute(text(f'''
+        CREATE INDEX IF NOT EXISTS {name} ON ONLY memory USING hnsw ({definition})
+        WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION})
+        '''))
+        partitions = conn.execute(text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'memory'::regclass ORDER BY 1"
+        )).scalars().all()
+        for partition in partitions:
+            conn.execute(text(f'''
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_{name}
+            ON {partition} USING hnsw ({definition})
+            WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION})
+            '''))
+            conn.execute(text(f'ALTER INDEX {name} ATTACH PARTITION {partition}_{name}'))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate memory embeddings to another model or dimensions")
+    parser.add_argument('step', choices=['prepare', 'backfill', 'status', 'finalize', 'index'])
+    parser.add_argument('--previous-column', help="Embedding column to drop, for finalize")
+    parser.add_argument('--quantization', choices=EMBEDDING_QUANTIZATIONS, default=EMBEDDING_QUANTIZATION,
+                        help="Quantization of the search index, for index")
+    parser.add_argument('--drop-others', action='store_true', help="Drop the indexes of other quantizations, for index")
+    parser.add_argument('--batch-size', type=int, default=BACKFILL_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.step == 'prepare':
+        EmbeddingMigration.prepare()
+    elif args.step == 'backfill':
+        EmbeddingMigration.backfill(batch_size=args.batch_size, on_progress=lambda p: logger.info("%s", p))
+    elif args.step == 'index':
+        EmbeddingMigration.build_index(args.quantization, args.drop_others)
+    elif args.step == 'status':
+        logger.info("%s memories without a %s embedding", EmbeddingMigration.remaining(), NEXT_EMBEDDING_MODEL)
+    elif not args.previous_column:
+        parser.error("finalize needs --previous-column")
+    else:
+        EmbeddingMigration.finalize(args.previous_column)
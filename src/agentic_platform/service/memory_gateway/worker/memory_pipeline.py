@@ -0,0 +1,279 @@
+from agentic_platform.core.models.memory_models import (
+    Memory,
+    CreateMemoryRequest,
+    CreateMemoryResponse,
+    CreateMemoryJobResponse,
+    GetMemoryJobResponse,
+    MemoryJobStatus
+)
+from agentic_platform.service.memory_gateway.client.memory.pg_memory_client import PGMemoryClient, NothingToExtract
+from agentic_platform.service.memory_gateway.client.memory.async_pg_memory_client import AsyncPGMemoryClient
+
+import os
+import time
+import uuid
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    # Add basic configuration if none exists
+    logging.basicConfig(level=logging.INFO)
+
+# Where jobs wait for the workers and their status is kept.
+JOB_QUEUE_BACKENDS: Sequence[str] = ('in_process',)
+JOB_QUEUE_BACKEND: str = os.getenv("MEMORY_JOB_QUEUE_BACKEND", "in_process").lower()
+# Jobs waiting at most. Submitting to a full queue is rejected so the gateway sheds load.
+JOB_QUEUE_SIZE: int = int(os.getenv("MEMORY_JOB_QUEUE_SIZE", "1000"))
+# Finished jobs are kept this long for their status to be read.
+JOB_RETENTION_SECONDS: float = float(os.getenv("MEMORY_JOB_RETENTION_SECONDS", "3600"))
+# Concurrent batches. Each batch holds one writer connection while it's stored.
+PIPELINE_WORKERS: int = int(os.getenv("MEMORY_PIPELINE_WORKERS", "2"))
+# Jobs extracted, embedded and inserted together.
+PIPELINE_BATCH_SIZE: int = int(os.getenv("MEMORY_PIPELINE_BATCH_SIZE", "16"))
+# How long a worker waits for a batch to fill once it has a job.
+PIPELINE_BATCH_WAIT_SECONDS: float = float(os.getenv("MEMORY_PIPELINE_BATCH_WAIT_MS", "200")) / 1000
+
+if JOB_QUEUE_BACKEND not in JOB_QUEUE_BACKENDS:
+    raise ValueError(f"MEMORY_JOB_QUEUE_BACKEND must be one of {JOB_QUEUE_BACKENDS}, got {JOB_QUEUE_BACKEND}")
+
+
+class MemoryQueueFull(Exception):
+    """The job queue is at MEMORY_JOB_QUEUE_SIZE"""
+
+
+class MemoryJobQueue(ABC):
+    """Queue of create-memory jobs and the status of every job"""
+
+    @abstractmethod
+    async def put(self, job_id: str, request: CreateMemoryRequest) -> GetMemoryJobResponse:
+        """Queue a job. Raises MemoryQueueFull when there's no room."""
+        pass
+
+    @abstractmethod
+    async def get_batch(self, max_size: int, max_wait: float) -> List[Tuple[str, CreateMemoryRequest]]:
+        """Wait for a job, then for up to max_wait seconds for more, up to max_size jobs."""
+        pass
+
+    @abstractmethod
+    async def set_status(
+        self,
+        job_id: str,
+        status: MemoryJobStatus,
+        result: Optional[CreateMemoryResponse] = None,
+        error: Optional[str] = None
+    ) -> None:
+        pass
+
+    @abstractmethod
+    async def get_status(self, job_id: str) -> Optional[GetMemoryJobResponse]:
+        pass
+
+
+class InProcessMemoryJobQueue(MemoryJobQueue):
+    """
+    Jobs in an asyncio queue of the gateway process. Nothing is shared between pods, the
+    status of a job is only known to the pod it was submitted to, and queued jobs are
+    lost when the pod stops.
+    """
+
+    def __init__(self, max_size: int = JOB_QUEUE_SIZE, retention_seconds: float = JOB_RETENTION_SECONDS):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._jobs: Dict[str, GetMemoryJobResponse] = {}
+        # Monotonic time each finished job finished at, for the retention.
+        self._finished_at: Dict[str, float] = {}
+        self._retention_seconds = retention_seconds
+
+    async def put(self, job_id: str, request: CreateMemoryRequest) -> GetMemoryJobResponse:
+        self._prune()
+        try:
+            self._queue.put_nowait((job_id, request))
+        except asyncio.QueueFull as e:
+            raise MemoryQueueFull(f"{self._queue.maxsize} create-memory jobs are already queued") from e
+
+        now = datetime.now(timezone.utc)
+        job = GetMemoryJobResponse(job_id=job_id, status="queued", created_at=now, updated_at=now)
+        self._jobs[job_id] = job
+        return job
+
+    async def get_batch(self, max_size: int, max_wait: float) -> List[Tuple[str, CreateMemoryRequest]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + max_wait
+        while len(batch) < max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def set_status(
+        self,
+        job_id: str,
+        status: MemoryJobStatus,
+        result: Optional[CreateMemoryResponse] = None,
+        error: Optional[str] = None
+    ) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        self._jobs[job_id] = job.model_copy(update={
+            'status': status,
+            'updated_at': datetime.now(timezone.utc),
+            'result': result,
+            'error': error
+        })
+        if status in ("completed", "failed", "skipped"):
+            self._finished_at[job_id] = time.monotonic()
+
+    async def get_status(self, job_id: str) -> Optional[GetMemoryJobResponse]:
+        return self._jobs.get(job_id)
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention. Queued and running jobs are kept."""
+        expired_before = time.monotonic() - self._retention_seconds
+        for job_id in [job_id for job_id, finished in self._finished_at.items() if finished < expired_before]:
+            del self._finished_at[job_id]
+            self._jobs.pop(job_id, None)
+
+
+def _build_job_queue() -> MemoryJobQueue:
+    return InProcessMemoryJobQueue()
+
+
+class MemoryPipeline:
+    """
+    Background create-memory pipeline. /create-memory queues a job and returns; workers take
+    batches of jobs, run the LLM extractions concurrently, embed all memories of the batch with
+    one embedding request and store them in one transaction.
+    """
+    _queue: Optional[MemoryJobQueue] = None
+    _workers: List[asyncio.Task] = []
+
+    @classmethod
+    def queue(cls) -> MemoryJobQueue:
+        if cls._queue is None:
+            cls._queue = _build_job_queue()
+        return cls._queue
+
+    @classmethod
+    async def start(cls, workers: int = PIPELINE_WORKERS) -> None:
+        """Start the workers on the running event loop, at gateway startup."""
+        cls.queue()
+        cls._workers = [asyncio.create_task(cls._run_worker(), name=f"memory-pipeline-{i}") for i in range(workers)]
+        logger.info("Started %d create-memory workers", workers)
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Cancel the workers. Jobs of an interrupted batch are left as running."""
+        for worker in cls._workers:
+            worker.cancel()
+        await asyncio.gather(*cls._workers, return_exceptions=True)
+        cls._workers = []
+
+    @classmethod
+    async def submit(cls, request: CreateMemoryRequest) -> CreateMemoryJobResponse:
+        """
+        Queue a create-memory job. Raises MemoryQueueFull when the queue is full, and ValueError
+        for a session id that isn't a UUID, which would fail the whole batch it lands in.
+        """
+        try:
+            uuid.UUID(request.session_id)
+        except ValueError as e:
+            raise ValueError(f"session_id must be a UUID, got {request.session_id!r}") from e
+        job = await cls.queue().put(str(uuid.uuid4()), request)
+        return CreateMemoryJobResponse(job_id=job.job_id, status=job.status)
+
+    @classmethod
+    async def get_job(cls, job_id: str) -> Optional[GetMemoryJobResponse]:
+        return await cls.queue().get_status(job_id)
+
+    @classmethod
+    async def _run_worker(cls) -> None:
+        queue = cls.queue()
+        while True:
+            jobs = await queue.get_batch(PIPELINE_BATCH_SIZE, PIPELINE_BATCH_WAIT_SECONDS)
+            try:
+                await cls.process_batch(jobs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Create-memory batch of %d jobs failed", len(jobs))
+                # Jobs whose extraction failed keep their own error.
+                for job_id, _ in jobs:
+                    job = await queue.get_status(job_id)
+                    if job is not None and job.status == "running":
+                        await queue.set_status(job_id, "failed", error=str(e))
+
+    @classmethod
+    async def process_batch(cls, jobs: List[Tuple[str, CreateMemoryRequest]]) -> None:
+        """
+        Extract, embed and store the memories of a batch of jobs. Only the messages after each
+        session's extraction watermark are distilled. A failed extraction fails only its job;
+        a failed embedding or write fails the jobs that reached it.
+        """
+        queue = cls.queue()
+        for job_id, _ in jobs:
+            await queue.set_status(job_id, "running")
+
+        # A session queued more than once is extracted once, from the job with its newest messages.
+        latest: Dict[str, Tuple[str, CreateMemoryRequest]] = {}
+        for job_id, request in jobs:
+            current = latest.get(request.session_id)
+            if current is None or _message_count(request) >= _message_count(current[1]):
+                latest[request.session_id] = (job_id, request)
+        for job_id, request in jobs:
+            if latest[request.session_id][0] != job_id:
+                await queue.set_status(job_id, "skipped", error="Superseded by a newer job of the session")
+
+        watermarks = await AsyncPGMemoryClient.read_watermarks(list(latest))
+        transcripts: List[Tuple[str, CreateMemoryRequest, str]] = []
+        for job_id, request in latest.values():
+            try:
+                transcripts.append((job_id, request, PGMemoryClient._extraction_transcript(request, watermarks.get(request.session_id))))
+            except NothingToExtract as e:
+                await queue.set_status(job_id, "skipped", error=str(e))
+            except ValueError as e:
+                await queue.set_status(job_id, "failed", error=str(e))
+
+        # Each extraction is its own LLM call. The gateway client is blocking, so they run in threads.
+        contents = await asyncio.gather(
+            *(asyncio.to_thread(PGMemoryClient._summarize_session, transcript) for _, _, transcript in transcripts),
+            return_exceptions=True
+        )
+        extracted: List[Tuple[str, CreateMemoryRequest, str]] = []
+        for (job_id, request, _), content in zip(transcripts, contents):
+            if isinstance(content, Exception):
+                logger.warning("Memory extraction for job %s failed: %s", job_id, content)
+                await queue.set_status(job_id, "failed", error=str(content))
+            else:
+                extracted.append((job_id, request, content))
+        if not extracted:
+            return
+
+        embeddings, embeddings_next = await asyncio.to_thread(
+            PGMemoryClient._embed_contents, [content for _, _, content in extracted]
+        )
+        memories: List[Memory] = [
+            PGMemoryClient._to_new_memory(request, content, embeddings[i], embeddings_next[i] if embeddings_next else None)
+            for i, (_, request, content) in enumerate(extracted)
+        ]
+
+        responses = await AsyncPGMemoryClient.create_memories(
+            memories, [PGMemoryClient._watermark_row(request) for _, request, _ in extracted]
+        )
+        for (job_id, request, _), response in zip(extracted, responses):
+            if response is None:
+                await queue.set_status(job_id, "skipped", error=str(PGMemoryClient._superseded(request)))
+            else:
+                await queue.set_status(job_id, "completed", result=response)
+        logger.info("Stored %d memories of a batch of %d create-memory jobs", len(memories), len(jobs))
+
+
+def _message_count(request: CreateMemoryRequest) -> int:
+    return len(request.session_context.get_messages())
@@ -39,6 +39,7 @@ sys.modules['psycopg2'] = MagicMock()
 sys.modules['psycopg2.extras'] = MagicMock()
 sys.modules['pgvector'] = MagicMock()
 sys.modules['pgvector.sqlalchemy'] = MagicMock()
+sys.modules['pgvector.psycopg'] = MagicMock()
 
 # Mock database dependencies before any imports
 @pytest.fixture(autouse=True)
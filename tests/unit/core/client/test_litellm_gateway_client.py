@@ -17,7 +17,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../../../', 'src'
 
 from agentic_platform.core.client.llm_gateway.litellm_gateway_client import LiteLLMGatewayClient
 from agentic_platform.core.models.llm_models import LLMRequest, LLMResponse, Usage
-from agentic_platform.core.models.embedding_models import EmbedRequest, EmbedResponse
+from agentic_platform.core.models.embedding_models import EmbedRequest, EmbedResponse, EmbedBatchRequest, EmbedBatchResponse
 from agentic_platform.core.models.memory_models import Message, TextContent
 
 
@@ -384,7 +384,41 @@ class TestLiteLLMGatewayClient:
             self.client.embed_invoke(embed_request)
         
         assert "LiteLLM API error: 500 - Internal Server Error" in str(exc_info.value)
-    
+
+    @patch('requests.post')
+    def test_embed_batch_invoke_orders_by_index(self, mock_post):
+        """Test that several texts are embedded in one request and matched back by index"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "object": "list",
+            "data": [
+                {"object": "embedding", "embedding": [0.3, 0.4], "index": 1},
+                {"object": "embedding", "embedding": [0.1, 0.2], "index": 0}
+            ]
+        }
+        mock_post.return_value = mock_response
+
+        embed_request = EmbedBatchRequest(
+            texts=["first", "second"],
+            model_id="amazon.titan-embed-text-v2:0",
+            dimensions=512
+        )
+
+        response = self.client.embed_batch_invoke(embed_request)
+
+        mock_post.assert_called_once_with(
+            "http://localhost:4000/v1/embeddings",
+            headers=self.client._get_headers(),
+            json={
+                "model": "amazon.titan-embed-text-v2:0",
+                "input": ["first", "second"],
+                "dimensions": 512
+            }
+        )
+        assert isinstance(response, EmbedBatchResponse)
+        assert response.embeddings == [[0.1, 0.2], [0.3, 0.4]]
+
     def test_get_client(self):
         """Test get_client method"""
         client_info = self.client.get_client()
@@ -0,0 +1,139 @@
+import pytest
+import uuid
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+from sqlalchemy import MetaData, Table, Column, Text, DateTime
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.types import UserDefinedType
+
+from agentic_platform.core.db.bulk_loader import BulkLoader, BulkLoadProgress
+
+REGISTER_VECTOR = 'agentic_platform.core.db.bulk_loader.register_vector'
+
+
+class Vector(UserDefinedType):
+    """Stand-in for pgvector's Vector type, which is mocked in the test session"""
+    cache_ok = True
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def get_col_spec(self, **kw) -> str:
+        return f"VECTOR({self.dim})"
+
+metadata = MetaData()
+ITEMS = Table(
+    "items", metadata,
+    Column('item_id', UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+    Column('kind', Text, nullable=False, default='general'),
+    Column('payload', JSONB),
+    Column('embedding', Vector(3)),
+    Column('created_at', DateTime(timezone=True), server_default='now()'),
+)
+
+
+def mock_engine():
+    """Build a mock engine whose raw psycopg connection supports COPY"""
+    engine = MagicMock()
+    conn = engine.raw_connection.return_value.driver_connection
+    copy = conn.cursor.return_value.__enter__.return_value.copy.return_value.__enter__.return_value
+    return engine, conn, copy
+
+
+def executed_sql(conn):
+    return [c.args[0].as_string(None) for c in conn.execute.call_args_list]
+
+
+class TestBulkLoader:
+    """Test BulkLoader - binary COPY in batches with optional staging and merge"""
+
+    @patch(REGISTER_VECTOR)
+    def test_loads_in_batches_and_reports_progress(self, mock_register_vector):
+        """Test that every batch is copied, committed and reported"""
+        engine, conn, copy = mock_engine()
+        reported = []
+        loader = BulkLoader(engine, batch_size=2, on_progress=lambda p: reported.append(p.rows_loaded))
+
+        rows = ({'payload': {'n': i}, 'embedding': [0.1, 0.2, 0.3]} for i in range(5))
+        progress = loader.load(ITEMS, rows)
+
+        assert isinstance(progress, BulkLoadProgress)
+        assert progress.rows_loaded == 5
+        assert progress.batches == 3
+        assert reported == [2, 4, 5]
+        assert conn.commit.call_count == 3
+        assert copy.write_row.call_count == 5
+        mock_register_vector.assert_called_once_with(conn)
+        engine.raw_connection.return_value.close.assert_called_once()
+
+    @patch(REGISTER_VECTOR)
+    def test_copies_binary_with_defaults_and_conversions(self, mock_register_vector):
+        """Test column selection, COPY types, Python-side defaults and value conversion"""
+        engine, conn, copy = mock_engine()
+        item_id = str(uuid.uuid4())
+        created_at = datetime(2025, 1, 1, 12, 0)
+
+        BulkLoader(engine).load(ITEMS, [{'item_id': item_id, 'payload': [1], 'created_at': created_at}])
+
+        statement = conn.cursor.return_value.__enter__.return_value.copy.call_args[0][0]
+        assert statement.as_string(None) == (
+            'COPY "items" ("item_id", "kind", "payload", "created_at") FROM STDIN (FORMAT BINARY)'
+        )
+        copy.set_types.assert_called_once_with(['uuid', 'text', 'jsonb', 'timestamp with time zone'])
+        values = copy.write_row.call_args[0][0]
+        assert values[0] == uuid.UUID(item_id)
+        assert values[1] == 'general'
+        assert values[2] == [1]
+        assert values[3].tzinfo is not None
+        # No embedding column loaded, no pgvector registration needed
+        mock_register_vector.assert_not_called()
+
+    @patch(REGISTER_VECTOR)
+    def test_staging_merges_and_drops_the_stage(self, mock_register_vector):
+        """Test that use_staging copies into an unlogged table and merges with ON CONFLICT"""
+        engine, conn, copy = mock_engine()
+
+        BulkLoader(engine, use_staging=True).load(ITEMS, [{'item_id': str(uuid.uuid4()), 'payload': {}}])
+
+        statements = executed_sql(conn)
+        assert statements[0].startswith('CREATE UNLOGGED TABLE "items_bulk_stage_')
+        assert 'ON CONFLICT ("item_id") DO UPDATE SET "kind" = EXCLUDED."kind", "payload" = EXCLUDED."payload"' in statements[1]
+        assert statements[2].startswith('TRUNCATE "items_bulk_stage_')
+        assert statements[3].startswith('DROP TABLE IF EXISTS "items_bulk_stage_')
+        stage = conn.cursor.return_value.__enter__.return_value.copy.call_args[0][0].as_string(None)
+        assert stage.startswith('COPY "items_bulk_stage_')
+
+    @patch(REGISTER_VECTOR)
+    def test_staging_can_skip_existing_rows(self, mock_register_vector):
+        """Test that update_existing=False leaves existing rows untouched"""
+        engine, conn, copy = mock_engine()
+
+        BulkLoader(engine, use_staging=True, update_existing=False).load(ITEMS, [{'payload': {}}])
+
+        assert 'ON CONFLICT ("item_id") DO NOTHING' in executed_sql(conn)[1]
+
+    @patch(REGISTER_VECTOR)
+    def test_stage_is_dropped_when_a_batch_fails(self, mock_register_vector):
+        """Test that a failed load still removes the staging table"""
+        engine, conn, copy = mock_engine()
+        copy.write_row.side_effect = RuntimeError("bad row")
+
+        with pytest.raises(RuntimeError):
+            BulkLoader(engine, use_staging=True).load(ITEMS, [{'payload': {}}])
+
+        assert executed_sql(conn)[-1].startswith('DROP TABLE IF EXISTS')
+        engine.raw_connection.return_value.close.assert_called_once()
+
+    def test_empty_input_does_not_connect(self):
+        """Test that nothing happens for an empty stream"""
+        engine = MagicMock()
+
+        progress = BulkLoader(engine).load(ITEMS, iter([]))
+
+        assert progress.rows_loaded == 0
+        engine.raw_connection.assert_not_called()
+
+    def test_rejects_invalid_batch_size(self):
+        """Test batch_size validation"""
+        with pytest.raises(ValueError):
+            BulkLoader(MagicMock(), batch_size=0)
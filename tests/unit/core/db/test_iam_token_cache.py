@@ -0,0 +1,105 @@
+import pytest
+import threading
+import time
+from unittest.mock import MagicMock
+
+from agentic_platform.core.db.iam_token_cache import IAMTokenCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestIAMTokenCache:
+    """Test IAMTokenCache - cached and proactively refreshed Aurora IAM tokens"""
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.rds_client = MagicMock()
+        self.counter = 0
+
+        def generate(**kwargs):
+            self.counter += 1
+            return f"token-{kwargs['DBUsername']}-{self.counter}"
+
+        self.rds_client.generate_db_auth_token.side_effect = generate
+        self.cache = IAMTokenCache(self.rds_client, refresh_seconds=600, max_age_seconds=840, clock=self.clock)
+
+    def teardown_method(self):
+        self.cache.stop()
+
+    def test_token_is_cached_per_user_and_host(self):
+        """Test that repeated connects reuse the same token"""
+        first = self.cache.get_token("writer", "writer-host")
+        second = self.cache.get_token("writer", "writer-host")
+        other = self.cache.get_token("reader", "reader-host")
+
+        assert first == second
+        assert other != first
+        assert self.rds_client.generate_db_auth_token.call_count == 2
+        self.rds_client.generate_db_auth_token.assert_any_call(
+            DBHostname="writer-host", Port=5432, DBUsername="writer"
+        )
+
+    def test_expired_token_is_regenerated_on_connect(self):
+        """Test that a token past max_age is regenerated on the connect path"""
+        first = self.cache.get_token("writer", "writer-host")
+        self.clock.now += 840
+
+        assert self.cache.get_token("writer", "writer-host") != first
+        assert self.rds_client.generate_db_auth_token.call_count == 2
+
+    def test_refresh_due_only_refreshes_old_tokens(self):
+        """Test that the background refresh regenerates tokens older than refresh_seconds"""
+        self.cache.get_token("writer", "writer-host")
+        self.cache.refresh_due()
+        assert self.rds_client.generate_db_auth_token.call_count == 1
+
+        self.clock.now += 600
+        self.cache.refresh_due()
+        assert self.rds_client.generate_db_auth_token.call_count == 2
+
+        # The refreshed token is served without another generation.
+        self.cache.get_token("writer", "writer-host")
+        assert self.rds_client.generate_db_auth_token.call_count == 2
+
+    def test_failed_refresh_keeps_serving_current_token(self):
+        """Test that a failed background refresh doesn't evict a still valid token"""
+        token = self.cache.get_token("writer", "writer-host")
+        self.clock.now += 600
+        self.rds_client.generate_db_auth_token.side_effect = Exception("throttled")
+
+        self.cache.refresh_due()
+
+        assert self.cache.get_token("writer", "writer-host") == token
+
+    def test_concurrent_misses_share_one_generation(self):
+        """Test that a burst of connects on a cold cache generates a single token"""
+        def slow_generate(**kwargs):
+            time.sleep(0.05)
+            return "token"
+
+        self.rds_client.generate_db_auth_token.side_effect = slow_generate
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.cache.get_token("writer", "writer-host")))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["token"] * 10
+        assert self.rds_client.generate_db_auth_token.call_count == 1
+
+    def test_refresh_must_happen_before_max_age(self):
+        """Test that the refresh age has to be below the max token age"""
+        with pytest.raises(ValueError):
+            IAMTokenCache(MagicMock(), refresh_seconds=900, max_age_seconds=840)
@@ -0,0 +1,159 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.pool import QueuePool
+
+from agentic_platform.core.db.liveness import IdleAwareLiveness, retry_on_disconnect, FAILOVER_METRIC
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'liveness.db'}", poolclass=QueuePool, pool_size=1, max_overflow=0)
+    yield engine
+    engine.dispose()
+
+
+def disconnect_error(invalidated: bool = True) -> DBAPIError:
+    error = OperationalError("SELECT 1", {}, Exception("server closed the connection unexpectedly"))
+    error.connection_invalidated = invalidated
+    return error
+
+
+class TestIdleAwareLiveness:
+    """Test IdleAwareLiveness - pings only idle connections and invalidates the pool on failover"""
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.liveness = IdleAwareLiveness(idle_threshold_seconds=30, clock=self.clock)
+
+    def test_recently_used_connection_is_not_pinged(self, sqlite_engine):
+        """Test that a connection returned within the threshold skips the ping"""
+        self.liveness.attach(sqlite_engine)
+
+        with patch.object(sqlite_engine.dialect, 'do_ping') as mock_ping:
+            with sqlite_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            self.clock.now += 10
+            with sqlite_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        mock_ping.assert_not_called()
+
+    def test_idle_connection_is_pinged(self, sqlite_engine):
+        """Test that a connection idle beyond the threshold is pinged on checkout"""
+        self.liveness.attach(sqlite_engine)
+
+        with patch.object(sqlite_engine.dialect, 'do_ping', return_value=True) as mock_ping:
+            with sqlite_engine.connect():
+                pass
+            self.clock.now += 31
+            with sqlite_engine.connect():
+                pass
+
+        mock_ping.assert_called_once()
+
+    def test_failed_ping_replaces_the_connection(self, sqlite_engine):
+        """Test that a dead idle connection is invalidated and a new one is checked out"""
+        self.liveness.attach(sqlite_engine)
+        connects = []
+        event.listen(sqlite_engine, "connect", lambda dbapi_conn, record: connects.append(dbapi_conn))
+
+        with patch.object(sqlite_engine.dialect, 'do_ping', side_effect=Exception("gone")):
+            with sqlite_engine.connect():
+                pass
+            self.clock.now += 31
+            with sqlite_engine.connect() as conn:
+                assert conn.execute(text("SELECT 1")).scalar() == 1
+
+        assert len(connects) == 2
+
+    @pytest.mark.parametrize("sqlstate", ["25006", "57P01"])
+    def test_failover_invalidates_the_pool(self, sqlstate):
+        """Test that failover errors are treated as disconnects of the whole pool"""
+        context = MagicMock()
+        context.original_exception = MagicMock(sqlstate=sqlstate)
+        context.is_disconnect = False
+        facade = MagicMock()
+
+        with patch('agentic_platform.core.db.liveness.get_facade', return_value=facade):
+            self.liveness._on_handle_error(context)
+
+        assert context.is_disconnect is True
+        assert context.invalidate_pool_on_disconnect is True
+        facade.increment_counter.assert_called_once_with(FAILOVER_METRIC)
+
+    def test_single_disconnect_only_invalidates_the_connection(self):
+        """Test that an ordinary disconnect doesn't recycle the whole pool"""
+        context = MagicMock()
+        context.original_exception = MagicMock(sqlstate="08006", pgcode=None)
+        context.is_disconnect = True
+
+        self.liveness._on_handle_error(context)
+
+        assert context.invalidate_pool_on_disconnect is False
+
+    def test_psycopg2_pgcode_is_recognized(self):
+        """Test that psycopg2 errors, which carry pgcode, are detected"""
+        context = MagicMock()
+        context.original_exception = MagicMock(spec=['pgcode'], pgcode="57P01")
+
+        with patch('agentic_platform.core.db.liveness.get_facade', return_value=None):
+            self.liveness._on_handle_error(context)
+
+        assert context.invalidate_pool_on_disconnect is True
+
+
+class TestRetryOnDisconnect:
+    """Test retry_on_disconnect - one transparent retry after an invalidated connection"""
+
+    def test_retries_once_after_disconnect(self):
+        """Test that an invalidated connection is retried once"""
+        func = MagicMock(side_effect=[disconnect_error(), "rows"])
+        func.__qualname__ = "read"
+
+        assert retry_on_disconnect(func)() == "rows"
+        assert func.call_count == 2
+
+    def test_does_not_retry_other_errors(self):
+        """Test that errors on a healthy connection are raised"""
+        func = MagicMock(side_effect=disconnect_error(invalidated=False))
+        func.__qualname__ = "read"
+
+        with pytest.raises(DBAPIError):
+            retry_on_disconnect(func)()
+        assert func.call_count == 1
+
+    def test_second_disconnect_is_raised(self):
+        """Test that only one retry is attempted"""
+        func = MagicMock(side_effect=[disconnect_error(), disconnect_error()])
+        func.__qualname__ = "read"
+
+        with pytest.raises(DBAPIError):
+            retry_on_disconnect(func)()
+        assert func.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_coroutines(self):
+        """Test that coroutine functions are retried as well"""
+        attempts = []
+
+        @retry_on_disconnect
+        async def read():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise disconnect_error()
+            return "rows"
+
+        assert await read() == "rows"
+        assert len(attempts) == 2
@@ -0,0 +1,105 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from sqlalchemy import create_engine, text
+
+from agentic_platform.core.db.pool_telemetry import (
+    PoolTelemetry, PoolSizingAdvisor, TimedQueuePool,
+    CHECKOUT_WAIT_METRIC, CONNECTIONS_IN_USE_METRIC, CONNECT_LATENCY_METRIC, INVALIDATIONS_METRIC
+)
+
+FACADE = 'agentic_platform.core.db.pool_telemetry.get_facade'
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool, pool_size=2, max_overflow=2)
+    yield engine
+    engine.dispose()
+
+
+class TestPoolTelemetry:
+    """Test PoolTelemetry - pool metrics emitted through the ObservabilityFacade"""
+
+    def test_checkouts_emit_metrics_and_feed_advisor(self, sqlite_engine):
+        """Test that checkout, checkin and connect events are recorded"""
+        facade = MagicMock()
+        facade.histogram_metrics = {CHECKOUT_WAIT_METRIC: MagicMock()}
+        telemetry = PoolTelemetry("writer", pool_size=2, max_overflow=2)
+        telemetry.attach(sqlite_engine)
+
+        with patch(FACADE, return_value=facade):
+            first = sqlite_engine.connect()
+            second = sqlite_engine.connect()
+            second.execute(text("SELECT 1"))
+            second.close()
+            first.close()
+
+        recorded = [c.args[0] for c in facade.record_histogram.call_args_list]
+        assert recorded.count(CHECKOUT_WAIT_METRIC) == 2
+        assert recorded.count(CONNECT_LATENCY_METRIC) == 2
+        in_use_deltas = [c.args[1] for c in facade.add_up_down_counter.call_args_list
+                         if c.args[0] == CONNECTIONS_IN_USE_METRIC]
+        assert sorted(in_use_deltas) == [-1, -1, 1, 1]
+        assert facade.record_histogram.call_args_list[0].args[2] == {"db.engine": "writer"}
+
+        recommendation = telemetry.advisor.recommend()
+        assert recommendation.samples == 2
+        assert recommendation.peak_in_use == 2
+
+    def test_invalidation_is_counted(self, sqlite_engine):
+        """Test that invalidated connections increment the invalidation counter"""
+        facade = MagicMock()
+        facade.histogram_metrics = {CHECKOUT_WAIT_METRIC: MagicMock()}
+        telemetry = PoolTelemetry("reader", pool_size=2, max_overflow=2)
+        telemetry.attach(sqlite_engine)
+
+        with patch(FACADE, return_value=facade):
+            conn = sqlite_engine.connect()
+            conn.invalidate()
+            conn.close()
+
+        facade.increment_counter.assert_called_once_with(
+            INVALIDATIONS_METRIC, 1, {"db.engine": "reader", "db.invalidation.soft": False}
+        )
+
+    def test_no_facade_still_feeds_advisor(self, sqlite_engine):
+        """Test that the advisor works when no facade is configured"""
+        telemetry = PoolTelemetry("writer", pool_size=2, max_overflow=2)
+        telemetry.attach(sqlite_engine)
+
+        with patch(FACADE, return_value=None):
+            with sqlite_engine.connect():
+                pass
+
+        assert telemetry.advisor.recommend().samples == 1
+
+
+class TestPoolSizingAdvisor:
+    """Test PoolSizingAdvisor recommendations"""
+
+    def test_no_samples_no_recommendation(self):
+        assert PoolSizingAdvisor(pool_size=10, max_overflow=15).recommend() is None
+
+    def test_recommends_from_observed_concurrency(self):
+        """Test that pool_size covers p95 and overflow covers the peak"""
+        advisor = PoolSizingAdvisor(pool_size=10, max_overflow=15)
+        for in_use in [2] * 95 + [4] * 4 + [6]:
+            advisor.observe_checkout(in_use, 0.0001)
+
+        recommendation = advisor.recommend()
+
+        assert recommendation.pool_size == 3  # ceil(2 * 1.2)
+        assert recommendation.max_overflow == 5  # ceil(6 * 1.2) - 3
+        assert recommendation.saturated is False
+        assert recommendation.connections_per_pod() == 8
+
+    def test_saturated_pool_recommends_more_capacity(self):
+        """Test that waiting at full capacity grows the recommendation beyond the current capacity"""
+        advisor = PoolSizingAdvisor(pool_size=2, max_overflow=2)
+        for _ in range(10):
+            advisor.observe_checkout(4, 0.05)
+
+        recommendation = advisor.recommend()
+
+        assert recommendation.saturated is True
+        assert recommendation.connections_per_pod() > 4
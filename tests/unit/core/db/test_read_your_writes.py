@@ -0,0 +1,140 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+from agentic_platform.core.db.read_your_writes import ReadYourWrites, consistency_keys
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def mock_engine(scalar_values=None):
+    """Mock sync engine whose connection returns the given scalars in order"""
+    engine = MagicMock()
+    conn = MagicMock()
+    conn.execute.return_value.scalar.side_effect = scalar_values or []
+    engine.connect.return_value.__enter__.return_value = conn
+    return engine, conn
+
+
+def mock_async_engine(scalar_values=None):
+    """Mock async engine whose connection returns the given scalars in order"""
+    engine = MagicMock()
+    conn = MagicMock()
+    results = []
+    for value in scalar_values or []:
+        result = MagicMock()
+        result.scalar.return_value = value
+        results.append(result)
+    conn.execute = AsyncMock(side_effect=results)
+    engine.connect.return_value.__aenter__.return_value = conn
+    return engine, conn
+
+
+class TestReadYourWritesTracking:
+    """Test LSN tracking per session / user key"""
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.ryw = ReadYourWrites(ttl_seconds=30, max_wait_seconds=0, clock=self.clock)
+
+    def test_consistency_keys(self):
+        assert consistency_keys("s1", "u1") == ["session:s1", "user:u1"]
+        assert consistency_keys(user_id="u1") == ["user:u1"]
+        assert consistency_keys() == []
+
+    def test_pending_lsn_is_newest_of_keys(self):
+        """Test that a read waits for the newest write of any of its keys"""
+        self.ryw.record(["session:s1", "user:u1"], "0/16B3748")
+        self.ryw.record(["session:s2", "user:u1"], "1/0000010")
+
+        assert self.ryw.pending_lsn(["session:s1"]) == "0/16B3748"
+        assert self.ryw.pending_lsn(["session:s1", "user:u1"]) == "1/0000010"
+        assert self.ryw.pending_lsn(["session:unknown"]) is None
+
+    def test_older_lsn_does_not_replace_newer(self):
+        self.ryw.record(["user:u1"], "1/0000010")
+        self.ryw.record(["user:u1"], "0/FFFFFFF")
+
+        assert self.ryw.pending_lsn(["user:u1"]) == "1/0000010"
+
+    def test_writes_expire_after_ttl(self):
+        self.ryw.record(["user:u1"], "0/10")
+        self.clock.now += 30
+
+        assert self.ryw.pending_lsn(["user:u1"]) is None
+
+    def test_disabled_tracks_nothing(self):
+        ryw = ReadYourWrites(enabled=False)
+        ryw.record(["user:u1"], "0/10")
+
+        assert ryw.pending_lsn(["user:u1"]) is None
+
+
+class TestReadYourWritesRouting:
+    """Test reader / writer routing"""
+
+    def setup_method(self):
+        self.ryw = ReadYourWrites(max_wait_seconds=0)
+
+    def test_no_pending_write_reads_from_reader_without_check(self):
+        read_engine, read_conn = mock_engine()
+        write_engine, _ = mock_engine()
+
+        with self.ryw.read_connection(read_engine, write_engine, ["user:u1"]) as conn:
+            assert conn is read_conn
+
+        read_conn.execute.assert_not_called()
+        write_engine.connect.assert_not_called()
+
+    def test_caught_up_reader_is_used(self):
+        self.ryw.record(["user:u1"], "0/10")
+        read_engine, read_conn = mock_engine([True])
+        write_engine, _ = mock_engine()
+
+        with self.ryw.read_connection(read_engine, write_engine, ["user:u1"]) as conn:
+            assert conn is read_conn
+
+        write_engine.connect.assert_not_called()
+
+    def test_lagging_reader_falls_back_to_writer(self):
+        self.ryw.record(["user:u1"], "0/10")
+        read_engine, _ = mock_engine([False])
+        write_engine, write_conn = mock_engine()
+
+        with self.ryw.read_connection(read_engine, write_engine, ["user:u1"]) as conn:
+            assert conn is write_conn
+
+    def test_record_write_reads_writer_lsn(self):
+        _, write_conn = mock_engine(["0/20"])
+
+        self.ryw.record_write(write_conn, ["session:s1"])
+
+        assert self.ryw.pending_lsn(["session:s1"]) == "0/20"
+
+    @pytest.mark.asyncio
+    async def test_async_reader_waits_for_replay(self):
+        """Test that the async path polls the reader until it has replayed the write"""
+        ryw = ReadYourWrites(max_wait_seconds=1, poll_interval_seconds=0)
+        ryw.record(["user:u1"], "0/10")
+        read_engine, read_conn = mock_async_engine([False, None, True])
+        write_engine, _ = mock_async_engine()
+
+        async with ryw.read_connection_async(read_engine, write_engine, ["user:u1"]) as conn:
+            assert conn is read_conn
+
+        assert read_conn.execute.await_count == 3
+        write_engine.connect.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_async_lagging_reader_falls_back_to_writer(self):
+        self.ryw.record(["user:u1"], "0/10")
+        read_engine, _ = mock_async_engine([False])
+        write_engine, write_conn = mock_async_engine()
+
+        async with self.ryw.read_connection_async(read_engine, write_engine, ["user:u1"]) as conn:
+            assert conn is write_conn
@@ -0,0 +1,87 @@
+import pytest
+from unittest.mock import MagicMock
+
+from agentic_platform.core.db.session_profiles import (
+    SessionProfileListener, SessionProfile, WorkloadProfile, SESSION_PROFILES,
+    session_profile, current_session_profile
+)
+
+
+def checkout(listener, record):
+    """Run the checkout listener against a mock DBAPI connection"""
+    dbapi_connection = MagicMock()
+    listener._on_checkout(dbapi_connection, record, MagicMock())
+    return dbapi_connection
+
+
+class TestSessionProfiles:
+    """Test workload session profiles applied on checkout"""
+
+    def setup_method(self):
+        self.listener = SessionProfileListener(WorkloadProfile.INTERACTIVE_READ, "memory-gateway")
+        self.record = MagicMock()
+        self.record.info = {}
+
+    def test_every_workload_has_a_bounded_profile(self):
+        """Test that no workload runs without a statement_timeout"""
+        for workload in WorkloadProfile:
+            assert SESSION_PROFILES[workload].statement_timeout_ms > 0
+
+    def test_vector_search_settings(self):
+        """Test that the vector search profile tunes the ANN indexes"""
+        settings = dict(SESSION_PROFILES[WorkloadProfile.VECTOR_SEARCH].settings("app:vector-search"))
+
+        assert settings["statement_timeout"] == "5000"
+        assert settings["hnsw.ef_search"] == "100"
+        assert settings["ivfflat.probes"] == "10"
+        assert settings["application_name"] == "app:vector-search"
+
+    def test_checkout_applies_default_profile_once(self):
+        """Test that the default profile is applied in one statement and then remembered"""
+        dbapi_connection = checkout(self.listener, self.record)
+
+        cursor = dbapi_connection.cursor.return_value
+        query, params = cursor.execute.call_args[0]
+        assert query.count("set_config") == 3
+        assert params[:2] == ["statement_timeout", "2000"]
+        assert "memory-gateway:interactive-read" in params
+        dbapi_connection.commit.assert_called_once()
+        assert self.record.info["session_profile"] == WorkloadProfile.INTERACTIVE_READ
+
+        # Same profile on the next checkout, no round trip
+        dbapi_connection = checkout(self.listener, self.record)
+        dbapi_connection.cursor.assert_not_called()
+
+    def test_checkout_switches_to_requested_profile(self):
+        """Test that a session_profile() block overrides the engine default"""
+        checkout(self.listener, self.record)
+
+        with session_profile(WorkloadProfile.VECTOR_SEARCH):
+            assert current_session_profile() == WorkloadProfile.VECTOR_SEARCH
+            dbapi_connection = checkout(self.listener, self.record)
+
+        assert current_session_profile() is None
+        params = dbapi_connection.cursor.return_value.execute.call_args[0][1]
+        assert "hnsw.ef_search" in params
+        assert self.record.info["session_profile"] == WorkloadProfile.VECTOR_SEARCH
+
+    def test_failed_apply_is_not_remembered(self):
+        """Test that a connection is not marked as configured if the settings failed"""
+        dbapi_connection = MagicMock()
+        dbapi_connection.cursor.return_value.execute.side_effect = RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            self.listener._on_checkout(dbapi_connection, self.record, MagicMock())
+
+        dbapi_connection.cursor.return_value.close.assert_called_once()
+        assert "session_profile" not in self.record.info
+
+    def test_custom_profiles(self):
+        """Test that the listener accepts overridden profiles"""
+        profiles = {WorkloadProfile.INTERACTIVE_READ: SessionProfile(statement_timeout_ms=500, work_mem="1MB")}
+        listener = SessionProfileListener(WorkloadProfile.INTERACTIVE_READ, "app", profiles=profiles)
+
+        dbapi_connection = checkout(listener, self.record)
+
+        params = dbapi_connection.cursor.return_value.execute.call_args[0][1]
+        assert params[:2] == ["statement_timeout", "500"]
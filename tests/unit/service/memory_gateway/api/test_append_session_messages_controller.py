@@ -0,0 +1,37 @@
+import pytest
+from unittest.mock import patch
+
+from agentic_platform.core.models.memory_models import (
+    AppendSessionMessagesRequest, AppendSessionMessagesResponse, Message
+)
+from agentic_platform.service.memory_gateway.api.append_session_messages_controller import AppendSessionMessagesController
+
+
+class TestAppendSessionMessagesController:
+    """Test AppendSessionMessagesController - a simple delegation controller"""
+
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.api.append_session_messages_controller.MemoryClient.append_session_messages')
+    async def test_append_session_messages_delegates_to_memory_client(self, mock_append):
+        """Test that controller properly delegates to MemoryClient.append_session_messages"""
+        # Setup mock response
+        mock_response = AppendSessionMessagesResponse(session_id="test-session", first_sequence=3, last_sequence=4)
+        mock_append.return_value = mock_response
+
+        # Create request
+        request = AppendSessionMessagesRequest(
+            session_id="test-session",
+            messages=[Message(role="user", text="Hi"), Message(role="assistant", text="Hello")]
+        )
+
+        # Call controller
+        result = await AppendSessionMessagesController.append_session_messages(request)
+
+        # Verify delegation
+        mock_append.assert_called_once_with(request)
+        assert result is mock_response
+
+    def test_request_requires_messages(self):
+        """Test that an append without messages is rejected"""
+        with pytest.raises(ValueError):
+            AppendSessionMessagesRequest(session_id="test-session", messages=[])
@@ -1,28 +1,25 @@
 import pytest
 from unittest.mock import patch, MagicMock
 
+from fastapi import HTTPException
+
 from agentic_platform.core.models.memory_models import (
-    CreateMemoryRequest, CreateMemoryResponse, Memory
+    CreateMemoryRequest, CreateMemoryJobResponse
 )
 from agentic_platform.service.memory_gateway.api.create_memory_controller import CreateMemoryController
+from agentic_platform.service.memory_gateway.worker.memory_pipeline import MemoryQueueFull
 
 
 class TestCreateMemoryController:
-    """Test CreateMemoryController - a simple delegation controller"""
+    """Test CreateMemoryController - queues jobs on the create-memory pipeline"""
     
-    @patch('agentic_platform.service.memory_gateway.api.create_memory_controller.MemoryClient.create_memory')
-    def test_create_memory_delegates_to_memory_client(self, mock_create_memory):
-        """Test that controller properly delegates to MemoryClient.create_memory"""
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.api.create_memory_controller.MemoryPipeline.submit')
+    async def test_create_memory_queues_a_job(self, mock_submit):
+        """Test that controller queues the request on the create-memory pipeline"""
         # Setup mock response
-        mock_memory = Memory(
-            session_id="test-session",
-            user_id="test-user", 
-            agent_id="test-agent",
-            content="Test memory content",
-            embedding_model="test-model"
-        )
-        mock_response = CreateMemoryResponse(memory=mock_memory)
-        mock_create_memory.return_value = mock_response
+        mock_response = CreateMemoryJobResponse(job_id="test-job", status="queued")
+        mock_submit.return_value = mock_response
         
         # Create session context for the request
         from agentic_platform.core.models.memory_models import SessionContext
@@ -41,19 +38,20 @@ class TestCreateMemoryController:
         )
         
         # Call controller
-        result = CreateMemoryController.create_memory(request)
+        result = await CreateMemoryController.create_memory(request)
         
         # Verify delegation
-        mock_create_memory.assert_called_once_with(request)
+        mock_submit.assert_called_once_with(request)
         assert result is mock_response
-        assert isinstance(result, CreateMemoryResponse)
-        assert result.memory.content == "Test memory content"
+        assert isinstance(result, CreateMemoryJobResponse)
+        assert result.status == "queued"
     
-    @patch('agentic_platform.service.memory_gateway.api.create_memory_controller.MemoryClient.create_memory')
-    def test_create_memory_passes_through_exceptions(self, mock_create_memory):
-        """Test that controller passes through exceptions from MemoryClient"""
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.api.create_memory_controller.MemoryPipeline.submit')
+    async def test_create_memory_rejects_when_queue_is_full(self, mock_submit):
+        """Test that a full job queue is returned as 503"""
         # Setup mock to raise exception
-        mock_create_memory.side_effect = ValueError("Database connection failed")
+        mock_submit.side_effect = MemoryQueueFull("1000 create-memory jobs are already queued")
         
         # Create session context for the request
         from agentic_platform.core.models.memory_models import SessionContext
@@ -71,12 +69,12 @@ class TestCreateMemoryController:
             session_context=session_context
         )
         
-        # Should raise the same exception
-        with pytest.raises(ValueError, match="Database connection failed"):
-            CreateMemoryController.create_memory(request)
+        # Should raise an HTTP 503
+        with pytest.raises(HTTPException) as exc_info:
+            await CreateMemoryController.create_memory(request)
         
-        # Verify the call was made
-        mock_create_memory.assert_called_once_with(request)
+        assert exc_info.value.status_code == 503
+        mock_submit.assert_called_once_with(request)
     
     def test_controller_is_static_method(self):
         """Test that create_memory is a static method"""
@@ -101,4 +99,22 @@ class TestCreateMemoryController:
         
         # Should not be instantiable (no __init__ needed)
         controller = CreateMemoryController()
-        assert controller is not None 
\ No newline at end of file
+        assert controller is not None 
+
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.api.create_memory_controller.MemoryPipeline.submit')
+    async def test_create_memory_rejects_an_invalid_request(self, mock_submit):
+        """Test that a request the pipeline refuses is returned as 422"""
+        from agentic_platform.core.models.memory_models import SessionContext
+        mock_submit.side_effect = ValueError("session_id must be a UUID, got 'test-session'")
+        request = CreateMemoryRequest(
+            user_id="test-user",
+            session_id="test-session",
+            agent_id="test-agent",
+            session_context=SessionContext(user_id="test-user", messages=[])
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await CreateMemoryController.create_memory(request)
+
+        assert exc_info.value.status_code == 422
@@ -0,0 +1,39 @@
+import pytest
+from unittest.mock import patch
+from pydantic import ValidationError
+
+from agentic_platform.core.models.memory_models import (
+    GetMemoriesBatchRequest, GetMemoriesBatchResponse, GetMemoriesResponse, MemoryView
+)
+from agentic_platform.service.memory_gateway.api.get_memories_batch_controller import GetMemoriesBatchController
+
+
+class TestGetMemoriesBatchController:
+    """Test GetMemoriesBatchController - a simple delegation controller"""
+
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.api.get_memories_batch_controller.MemoryClient.get_memories_batch')
+    async def test_get_memories_batch_delegates_to_memory_client(self, mock_get_memories_batch):
+        """Test that controller properly delegates to MemoryClient.get_memories_batch"""
+        # Setup mock response
+        mock_response = GetMemoriesBatchResponse(results=[
+            GetMemoriesResponse(memories=[MemoryView(content="Likes tea")]),
+            GetMemoriesResponse(memories=[])
+        ])
+        mock_get_memories_batch.return_value = mock_response
+        request = GetMemoriesBatchRequest(user_id="test-user", embeddings=[[0.1, 0.2], [0.3, 0.4]])
+
+        # Call controller
+        result = await GetMemoriesBatchController.get_memories_batch(request)
+
+        # Verify delegation
+        mock_get_memories_batch.assert_called_once_with(request)
+        assert result is mock_response
+
+    def test_embeddings_must_share_their_dimensions(self):
+        """Test that a batch mixing embedding sizes, i.e. models, is rejected"""
+        with pytest.raises(ValidationError, match="same dimensions"):
+            GetMemoriesBatchRequest(user_id="test-user", embeddings=[[0.1, 0.2], [0.3]])
+
+        with pytest.raises(ValidationError):
+            GetMemoriesBatchRequest(user_id="test-user", embeddings=[])
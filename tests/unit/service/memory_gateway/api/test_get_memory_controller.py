@@ -10,8 +10,9 @@ from agentic_platform.service.memory_gateway.api.get_memory_controller import Ge
 class TestGetMemoriesController:
     """Test GetMemoriesController - a simple delegation controller"""
     
+    @pytest.mark.asyncio
     @patch('agentic_platform.service.memory_gateway.api.get_memory_controller.MemoryClient.get_memories')
-    def test_get_memories_delegates_to_memory_client(self, mock_get_memories):
+    async def test_get_memories_delegates_to_memory_client(self, mock_get_memories):
         """Test that controller properly delegates to MemoryClient.get_memories"""
         # Setup mock response
         mock_memory = Memory(
@@ -32,7 +33,7 @@ class TestGetMemoriesController:
         )
         
         # Call controller
-        result = GetMemoriesController.get_memories(request)
+        result = await GetMemoriesController.get_memories(request)
         
         # Verify delegation
         mock_get_memories.assert_called_once_with(request)
@@ -41,8 +42,9 @@ class TestGetMemoriesController:
         assert len(result.memories) == 1
         assert result.memories[0].content == "Test memory content"
     
+    @pytest.mark.asyncio
     @patch('agentic_platform.service.memory_gateway.api.get_memory_controller.MemoryClient.get_memories')
-    def test_get_memories_passes_through_exceptions(self, mock_get_memories):
+    async def test_get_memories_passes_through_exceptions(self, mock_get_memories):
         """Test that controller passes through exceptions from MemoryClient"""
         # Setup mock to raise exception
         mock_get_memories.side_effect = ValueError("Database connection failed")
@@ -52,7 +54,7 @@ class TestGetMemoriesController:
         
         # Should raise the same exception
         with pytest.raises(ValueError, match="Database connection failed"):
-            GetMemoriesController.get_memories(request)
+            await GetMemoriesController.get_memories(request)
         
         # Verify the call was made
         mock_get_memories.assert_called_once_with(request)
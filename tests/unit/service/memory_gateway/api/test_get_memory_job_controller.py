@@ -0,0 +1,38 @@
+import pytest
+from unittest.mock import patch
+from datetime import datetime, timezone
+from fastapi import HTTPException
+
+from agentic_platform.core.models.memory_models import GetMemoryJobRequest, GetMemoryJobResponse
+from agentic_platform.service.memory_gateway.api.get_memory_job_controller import GetMemoryJobController
+
+
+class TestGetMemoryJobController:
+    """Test GetMemoryJobController - reads the status of create-memory jobs"""
+
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.api.get_memory_job_controller.MemoryPipeline.get_job')
+    async def test_get_memory_job_returns_the_job(self, mock_get_job):
+        """Test that controller returns the status kept by the pipeline"""
+        # Setup mock response
+        now = datetime.now(timezone.utc)
+        mock_response = GetMemoryJobResponse(job_id="test-job", status="running", created_at=now, updated_at=now)
+        mock_get_job.return_value = mock_response
+
+        # Call controller
+        result = await GetMemoryJobController.get_memory_job(GetMemoryJobRequest(job_id="test-job"))
+
+        # Verify delegation
+        mock_get_job.assert_called_once_with("test-job")
+        assert result is mock_response
+
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.api.get_memory_job_controller.MemoryPipeline.get_job')
+    async def test_unknown_job_is_not_found(self, mock_get_job):
+        """Test that an unknown or expired job is returned as 404"""
+        mock_get_job.return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            await GetMemoryJobController.get_memory_job(GetMemoryJobRequest(job_id="missing"))
+
+        assert exc_info.value.status_code == 404
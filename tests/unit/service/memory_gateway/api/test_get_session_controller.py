@@ -10,8 +10,9 @@ from agentic_platform.service.memory_gateway.api.get_session_controller import G
 class TestGetSessionContextController:
     """Test GetSessionContextController - a simple delegation controller"""
     
+    @pytest.mark.asyncio
     @patch('agentic_platform.service.memory_gateway.api.get_session_controller.MemoryClient.get_session_context')
-    def test_get_session_context_delegates_to_memory_client(self, mock_get_session_context):
+    async def test_get_session_context_delegates_to_memory_client(self, mock_get_session_context):
         """Test that controller properly delegates to MemoryClient.get_session_context"""
         # Setup mock response
         mock_session_context = SessionContext(
@@ -32,7 +33,7 @@ class TestGetSessionContextController:
         )
         
         # Call controller
-        result = GetSessionContextController.get_session_context(request)
+        result = await GetSessionContextController.get_session_context(request)
         
         # Verify delegation
         mock_get_session_context.assert_called_once_with(request)
@@ -41,8 +42,9 @@ class TestGetSessionContextController:
         assert len(result.results) == 1
         assert result.results[0].session_id == "test-session"
     
+    @pytest.mark.asyncio
     @patch('agentic_platform.service.memory_gateway.api.get_session_controller.MemoryClient.get_session_context')
-    def test_get_session_context_passes_through_exceptions(self, mock_get_session_context):
+    async def test_get_session_context_passes_through_exceptions(self, mock_get_session_context):
         """Test that controller passes through exceptions from MemoryClient"""
         # Setup mock to raise exception
         mock_get_session_context.side_effect = ValueError("Database connection failed")
@@ -52,7 +54,7 @@ class TestGetSessionContextController:
         
         # Should raise the same exception
         with pytest.raises(ValueError, match="Database connection failed"):
-            GetSessionContextController.get_session_context(request)
+            await GetSessionContextController.get_session_context(request)
         
         # Verify the call was made
         mock_get_session_context.assert_called_once_with(request)
@@ -0,0 +1,32 @@
+import pytest
+from unittest.mock import patch
+
+from agentic_platform.core.models.memory_models import ListSessionsRequest, ListSessionsResponse
+from agentic_platform.service.memory_gateway.api.list_sessions_controller import ListSessionsController
+
+
+class TestListSessionsController:
+    """Test ListSessionsController - a simple delegation controller"""
+
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.api.list_sessions_controller.MemoryClient.list_sessions')
+    async def test_list_sessions_delegates_to_memory_client(self, mock_list_sessions):
+        """Test that controller properly delegates to MemoryClient.list_sessions"""
+        # Setup mock response
+        mock_response = ListSessionsResponse(sessions=[], next_cursor=None)
+        mock_list_sessions.return_value = mock_response
+
+        # Create request
+        request = ListSessionsRequest(user_id="test-user", limit=10)
+
+        # Call controller
+        result = await ListSessionsController.list_sessions(request)
+
+        # Verify delegation
+        mock_list_sessions.assert_called_once_with(request)
+        assert result is mock_response
+
+    def test_request_caps_the_page_size(self):
+        """Test that a page can't be arbitrarily large"""
+        with pytest.raises(ValueError):
+            ListSessionsRequest(user_id="test-user", limit=1000)
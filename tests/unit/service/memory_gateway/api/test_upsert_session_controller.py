@@ -10,8 +10,9 @@ from agentic_platform.service.memory_gateway.api.upsert_session_controller impor
 class TestUpsertSessionContextController:
     """Test UpsertSessionContextController - a simple delegation controller"""
     
+    @pytest.mark.asyncio
     @patch('agentic_platform.service.memory_gateway.api.upsert_session_controller.MemoryClient.upsert_session_context')
-    def test_upsert_session_context_delegates_to_memory_client(self, mock_upsert_session_context):
+    async def test_upsert_session_context_delegates_to_memory_client(self, mock_upsert_session_context):
         """Test that controller properly delegates to MemoryClient.upsert_session_context"""
         # Setup mock session context
         mock_session_context = SessionContext(
@@ -31,7 +32,7 @@ class TestUpsertSessionContextController:
         request = UpsertSessionContextRequest(session_context=mock_session_context)
         
         # Call controller
-        result = UpsertSessionContextController.upsert_session_context(request)
+        result = await UpsertSessionContextController.upsert_session_context(request)
         
         # Verify delegation
         mock_upsert_session_context.assert_called_once_with(request)
@@ -39,8 +40,9 @@ class TestUpsertSessionContextController:
         assert isinstance(result, UpsertSessionContextResponse)
         assert result.session_context.session_id == "test-session"
     
+    @pytest.mark.asyncio
     @patch('agentic_platform.service.memory_gateway.api.upsert_session_controller.MemoryClient.upsert_session_context')
-    def test_upsert_session_context_passes_through_exceptions(self, mock_upsert_session_context):
+    async def test_upsert_session_context_passes_through_exceptions(self, mock_upsert_session_context):
         """Test that controller passes through exceptions from MemoryClient"""
         # Setup mock to raise exception
         mock_upsert_session_context.side_effect = ValueError("Database connection failed")
@@ -58,7 +60,7 @@ class TestUpsertSessionContextController:
         
         # Should raise the same exception
         with pytest.raises(ValueError, match="Database connection failed"):
-            UpsertSessionContextController.upsert_session_context(request)
+            await UpsertSessionContextController.upsert_session_context(request)
         
         # Verify the call was made
         mock_upsert_session_context.assert_called_once_with(request)
@@ -0,0 +1,852 @@
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+import uuid
+import json
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import NullType
+
+from agentic_platform.core.models.memory_models import (
+    GetSessionContextRequest, GetSessionContextResponse, SessionContext, Message,
+    UpsertSessionContextRequest, UpsertSessionContextResponse,
+    AppendSessionMessagesRequest, AppendSessionMessagesResponse,
+    ListSessionsRequest, ListSessionsResponse,
+    GetMemoriesRequest, GetMemoriesResponse, Memory,
+    GetMemoriesBatchRequest, GetMemoriesBatchResponse,
+    CreateMemoryRequest, CreateMemoryResponse
+)
+from agentic_platform.service.memory_gateway.client.memory.async_pg_memory_client import AsyncPGMemoryClient
+from agentic_platform.service.memory_gateway.client.memory.pg_memory_client import (
+    PGMemoryClient, NothingToExtract, clear_statement_cache, _memory_insert_statement, _memory_batch_insert_statement,
+    _memory_batch_dedup_statement
+)
+
+MODULE = 'agentic_platform.service.memory_gateway.client.memory.async_pg_memory_client'
+
+
+def mock_async_engine(rows=None):
+    """Build a mock AsyncEngine whose connect() is an async context manager."""
+    mock_engine = MagicMock()
+    mock_conn = MagicMock()
+    mock_conn.execute = AsyncMock(return_value=rows or [])
+    mock_conn.commit = AsyncMock()
+    mock_conn.rollback = AsyncMock()
+    mock_engine.connect.return_value.__aenter__.return_value = mock_conn
+    return mock_engine, mock_conn
+
+
+def mock_watermark_result(*session_ids):
+    """The result of the watermark upsert, one row per session it advanced."""
+    result = MagicMock()
+    rows = [MagicMock(session_id=uuid.UUID(session_id)) for session_id in session_ids]
+    result.__iter__.return_value = iter(rows)
+    result.first.return_value = rows[0] if rows else None
+    return result
+
+
+class TestAsyncPGMemoryClient:
+    """Test AsyncPGMemoryClient - async execution of the shared PGMemoryClient statements"""
+
+    def setup_method(self):
+        """Setup test data"""
+        clear_statement_cache()
+        self.sample_session_id = str(uuid.uuid4())
+        self.sample_user_id = "test-user"
+        self.sample_agent_id = str(uuid.uuid4())
+
+        self.sample_session_context = SessionContext(
+            session_id=self.sample_session_id,
+            user_id=self.sample_user_id,
+            agent_id=self.sample_agent_id,
+            messages=[Message(role="user", text="Hello")]
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_session_context(self):
+        """Test getting session context on the async reader engine"""
+        mock_row = MagicMock()
+        mock_row._mapping = {
+            'session_id': uuid.UUID(self.sample_session_id),
+            'user_id': self.sample_user_id,
+            'agent_id': self.sample_agent_id,
+            'system_prompt': None,
+            'messages': [{"role": "user", "content": [{"type": "text", "text": "Hello"}]}],
+            'session_metadata': None,
+            'created_at': datetime.now(),
+            'updated_at': datetime.now()
+        }
+        mock_engine, mock_conn = mock_async_engine([mock_row])
+
+        with patch(f'{MODULE}.read_db', mock_engine):
+            result = await AsyncPGMemoryClient.get_session_context(
+                GetSessionContextRequest(session_id=self.sample_session_id)
+            )
+
+        assert isinstance(result, GetSessionContextResponse)
+        assert len(result.results) == 1
+        assert result.results[0].session_id == self.sample_session_id
+        mock_conn.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_upsert_session_context_commits(self):
+        """Test upserting a session context on the async writer engine"""
+        mock_engine, mock_conn = mock_async_engine()
+
+        with patch(f'{MODULE}.write_db', mock_engine):
+            result = await AsyncPGMemoryClient.upsert_session_context(
+                UpsertSessionContextRequest(session_context=self.sample_session_context)
+            )
+
+        assert isinstance(result, UpsertSessionContextResponse)
+        mock_conn.execute.assert_awaited_once()
+        mock_conn.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.select')
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.desc')
+    async def test_get_memories(self, mock_desc, mock_select):
+        """Test getting memories on the async reader engine"""
+        # The ids are cast to text by the query
+        mock_row = MagicMock()
+        mock_row._mapping = {
+            'memory_id': str(uuid.uuid4()),
+            'session_id': self.sample_session_id,
+            'user_id': self.sample_user_id,
+            'agent_id': self.sample_agent_id,
+            'content': "Test memory content",
+            'embedding_model': "amazon.titan-embed-text-v2:0",
+            'created_at': datetime.now(),
+            'updated_at': datetime.now()
+        }
+        mock_engine, mock_conn = mock_async_engine([mock_row])
+
+        with patch(f'{MODULE}.read_db', mock_engine):
+            result = await AsyncPGMemoryClient.get_memories(
+                GetMemoriesRequest(session_id=self.sample_session_id)
+            )
+
+        assert isinstance(result, GetMemoriesResponse)
+        assert result.memories[0].content == "Test memory content"
+        assert isinstance(result.memories[0].memory_id, str)
+        mock_conn.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch(f'{MODULE}.AsyncPGMemoryClient.read_watermarks', new_callable=AsyncMock)
+    @patch(f'{MODULE}.PGMemoryClient._extract_memory')
+    async def test_create_memory_extracts_off_loop_and_inserts(self, mock_extract, mock_read_watermarks):
+        """Test that create_memory runs the blocking extraction and inserts asynchronously"""
+        memory = Memory(
+            session_id=self.sample_session_id,
+            user_id=self.sample_user_id,
+            agent_id=self.sample_agent_id,
+            content="Generated memory content",
+            embedding_model="amazon.titan-embed-text-v2:0",
+            embedding=[0.1] * 1024
+        )
+        mock_extract.return_value = memory
+        mock_read_watermarks.return_value = {}
+        mock_engine, mock_conn = mock_async_engine()
+        mock_conn.execute.side_effect = [mock_watermark_result(self.sample_session_id), []]
+
+        request = CreateMemoryRequest(
+            user_id=self.sample_user_id,
+            session_id=self.sample_session_id,
+            agent_id=self.sample_agent_id,
+            session_context=self.sample_session_context
+        )
+
+        with patch(f'{MODULE}.write_db', mock_engine):
+            result = await AsyncPGMemoryClient.create_memory(request)
+
+        assert isinstance(result, CreateMemoryResponse)
+        assert result.memory is memory
+        mock_extract.assert_called_once_with(request, None)
+        # The session's extraction watermark and the memory are written in one transaction
+        assert mock_conn.execute.await_count == 2
+        watermark = mock_conn.execute.await_args_list[0][0][1]
+        assert watermark['message_count'] == len(self.sample_session_context.messages)
+        mock_conn.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch(f'{MODULE}.AsyncPGMemoryClient.read_watermarks', new_callable=AsyncMock, return_value={})
+    @patch(f'{MODULE}.PGMemoryClient._extract_memory')
+    async def test_create_memory_writes_nothing_after_a_concurrent_extraction(self, mock_extract, mock_read_watermarks):
+        """Test that an extraction whose session was advanced meanwhile rolls back without storing its memory"""
+        mock_extract.return_value = Memory(
+            session_id=self.sample_session_id,
+            user_id=self.sample_user_id,
+            agent_id=self.sample_agent_id,
+            content="Generated memory content",
+            embedding_model="amazon.titan-embed-text-v2:0",
+            embedding=[0.1] * 1024
+        )
+        mock_engine, mock_conn = mock_async_engine()
+        mock_conn.execute.side_effect = [mock_watermark_result()]
+
+        with patch(f'{MODULE}.write_db', mock_engine), pytest.raises(NothingToExtract):
+            await AsyncPGMemoryClient.create_memory(CreateMemoryRequest(
+                user_id=self.sample_user_id,
+                session_id=self.sample_session_id,
+                agent_id=self.sample_agent_id,
+                session_context=self.sample_session_context
+            ))
+
+        mock_conn.execute.assert_awaited_once()
+        mock_conn.rollback.assert_awaited_once()
+        mock_conn.commit.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_create_memories_inserts_a_batch_with_one_statement(self):
+        """Test that the memories of a pipeline batch are one executemany insert and one commit"""
+        memories = [
+            Memory(
+                session_id=self.sample_session_id,
+                user_id=self.sample_user_id,
+                agent_id=self.sample_agent_id,
+                content=f"memory {i}",
+                embedding_model="amazon.titan-embed-text-v2:0",
+                embedding=[0.1] * 1024
+            )
+            for i in range(3)
+        ]
+        session_ids = [str(uuid.uuid4()) for _ in memories]
+        mock_engine, mock_conn = mock_async_engine()
+        mock_conn.execute.side_effect = [mock_watermark_result(*session_ids[:2]), []]
+
+        with patch(f'{MODULE}.write_db', mock_engine), \
+             patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.DEDUP_SIMILARITY', None):
+            results = await AsyncPGMemoryClient.create_memories(
+                memories, [{'session_id': uuid.UUID(session_id)} for session_id in session_ids]
+            )
+
+        # The third session was advanced as far by another extraction, its memory isn't written
+        assert [result.memory for result in results[:2]] == memories[:2]
+        assert results[2] is None
+        assert mock_conn.execute.await_count == 2
+        mock_conn.commit.assert_awaited_once()
+        stmt, rows = mock_conn.execute.await_args_list[1][0]
+        assert stmt is _memory_batch_insert_statement(False)
+        assert [row['content'] for row in rows] == ["memory 0", "memory 1"]
+
+    @pytest.mark.asyncio
+    async def test_create_memories_deduplicates_a_batch_with_one_statement(self):
+        """Test that a deduplicating batch is one statement, and near duplicates in the batch are folded together"""
+        memories = [
+            Memory(
+                session_id=self.sample_session_id,
+                user_id=self.sample_user_id,
+                agent_id=self.sample_agent_id,
+                content=f"memory {i}",
+                embedding_model="amazon.titan-embed-text-v2:0",
+                embedding=embedding
+            )
+            for i, embedding in enumerate([[1.0, 0.0], [0.0, 1.0], [0.99, 0.01]])
+        ]
+        stored_id = uuid.uuid4()
+        rows = [
+            MagicMock(memory_id=stored_id, content="memory 0", created_at=None, updated_at=None, deduplicated=False),
+            MagicMock(memory_id=memories[1].memory_id, content="memory 1", created_at=None, updated_at=None, deduplicated=False),
+            MagicMock(memory_id=stored_id, content="memory 0", created_at=None, updated_at=None, deduplicated=True),
+        ]
+        mock_engine, mock_conn = mock_async_engine()
+        mock_conn.execute.side_effect = [mock_watermark_result(self.sample_session_id), rows]
+        pg = 'agentic_platform.service.memory_gateway.client.memory.pg_memory_client'
+
+        with patch(f'{MODULE}.write_db', mock_engine), \
+             patch(f'{pg}.PGVector', side_effect=lambda embedding: embedding), \
+             patch(f'{pg}.DEDUP_SIMILARITY', 0.95):
+            results = await AsyncPGMemoryClient.create_memories(
+                memories, [{'session_id': uuid.UUID(self.sample_session_id)} for _ in memories]
+            )
+
+        assert mock_conn.execute.await_count == 2
+        stmt, params = mock_conn.execute.await_args_list[1][0]
+        assert stmt is _memory_batch_dedup_statement('none', False, 'current', False)
+        assert params['batch_leader'] == [1, 2, 1]
+        assert params['content'] == ["memory 0", "memory 1", "memory 2"]
+        assert params['max_distance'] == pytest.approx(0.05)
+        assert results[1].memory is memories[1]
+        assert results[2].memory.memory_id == str(stored_id)
+
+    def test_batch_dedup_searches_each_leader_in_sql(self):
+        """Test that only batch leaders are searched, inserted or refreshed, and every memory gets a row"""
+        sql = str(_memory_batch_dedup_statement('halfvec', True))
+
+        assert "unnest(CAST(:memory_id AS uuid[])" in sql
+        assert "CAST(:embedding AS vector[])" in sql
+        assert "WHERE batch_leader = batch_position" in sql
+        assert "WHERE user_id = leaders.user_id" in sql
+        assert "CAST(leaders.embedding AS halfvec(1024))" in sql
+        assert "content = memory.content || E'\\n' || matched.content" in sql
+        assert "FROM batch JOIN stored ON stored.batch_position = batch.batch_leader" in sql
+
+    def test_statements_are_reused_across_requests(self):
+        """Test that requests with the same filters share one cached statement"""
+        first, first_params = PGMemoryClient._build_memories_query(
+            GetMemoriesRequest(session_id=self.sample_session_id, limit=5)
+        )
+        second, second_params = PGMemoryClient._build_memories_query(
+            GetMemoriesRequest(session_id=str(uuid.uuid4()), limit=10)
+        )
+        by_user, _ = PGMemoryClient._build_memories_query(GetMemoriesRequest(user_id=self.sample_user_id))
+
+        assert first is second
+        assert by_user is not first
+        assert first_params == {'session_id': self.sample_session_id, 'limit': 5}
+        assert second_params['limit'] == 10
+
+    def test_memories_are_returned_without_embeddings_unless_requested(self):
+        """Test that the default projection leaves the embedding in the database and ids are cast to text"""
+        query, _ = PGMemoryClient._build_memories_query(GetMemoriesRequest(user_id=self.sample_user_id))
+        projected, _ = PGMemoryClient._build_memories_query(
+            GetMemoriesRequest(user_id=self.sample_user_id, fields=["embedding", "content"])
+        )
+        reordered, _ = PGMemoryClient._build_memories_query(
+            GetMemoriesRequest(user_id=str(uuid.uuid4()), fields=["content", "embedding"])
+        )
+
+        assert 'embedding' not in query.selected_columns.keys()
+        assert str(query.selected_columns.memory_id) == "CAST(memory.memory_id AS TEXT)"
+        assert list(projected.selected_columns.keys()) == ['content', 'embedding']
+        assert projected is reordered
+
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.PGVector')
+    def test_decayed_ranking_projects_after_scoring(self, mock_pgvector):
+        """Test that the recency score reads its columns from the candidates but only the requested fields are returned"""
+        query, _ = PGMemoryClient._build_memories_query(GetMemoriesRequest(
+            user_id=self.sample_user_id, embedding=[0.1], recency_half_life_hours=24,
+            memory_type_weights={"preference": 2.0}, fields=["content"]
+        ))
+
+        assert list(query.selected_columns.keys()) == ['content', 'similarity']
+        candidates = query.columns_clause_froms[0]
+        assert {'created_at', 'updated_at', 'memory_type'} <= set(candidates.c.keys())
+
+    def test_memory_rows_become_response_memories_as_is(self):
+        """Test that a projected row is used without validation and unrequested fields stay None"""
+        row = MagicMock()
+        row._mapping = {'content': "Likes tea", 'similarity': 0.9}
+
+        memory = PGMemoryClient._to_memory_view(row)
+
+        assert memory.content == "Likes tea"
+        assert memory.similarity == 0.9
+        assert memory.embedding is None
+        assert GetMemoriesResponse(memories=[memory]).model_dump()['memories'][0]['memory_id'] is None
+
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.PGVector')
+    def test_batch_search_runs_a_lateral_top_k_per_embedding(self, mock_pgvector):
+        """Test that the query embeddings are unnested and each gets its own index-ordered top-k"""
+        query, params = PGMemoryClient._build_memories_batch_query(GetMemoriesBatchRequest(
+            user_id=self.sample_user_id, embeddings=[[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]], limit=3, fields=["content"]
+        ))
+        other, _ = PGMemoryClient._build_memories_batch_query(GetMemoriesBatchRequest(
+            user_id=str(uuid.uuid4()), embeddings=[[0.7, 0.8]], fields=["content"]
+        ))
+
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        assert "FROM unnest(CAST(%(embeddings)s AS vector[])) WITH ORDINALITY AS queries(embedding, query_position) JOIN LATERAL" in sql
+        assert "ORDER BY (memory.embedding <=> queries.embedding) \n LIMIT %(limit)s) AS hits ON true" in sql
+        assert "WHERE memory.user_id = %(user_id)s" in sql
+        assert list(query.selected_columns.keys()) == ['query_index', 'content', 'similarity']
+        assert params['embeddings'] == [mock_pgvector.return_value] * 3
+        assert params['limit'] == 3
+        assert query is other
+
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.PGVector')
+    async def test_get_memories_batch_returns_a_result_per_embedding(self, mock_pgvector):
+        """Test that one read returns the memories grouped by query, in request order"""
+        rows = []
+        for query_index, content in [(0, "Likes tea"), (0, "Drinks it black"), (2, "Flies to Lisbon")]:
+            row = MagicMock(query_index=query_index)
+            row._mapping = {'query_index': query_index, 'content': content, 'similarity': 0.8}
+            rows.append(row)
+        mock_engine, mock_conn = mock_async_engine(rows)
+
+        with patch(f'{MODULE}.read_db', mock_engine):
+            result = await AsyncPGMemoryClient.get_memories_batch(GetMemoriesBatchRequest(
+                user_id=self.sample_user_id, embeddings=[[0.1], [0.2], [0.3]]
+            ))
+
+        assert isinstance(result, GetMemoriesBatchResponse)
+        assert [[memory.content for memory in r.memories] for r in result.results] == [
+            ["Likes tea", "Drinks it black"], [], ["Flies to Lisbon"]
+        ]
+        mock_conn.execute.assert_awaited_once()
+
+    def test_upsert_binds_values_instead_of_inlining_them(self):
+        """Test that the upsert statement is shared and the session context is passed as params"""
+        stmt, params = PGMemoryClient._build_session_context_upsert(
+            UpsertSessionContextRequest(session_context=self.sample_session_context)
+        )
+        other, _ = PGMemoryClient._build_session_context_upsert(
+            UpsertSessionContextRequest(session_context=SessionContext(user_id="other"))
+        )
+
+        assert stmt is other
+        assert params['session_id'] == self.sample_session_id
+        assert params['messages'][0]['r'] == "u"
+        assert params['messages'][0]['c'] == ["Hello"]
+        assert "ON CONFLICT (session_id) DO UPDATE" in str(stmt.compile(dialect=postgresql.dialect()))
+
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.PGVector')
+    def test_similarity_query_can_use_the_hnsw_index(self, mock_pgvector):
+        """Test that similarity search orders by the bare cosine distance and projects the similarity"""
+        query, params = PGMemoryClient._build_memories_query(
+            GetMemoriesRequest(user_id=self.sample_user_id, embedding=[0.1, 0.2], limit=3)
+        )
+
+        # Compile the clauses on their own, the Vector column type is mocked in the test session
+        order_by = [str(clause) for clause in query._order_by_clauses]
+        assert order_by == ["memory.embedding <=> :embedding"]
+        assert str(query.selected_columns.similarity) == "1 - (memory.embedding <=> :embedding)"
+        assert query._limit_clause is not None
+        # The embedding is bound as a pgvector Vector (binary float32), not a formatted string
+        mock_pgvector.assert_called_once_with([0.1, 0.2])
+        assert params['embedding'] is mock_pgvector.return_value
+
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.PGVector')
+    def test_insert_binds_embedding_without_text_conversion(self, mock_pgvector):
+        """Test that create_memory binds the embedding through the pgvector adapter"""
+        memory = Memory(
+            session_id=self.sample_session_id,
+            user_id=self.sample_user_id,
+            agent_id=self.sample_agent_id,
+            content="content",
+            embedding_model="amazon.titan-embed-text-v2:0",
+            embedding=[0.5, 0.25]
+        )
+
+        row = PGMemoryClient._to_memory_row(memory)
+
+        mock_pgvector.assert_called_once_with([0.5, 0.25])
+        assert row['embedding'] is mock_pgvector.return_value
+        embedding_value = _memory_insert_statement()._values['embedding']
+        assert isinstance(embedding_value.type, NullType)
+
+    @pytest.mark.asyncio
+    async def test_append_session_messages_inserts_only_the_new_messages(self):
+        """Test that an append is one statement binding just the new messages"""
+        mock_engine, mock_conn = mock_async_engine([MagicMock(sequence=5), MagicMock(sequence=4)])
+        request = AppendSessionMessagesRequest(
+            session_id=self.sample_session_id,
+            user_id=self.sample_user_id,
+            messages=[Message(role="user", text="Next"), Message(role="assistant", text="Sure")]
+        )
+
+        with patch(f'{MODULE}.write_db', mock_engine):
+            result = await AsyncPGMemoryClient.append_session_messages(request)
+
+        assert isinstance(result, AppendSessionMessagesResponse)
+        assert (result.first_sequence, result.last_sequence) == (4, 5)
+        mock_conn.execute.assert_awaited_once()
+        mock_conn.commit.assert_awaited_once()
+        params = mock_conn.execute.await_args[0][1]
+        assert params['message_count'] == 2
+        assert [m['r'] for m in params['messages']] == ["u", "a"]
+
+    def test_append_statement_bumps_the_sequence_and_inserts_rows(self):
+        """Test the shape of the append SQL: one upsert CTE and an insert of the unnested messages"""
+        stmt, _ = PGMemoryClient._build_session_message_append(
+            AppendSessionMessagesRequest(session_id=self.sample_session_id, messages=[Message(role="user", text="Hi")])
+        )
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+        assert sql.startswith("WITH session_row AS")
+        assert "last_sequence = (session_context.last_sequence + excluded.last_sequence)" in sql
+        assert "INSERT INTO session_message (session_id, sequence, message)" in sql
+        assert "jsonb_array_elements(%(messages)s::JSONB) WITH ORDINALITY" in sql
+
+    def test_upsert_replaces_appended_messages(self):
+        """Test that a full upsert clears the message log and resets the sequence"""
+        stmt, _ = PGMemoryClient._build_session_context_upsert(
+            UpsertSessionContextRequest(session_context=self.sample_session_context)
+        )
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+        assert "DELETE FROM session_message" in sql
+        assert "last_sequence = 0" in sql
+
+    @pytest.mark.asyncio
+    async def test_get_session_context_reassembles_the_last_messages(self):
+        """Test that appended messages follow the stored ones and are windowed to the last N"""
+        mock_row = MagicMock()
+        mock_row._mapping = {
+            'session_id': uuid.UUID(self.sample_session_id),
+            'user_id': self.sample_user_id,
+            'agent_id': None,
+            'system_prompt': None,
+            'messages': [{"role": "user", "content": [{"type": "text", "text": "stored"}]}],
+            'session_metadata': None,
+            'last_sequence': 2,
+            # Rows written before the compact encoding are mixed with compact ones
+            'appended_messages': [
+                {"role": "assistant", "content": [{"type": "text", "text": "first"}]},
+                {"r": "u", "c": ["second"], "t": 1760000000123}
+            ]
+        }
+        mock_engine, mock_conn = mock_async_engine([mock_row])
+
+        with patch(f'{MODULE}.read_db', mock_engine):
+            result = await AsyncPGMemoryClient.get_session_context(
+                GetSessionContextRequest(session_id=self.sample_session_id, last_n_messages=2)
+            )
+
+        assert [m.text for m in result.results[0].messages] == ["first", "second"]
+        assert result.results[0].messages[1].timestamp == 1760000000.123
+        query, params = mock_conn.execute.await_args[0]
+        assert params['last_n_messages'] == 2
+        assert "LIMIT %(last_n_messages)s" in str(query.compile(dialect=postgresql.dialect()))
+
+    @pytest.mark.asyncio
+    async def test_list_sessions_pages_with_a_keyset_cursor(self):
+        """Test that one extra row is fetched and turned into the cursor of the next page"""
+        newest = datetime(2026, 1, 2, tzinfo=timezone.utc)
+        session_ids = [uuid.uuid4() for _ in range(3)]
+        rows = []
+        for i, session_id in enumerate(session_ids):
+            row = MagicMock()
+            row._mapping = {
+                'session_id': session_id,
+                'user_id': self.sample_user_id,
+                'agent_id': None,
+                'created_at': newest - timedelta(hours=i),
+                'updated_at': newest,
+                'message_count': 4,
+                'last_message_preview': "See you"
+            }
+            rows.append(row)
+        mock_engine, mock_conn = mock_async_engine(rows)
+
+        with patch(f'{MODULE}.read_db', mock_engine):
+            result = await AsyncPGMemoryClient.list_sessions(ListSessionsRequest(user_id=self.sample_user_id, limit=2))
+
+        assert isinstance(result, ListSessionsResponse)
+        assert [s.session_id for s in result.sessions] == [str(session_ids[0]), str(session_ids[1])]
+        assert result.sessions[0].message_count == 4
+        query, params = mock_conn.execute.await_args[0]
+        assert params == {'user_id': self.sample_user_id, 'limit': 3}
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        assert "messages," not in sql
+        assert """'$.c[*] ? (@.type() == "string")'""" in sql
+        assert "ORDER BY session_context.created_at DESC, session_context.session_id DESC" in sql
+
+        # The cursor resumes strictly after the last session of the page
+        query, params = PGMemoryClient._build_session_list_query(
+            ListSessionsRequest(user_id=self.sample_user_id, limit=2, cursor=result.next_cursor)
+        )
+        assert params['cursor_created_at'] == newest - timedelta(hours=1)
+        assert params['cursor_session_id'] == session_ids[1]
+        assert "(session_context.created_at, session_context.session_id) <" in str(query.compile(dialect=postgresql.dialect()))
+
+    @pytest.mark.asyncio
+    async def test_list_sessions_last_page_has_no_cursor(self):
+        """Test that a short page ends the pagination"""
+        mock_engine, _ = mock_async_engine([])
+
+        with patch(f'{MODULE}.read_db', mock_engine):
+            result = await AsyncPGMemoryClient.list_sessions(ListSessionsRequest(user_id=self.sample_user_id))
+
+        assert result.sessions == []
+        assert result.next_cursor is None
+
+    def test_list_sessions_rejects_invalid_cursor(self):
+        """Test that a tampered cursor is reported as a bad value"""
+        with pytest.raises(ValueError, match="Invalid session cursor"):
+            PGMemoryClient._build_session_list_query(ListSessionsRequest(user_id=self.sample_user_id, cursor="bm9wZQ=="))
+
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.PGVector')
+    def test_hybrid_query_fuses_vector_and_lexical_rankings(self, mock_pgvector):
+        """Test that a text query with an embedding becomes one weighted RRF statement"""
+        query, params = PGMemoryClient._build_memories_query(GetMemoriesRequest(
+            user_id=self.sample_user_id, embedding=[0.1, 0.2], query_text="order 1234",
+            vector_weight=0.5, lexical_weight=2.0, limit=3
+        ))
+
+        assert params['query_text'] == "order 1234"
+        assert params['vector_weight'] == 0.5
+        assert params['lexical_weight'] == 2.0
+        assert params['candidates'] == 20
+        # Compile without the memory columns, the Vector column type is mocked in the test session
+        sql = str(query.with_only_columns(query.selected_columns.similarity).compile(dialect=postgresql.dialect()))
+        assert "row_number() OVER (ORDER BY memory.embedding <=> %(embedding)s)" in sql
+        assert "ORDER BY memory.embedding <=> %(embedding)s \n LIMIT %(candidates)s" in sql
+        assert "memory.content_tsv @@ websearch_to_tsquery('english', %(query_text)s)" in sql
+        assert "%(vector_weight)s / CAST((60 + vector_hits.rank) AS NUMERIC)" in sql
+        assert "UNION ALL" in sql
+        assert sql.rstrip().endswith("ORDER BY fused.score DESC \n LIMIT %(limit)s")
+        assert 'content_tsv' not in query.selected_columns.keys()
+        assert PGMemoryClient._memories_profile(GetMemoriesRequest(user_id="u", query_text="x")).name == "VECTOR_SEARCH"
+
+    def test_text_query_without_embedding_is_lexical_only(self):
+        """Test that a text query alone skips the vector ranking"""
+        query, params = PGMemoryClient._build_memories_query(
+            GetMemoriesRequest(session_id=self.sample_session_id, query_text="invoice")
+        )
+
+        sql = str(query.with_only_columns(query.selected_columns.similarity).compile(dialect=postgresql.dialect()))
+        assert "lexical_hits" in sql
+        assert "vector_hits" not in sql
+        assert 'embedding' not in params
+        assert 'vector_weight' not in params
+
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.PGVector')
+    def test_zero_lexical_weight_keeps_plain_vector_search(self, mock_pgvector):
+        """Test that turning the lexical ranking off doesn't run the text search"""
+        query, params = PGMemoryClient._build_memories_query(GetMemoriesRequest(
+            user_id=self.sample_user_id, embedding=[0.1], query_text="invoice", lexical_weight=0
+        ))
+
+        sql = str(query.with_only_columns(query.selected_columns.similarity).compile(dialect=postgresql.dialect()))
+        assert "vector_hits" in sql
+        assert "lexical_hits" not in sql
+        assert 'lexical_weight' not in params
+
+    def test_memory_key_includes_the_partition_key(self):
+        """Test that the primary key matches the user_id hash partitioning, upserts conflict on both columns"""
+        from agentic_platform.service.memory_gateway.client.memory.pg_memory_client import MEMORY_TABLE
+
+        assert [column.name for column in MEMORY_TABLE.primary_key.columns] == ['memory_id', 'user_id']
+
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.PGVector')
+    def test_user_searches_filter_on_the_partition_key(self, mock_pgvector):
+        """Test that a user's similarity search carries the user_id equality needed for pruning"""
+        query, _ = PGMemoryClient._build_memories_query(
+            GetMemoriesRequest(user_id=self.sample_user_id, embedding=[0.1], limit=3)
+        )
+
+        assert str(query.whereclause) == "memory.user_id = :user_id"
+
+    @pytest.mark.parametrize("quantization, candidate_order", [
+        ("halfvec", "(memory.embedding::halfvec(1024)) <=> CAST(:embedding AS halfvec(1024))"),
+        ("binary", "(binary_quantize(memory.embedding)::bit(1024)) <~> binary_quantize(CAST(:embedding AS vector(1024)))"),
+    ])
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.PGVector')
+    def test_quantized_search_reranks_candidates_by_exact_distance(self, mock_pgvector, quantization, candidate_order):
+        """Test that quantized search walks the compact index and re-ranks k*N candidates on the full vector"""
+        with patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.EMBEDDING_QUANTIZATION', quantization), \
+             patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.RERANK_FACTOR', 4):
+            query, params = PGMemoryClient._build_memories_query(
+                GetMemoriesRequest(user_id=self.sample_user_id, embedding=[0.1], limit=5)
+            )
+
+        assert params['rerank_candidates'] == 20
+        nearest = query.columns_clause_froms[0].element
+        assert [str(clause) for clause in nearest._order_by_clauses] == [candidate_order]
+        assert str(nearest.selected_columns.distance) == "memory.embedding <=> :embedding"
+        assert str(nearest.whereclause) == "memory.user_id = :user_id"
+        assert [str(clause) for clause in query._order_by_clauses] == ["nearest.distance"]
+        assert str(query.selected_columns.similarity) == "1 - nearest.distance"
+
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.PGVector')
+    def test_quantized_hybrid_search_reranks_vector_candidates(self, mock_pgvector):
+        """Test that the vector side of a hybrid search also ranks by exact distance"""
+        with patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.EMBEDDING_QUANTIZATION', 'halfvec'):
+            query, params = PGMemoryClient._build_memories_query(GetMemoriesRequest(
+                user_id=self.sample_user_id, embedding=[0.1], query_text="invoice", limit=2
+            ))
+
+        assert params['rerank_candidates'] == params['candidates'] * 4
+        sql = str(query.with_only_columns(query.selected_columns.similarity).compile(dialect=postgresql.dialect()))
+        assert "row_number() OVER (ORDER BY nearest.distance)" in sql
+        assert "ORDER BY (memory.embedding::halfvec(1024)) <=> CAST(%(embedding)s AS halfvec(1024))" in sql
+
+    @pytest.mark.asyncio
+    @patch(f'{MODULE}.AsyncPGMemoryClient.read_watermarks', new_callable=AsyncMock, return_value={})
+    @patch(f'{MODULE}.PGMemoryClient._extract_memory')
+    async def test_create_memory_refreshes_a_near_duplicate(self, mock_extract, mock_read_watermarks):
+        """Test that a memory matching an existing one returns the refreshed existing memory"""
+        memory = Memory(
+            session_id=self.sample_session_id,
+            user_id=self.sample_user_id,
+            agent_id=self.sample_agent_id,
+            content="Prefers window seats",
+            embedding_model="amazon.titan-embed-text-v2:0",
+            embedding=[0.1] * 1024
+        )
+        mock_extract.return_value = memory
+        existing_id = uuid.uuid4()
+        refreshed_at = datetime(2026, 1, 1)
+        row = MagicMock(memory_id=existing_id, content="Likes window seats", created_at=datetime(2025, 1, 1),
+                        updated_at=refreshed_at, deduplicated=True)
+        mock_engine, mock_conn = mock_async_engine()
+        mock_conn.execute.side_effect = [mock_watermark_result(self.sample_session_id), [row]]
+
+        with patch(f'{MODULE}.write_db', mock_engine):
+            result = await AsyncPGMemoryClient.create_memory(CreateMemoryRequest(
+                user_id=self.sample_user_id,
+                session_id=self.sample_session_id,
+                agent_id=self.sample_agent_id,
+                session_context=self.sample_session_context
+            ))
+
+        assert result.deduplicated is True
+        assert result.memory.memory_id == str(existing_id)
+        assert result.memory.content == "Likes window seats"
+        assert result.memory.updated_at == refreshed_at
+        stmt, params = mock_conn.execute.await_args_list[1][0]
+        assert "WHERE NOT EXISTS (SELECT 1 FROM duplicate)" in str(stmt)
+        assert params['max_distance'] == pytest.approx(0.05)
+        assert params['memory_type'] == "general"
+        assert mock_conn.execute.await_count == 2
+
+    def test_extraction_transcript_starts_after_the_watermark_with_overlap(self):
+        """Test that only new messages and the configured overlap are sent to the LLM"""
+        messages = [Message(role="user", text=f"message {i}", timestamp=1760000000 + i) for i in range(6)]
+        request = CreateMemoryRequest(
+            user_id=self.sample_user_id,
+            session_id=self.sample_session_id,
+            agent_id=self.sample_agent_id,
+            session_context=SessionContext(session_id=self.sample_session_id, messages=messages)
+        )
+
+        with patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.EXTRACTION_OVERLAP_MESSAGES', 1):
+            transcript = PGMemoryClient._extraction_transcript(request, 4)
+        full = PGMemoryClient._extraction_transcript(request, None)
+
+        assert [m['content'][0]['text'] for m in json.loads(transcript)] == ["message 3", "message 4", "message 5"]
+        assert len(json.loads(full)) == 6
+        assert PGMemoryClient._watermark_row(request)['message_count'] == 6
+        with pytest.raises(NothingToExtract):
+            PGMemoryClient._extraction_transcript(request, 6)
+
+    def test_extraction_watermark_ignores_message_timestamps(self):
+        """Test that messages with equal or skewed timestamps after the watermark are still extracted"""
+        messages = [Message(role="user", text=f"message {i}", timestamp=1760000000 - i) for i in range(4)]
+        request = CreateMemoryRequest(
+            user_id=self.sample_user_id,
+            session_id=self.sample_session_id,
+            agent_id=self.sample_agent_id,
+            session_context=SessionContext(session_id=self.sample_session_id, messages=messages)
+        )
+
+        with patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.EXTRACTION_OVERLAP_MESSAGES', 0):
+            transcript = PGMemoryClient._extraction_transcript(request, 2)
+
+        assert [m['content'][0]['text'] for m in json.loads(transcript)] == ["message 2", "message 3"]
+
+    def test_incremental_memory_keeps_the_whole_session_as_content(self):
+        """Test that a memory distilled from the messages after the watermark still stores the whole session"""
+        messages = [Message(role="user", text=f"message {i}", timestamp=1760000000 + i) for i in range(6)]
+        request = CreateMemoryRequest(
+            user_id=self.sample_user_id,
+            session_id=self.sample_session_id,
+            agent_id=self.sample_agent_id,
+            session_context=SessionContext(session_id=self.sample_session_id, messages=messages)
+        )
+
+        memory = PGMemoryClient._to_new_memory(request, "Counts messages", [0.1])
+
+        assert [m['content'][0]['text'] for m in json.loads(memory.content)] == [f"message {i}" for i in range(6)]
+        assert memory.summary == "Counts messages"
+
+    def test_dedup_can_be_turned_off(self):
+        """Test that without a threshold create_memory is a plain insert"""
+        memory = Memory(
+            session_id=self.sample_session_id, user_id=self.sample_user_id, agent_id=self.sample_agent_id,
+            content="content", embedding_model="amazon.titan-embed-text-v2:0", embedding=[0.1]
+        )
+
+        with patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.DEDUP_SIMILARITY', None):
+            stmt, params, deduplicating = PGMemoryClient._build_memory_write(memory)
+
+        assert stmt is _memory_insert_statement(False)
+        assert deduplicating is False
+        assert 'max_distance' not in params
+
+    def test_dedup_search_uses_the_quantized_index(self):
+        """Test that the duplicate lookup re-ranks quantized candidates and can append content"""
+        from agentic_platform.service.memory_gateway.client.memory.pg_memory_client import _memory_dedup_statement
+
+        sql = str(_memory_dedup_statement('halfvec', True))
+
+        assert "ORDER BY (memory.embedding::halfvec(1024))" in sql
+        assert "LIMIT :rerank_candidates" in sql
+        assert "content = memory.content || E'\\n' || :content" in sql
+        assert "content = memory.content" not in str(_memory_dedup_statement('none', False))
+        assert ":updated_at, :summary" in sql
+
+    def test_dedup_binds_the_row_embedding_whatever_the_column(self):
+        """Test that after a migration swapped the columns the duplicate search still binds the row's embedding"""
+        from agentic_platform.service.memory_gateway.client.memory.pg_memory_client import _memory_dedup_statement
+        pg = 'agentic_platform.service.memory_gateway.client.memory.pg_memory_client'
+
+        with patch.dict(f'{pg}.EMBEDDING_SPACES', {'current': ('embedding_next', 1024), 'next': ('embedding', 1024)}):
+            current = _memory_dedup_statement('halfvec', False, 'current')
+            next_space = _memory_dedup_statement('none', False, 'next', True)
+
+        sql = str(current)
+        assert "memory.embedding_next <=> :embedding" in sql
+        assert "CAST(:embedding AS halfvec(1024))" in sql
+        assert ":embedding_next" not in sql
+        assert "memory.embedding <=> :embedding_next" in str(next_space)
+
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.PGVector')
+    def test_recency_decay_reranks_nearest_candidates_in_sql(self, mock_pgvector):
+        """Test that similarity, decay and type weights are blended over the index candidates"""
+        query, params = PGMemoryClient._build_memories_query(GetMemoriesRequest(
+            user_id=self.sample_user_id, embedding=[0.1], limit=4,
+            recency_half_life_hours=72, recency_weight=0.25, memory_type_weights={"preference": 2.0}
+        ))
+
+        assert params['rerank_candidates'] == 40
+        assert params['half_life_hours'] == 72
+        assert params['recency_weight'] == 0.25
+        assert params['memory_type_weights'] == {"preference": 2.0}
+        nearest = query.columns_clause_froms[0].element
+        assert [str(clause) for clause in nearest._order_by_clauses] == ["memory.embedding <=> :embedding"]
+        score = str(query.selected_columns.similarity)
+        assert "(1 - :recency_weight) * (1 - nearest.distance)" in score
+        assert "power(0.5, EXTRACT(epoch FROM now() - coalesce(nearest.updated_at, nearest.created_at))" in score
+        assert "->> nearest.memory_type" in score
+        assert query._order_by_clauses[0].element.element is query.selected_columns.similarity
+
+    def test_recency_without_embedding_ranks_newest_candidates(self):
+        """Test that without an embedding only the decay is scored over the newest memories"""
+        query, params = PGMemoryClient._build_memories_query(
+            GetMemoriesRequest(session_id=self.sample_session_id, recency_half_life_hours=24)
+        )
+
+        assert 'recency_weight' not in params
+        assert 'memory_type_weights' not in params
+        assert str(query.selected_columns.similarity).startswith("power(0.5")
+        assert query.columns_clause_froms[0].name == "newest"
+
+    def test_search_space_follows_the_query_embedding(self):
+        """Test that during an embedding migration searches read the column matching the query embedding"""
+        pg = 'agentic_platform.service.memory_gateway.client.memory.pg_memory_client'
+        with patch(f'{pg}.NEXT_EMBEDDING_MODEL', 'amazon.titan-embed-text-v2:0'), \
+             patch(f'{pg}.NEXT_EMBEDDING_DIMENSIONS', 512):
+            assert PGMemoryClient._search_space([0.1] * 512) == 'next'
+            assert PGMemoryClient._search_space([0.1] * 1024) == 'current'
+            assert PGMemoryClient._search_space(None) == 'current'
+            with patch(f'{pg}.EMBEDDING_MIGRATION_PHASE', 'cutover'):
+                assert PGMemoryClient._search_space(None) == 'next'
+
+        assert PGMemoryClient._search_space([0.1] * 512) == 'current'
+
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.PGVector')
+    def test_dual_write_stores_both_embeddings(self, mock_pgvector):
+        """Test that a memory with a next-model embedding is written to both columns"""
+        from agentic_platform.service.memory_gateway.client.memory.pg_memory_client import _memory_dedup_statement
+        memory = Memory(
+            session_id=self.sample_session_id, user_id=self.sample_user_id, agent_id=self.sample_agent_id,
+            content="content", embedding_model="amazon.titan-embed-text-v2:0",
+            embedding=[0.1] * 1024, embedding_next=[0.2] * 512
+        )
+        pg = 'agentic_platform.service.memory_gateway.client.memory.pg_memory_client'
+
+        with patch(f'{pg}.NEXT_EMBEDDING_MODEL', 'amazon.titan-embed-text-v2:0'):
+            stmt, params, deduplicating = PGMemoryClient._build_memory_write(memory)
+            with patch(f'{pg}.EMBEDDING_MIGRATION_PHASE', 'cutover'):
+                cutover_stmt, _, _ = PGMemoryClient._build_memory_write(memory)
+
+        assert stmt is _memory_dedup_statement('none', False, 'current', True)
+        assert params['embedding_next_model'] == "amazon.titan-embed-text-v2:0"
+        assert 'embedding_next' not in memory.model_dump()
+        sql = str(stmt)
+        assert "embedding_next, embedding_next_model)" in sql
+        assert ":embedding_next, :embedding_next_model" in sql
+        assert "memory.embedding <=> :embedding" in sql
+        assert "memory.embedding_next <=> :embedding_next" in str(cutover_stmt)
@@ -4,6 +4,8 @@ from unittest.mock import patch, MagicMock
 from agentic_platform.core.models.memory_models import (
     GetSessionContextRequest, GetSessionContextResponse,
     UpsertSessionContextRequest, UpsertSessionContextResponse,
+    AppendSessionMessagesRequest, AppendSessionMessagesResponse, Message,
+    ListSessionsRequest, ListSessionsResponse,
     GetMemoriesRequest, GetMemoriesResponse,
     CreateMemoryRequest, CreateMemoryResponse,
     SessionContext, Memory
@@ -14,8 +16,9 @@ from agentic_platform.service.memory_gateway.client.memory.memory_client import
 class TestMemoryClient:
     """Test MemoryClient - a delegation layer to PGMemoryClient"""
     
-    @patch('agentic_platform.service.memory_gateway.client.memory.memory_client.PGMemoryClient.get_session_context')
-    def test_get_session_context_delegates_to_pg_client(self, mock_pg_get_session):
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.client.memory.memory_client.AsyncPGMemoryClient.get_session_context')
+    async def test_get_session_context_delegates_to_pg_client(self, mock_pg_get_session):
         """Test that MemoryClient.get_session_context delegates to PGMemoryClient"""
         # Setup mock response
         mock_session = SessionContext(session_id="test-session", user_id="test-user")
@@ -26,7 +29,7 @@ class TestMemoryClient:
         request = GetSessionContextRequest(session_id="test-session")
         
         # Call MemoryClient
-        result = MemoryClient.get_session_context(request)
+        result = await MemoryClient.get_session_context(request)
         
         # Verify delegation
         mock_pg_get_session.assert_called_once_with(request)
@@ -35,8 +38,9 @@ class TestMemoryClient:
         assert len(result.results) == 1
         assert result.results[0].session_id == "test-session"
     
-    @patch('agentic_platform.service.memory_gateway.client.memory.memory_client.PGMemoryClient.upsert_session_context')
-    def test_upsert_session_context_delegates_to_pg_client(self, mock_pg_upsert):
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.client.memory.memory_client.AsyncPGMemoryClient.upsert_session_context')
+    async def test_upsert_session_context_delegates_to_pg_client(self, mock_pg_upsert):
         """Test that MemoryClient.upsert_session_context delegates to PGMemoryClient"""
         # Setup mock response
         mock_session = SessionContext(session_id="test-session", user_id="test-user")
@@ -47,7 +51,7 @@ class TestMemoryClient:
         request = UpsertSessionContextRequest(session_context=mock_session)
         
         # Call MemoryClient
-        result = MemoryClient.upsert_session_context(request)
+        result = await MemoryClient.upsert_session_context(request)
         
         # Verify delegation
         mock_pg_upsert.assert_called_once_with(request)
@@ -55,8 +59,9 @@ class TestMemoryClient:
         assert isinstance(result, UpsertSessionContextResponse)
         assert result.session_context.session_id == "test-session"
     
-    @patch('agentic_platform.service.memory_gateway.client.memory.memory_client.PGMemoryClient.get_memories')
-    def test_get_memories_delegates_to_pg_client(self, mock_pg_get_memories):
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.client.memory.memory_client.AsyncPGMemoryClient.get_memories')
+    async def test_get_memories_delegates_to_pg_client(self, mock_pg_get_memories):
         """Test that MemoryClient.get_memories delegates to PGMemoryClient"""
         # Setup mock response
         mock_memory = Memory(
@@ -73,7 +78,7 @@ class TestMemoryClient:
         request = GetMemoriesRequest(user_id="test-user", limit=5)
         
         # Call MemoryClient
-        result = MemoryClient.get_memories(request)
+        result = await MemoryClient.get_memories(request)
         
         # Verify delegation
         mock_pg_get_memories.assert_called_once_with(request)
@@ -82,8 +87,9 @@ class TestMemoryClient:
         assert len(result.memories) == 1
         assert result.memories[0].content == "Test content"
     
-    @patch('agentic_platform.service.memory_gateway.client.memory.memory_client.PGMemoryClient.create_memory')
-    def test_create_memory_delegates_to_pg_client(self, mock_pg_create):
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.client.memory.memory_client.AsyncPGMemoryClient.create_memory')
+    async def test_create_memory_delegates_to_pg_client(self, mock_pg_create):
         """Test that MemoryClient.create_memory delegates to PGMemoryClient"""
         # Setup mock response
         mock_memory = Memory(
@@ -106,7 +112,7 @@ class TestMemoryClient:
         )
         
         # Call MemoryClient
-        result = MemoryClient.create_memory(request)
+        result = await MemoryClient.create_memory(request)
         
         # Verify delegation
         mock_pg_create.assert_called_once_with(request)
@@ -114,6 +120,40 @@ class TestMemoryClient:
         assert isinstance(result, CreateMemoryResponse)
         assert result.memory.content == "Test content"
     
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.client.memory.memory_client.AsyncPGMemoryClient.append_session_messages')
+    async def test_append_session_messages_delegates_to_pg_client(self, mock_pg_append):
+        """Test that MemoryClient.append_session_messages delegates to AsyncPGMemoryClient"""
+        # Setup mock response
+        mock_response = AppendSessionMessagesResponse(session_id="test-session", first_sequence=1, last_sequence=1)
+        mock_pg_append.return_value = mock_response
+
+        # Create request
+        request = AppendSessionMessagesRequest(session_id="test-session", messages=[Message(role="user", text="Hi")])
+
+        # Call MemoryClient
+        result = await MemoryClient.append_session_messages(request)
+
+        # Verify delegation
+        mock_pg_append.assert_called_once_with(request)
+        assert result is mock_response
+
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.client.memory.memory_client.AsyncPGMemoryClient.list_sessions')
+    async def test_list_sessions_delegates_to_pg_client(self, mock_pg_list):
+        """Test that MemoryClient.list_sessions delegates to AsyncPGMemoryClient"""
+        # Setup mock response
+        mock_response = ListSessionsResponse(sessions=[])
+        mock_pg_list.return_value = mock_response
+
+        # Call MemoryClient
+        request = ListSessionsRequest(user_id="test-user")
+        result = await MemoryClient.list_sessions(request)
+
+        # Verify delegation
+        mock_pg_list.assert_called_once_with(request)
+        assert result is mock_response
+
     def test_memory_client_class_structure(self):
         """Test MemoryClient class structure"""
         # Should have all required class methods
@@ -144,8 +184,9 @@ class TestMemoryClient:
             # Check if it's a classmethod by checking the method type
             assert isinstance(method, type(MemoryClient.get_memories)), f"{method_name} should be a classmethod"
     
-    @patch('agentic_platform.service.memory_gateway.client.memory.memory_client.PGMemoryClient.get_memories')
-    def test_exception_passthrough(self, mock_pg_get_memories):
+    @pytest.mark.asyncio
+    @patch('agentic_platform.service.memory_gateway.client.memory.memory_client.AsyncPGMemoryClient.get_memories')
+    async def test_exception_passthrough(self, mock_pg_get_memories):
         """Test that exceptions from PGMemoryClient are passed through"""
         # Setup mock to raise exception
         mock_pg_get_memories.side_effect = RuntimeError("Database error")
@@ -155,7 +196,7 @@ class TestMemoryClient:
         
         # Should raise the same exception
         with pytest.raises(RuntimeError, match="Database error"):
-            MemoryClient.get_memories(request)
+            await MemoryClient.get_memories(request)
         
         # Verify the call was made
         mock_pg_get_memories.assert_called_once_with(request) 
\ No newline at end of file
@@ -7,10 +7,11 @@ from datetime import datetime
 from agentic_platform.core.models.memory_models import (
     GetSessionContextRequest, GetSessionContextResponse, SessionContext,
     UpsertSessionContextRequest, UpsertSessionContextResponse,
+    AppendSessionMessagesRequest, Message,
     GetMemoriesRequest, GetMemoriesResponse, Memory,
     CreateMemoryRequest, CreateMemoryResponse
 )
-from agentic_platform.service.memory_gateway.client.memory.pg_memory_client import PGMemoryClient
+from agentic_platform.service.memory_gateway.client.memory.pg_memory_client import PGMemoryClient, clear_statement_cache
 
 @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.MEMORY_TABLE')
 class TestPGMemoryClient:
@@ -18,6 +19,8 @@ class TestPGMemoryClient:
     
     def setup_method(self):
         """Setup test data"""
+        # Statements are cached per filter combination, don't reuse ones built from mocks
+        clear_statement_cache()
         self.sample_session_id = str(uuid.uuid4())
         self.sample_user_id = "test-user"
         self.sample_agent_id = str(uuid.uuid4())
@@ -283,8 +286,8 @@ class TestPGMemoryClient:
         assert isinstance(result, CreateMemoryResponse)
         assert result.memory.user_id == self.sample_user_id
         
-        # Verify database operations
-        mock_write_db.connect.assert_called_once()
+        # Verify database operations: the watermark read, then the memory and watermark writes
+        assert mock_write_db.connect.call_count == 2
         mock_conn.execute.assert_called()
         mock_conn.commit.assert_called_once()
 
@@ -364,4 +367,53 @@ class TestPGMemoryClient:
         
         # Verify database was called
         mock_read_db.connect.assert_called_once()
-        mock_conn.execute.assert_called_once() 
\ No newline at end of file
+        mock_conn.execute.assert_called_once()
+
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.BulkLoader')
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.get_db')
+    def test_bulk_load_memories_uses_copy_loader(self, mock_get_db, mock_loader_class, mock_memory_table):
+        """Test that memory backfills stream rows through the BulkLoader on a dedicated engine"""
+        # Setup mock bulk engine and loader
+        mock_engine = mock_get_db.return_value.create_bulk_engine.return_value
+        mock_loader = mock_loader_class.return_value
+        mock_loader.load.side_effect = lambda table, rows: list(rows)
+
+        memories = [
+            Memory(
+                session_id=self.sample_session_id,
+                user_id=self.sample_user_id,
+                agent_id=self.sample_agent_id,
+                content="Backfilled memory",
+                embedding_model="amazon.titan-embed-text-v2:0",
+                embedding=[0.1] * 1024
+            )
+        ]
+
+        # Call method
+        rows = PGMemoryClient.bulk_load_memories(iter(memories), batch_size=500, use_staging=True)
+
+        # Verify rows were prepared like create_memory and the engine was released
+        mock_loader_class.assert_called_once_with(mock_engine, batch_size=500, use_staging=True, on_progress=None)
+        assert rows[0]['content'] == "Backfilled memory"
+        assert 'similarity' not in rows[0]
+        assert isinstance(rows[0]['agent_id'], uuid.UUID)
+        mock_engine.dispose.assert_called_once()
+
+    @patch('agentic_platform.service.memory_gateway.client.memory.pg_memory_client.write_db')
+    def test_append_session_messages(self, mock_write_db, mock_memory_table):
+        """Test appending messages writes only the new rows and reports their sequences"""
+        # Setup mock database connection
+        mock_conn = MagicMock()
+        mock_write_db.connect.return_value.__enter__.return_value = mock_conn
+        mock_conn.execute.return_value = [MagicMock(sequence=7)]
+
+        # Call method
+        result = PGMemoryClient.append_session_messages(AppendSessionMessagesRequest(
+            session_id=self.sample_session_id, messages=[Message(role="user", text="More")]
+        ))
+
+        # Verify results
+        assert result.session_id == self.sample_session_id
+        assert result.first_sequence == result.last_sequence == 7
+        mock_conn.execute.assert_called_once()
+        mock_conn.commit.assert_called_once()
@@ -0,0 +1,55 @@
+import json
+
+from agentic_platform.core.models.memory_models import Message, ToolCall, ToolResult, TextContent, ImageContent
+from agentic_platform.service.memory_gateway.client.memory.session_codec import encode_message, decode_message
+
+
+class TestSessionCodec:
+    """Test the compact message encoding - round trips, omitted defaults and legacy messages"""
+
+    def setup_method(self):
+        """Setup test data"""
+        self.timestamp = 1760000000.123
+
+    def _dump(self, message: Message):
+        return json.loads(message.model_dump_json())
+
+    def test_text_message_is_compact(self):
+        """Test that a text message keeps only the role, the text and the timestamp"""
+        message = Message(role="user", text="Hello", timestamp=self.timestamp)
+
+        encoded = encode_message(self._dump(message))
+
+        assert encoded == {'r': 'u', 'c': ["Hello"], 't': 1760000000123}
+        assert len(json.dumps(encoded)) < len(message.model_dump_json()) / 2
+
+    def test_round_trip_keeps_tool_calls_results_and_media(self):
+        """Test that every content type and tool field decodes to the same message"""
+        message = Message(
+            role="assistant",
+            content=[TextContent(type="text", text="Looking"), ImageContent(type="image", data="aGk=", mimeType="image/png")],
+            tool_calls=[ToolCall(name="search", arguments={'q': "tea"}, id="call-1"), ToolCall(name="now", arguments={})],
+            tool_results=[ToolResult(id="call-1", content=[TextContent(type="text", text="green")], isError=True)],
+            timestamp=self.timestamp
+        )
+
+        encoded = encode_message(self._dump(message))
+        decoded = Message(**decode_message(json.loads(json.dumps(encoded))))
+
+        assert decoded == message
+        assert encoded['tc'][1] == {'n': "now"}
+
+    def test_message_without_content_keeps_none(self):
+        """Test that a missing content list is told apart from an empty one"""
+        message = Message(role="assistant", tool_calls=[ToolCall(name="now", arguments={})], timestamp=self.timestamp)
+
+        decoded = Message(**decode_message(encode_message(self._dump(message))))
+
+        assert decoded.content is None
+        assert decoded.tool_calls[0].name == "now"
+
+    def test_legacy_message_decodes_unchanged(self):
+        """Test that full message dumps written before the compact encoding are passed through"""
+        stored = self._dump(Message(role="user", text="Hello", timestamp=self.timestamp))
+
+        assert decode_message(stored) is stored
@@ -0,0 +1,26 @@
+import pytest
+
+from agentic_platform.service.memory_gateway.prompt.consolidate_memory_prompt import (
+    ConsolidateMemoryPrompt, SYSTEM_PROMPT, USER_PROMPT
+)
+from agentic_platform.core.models.prompt_models import BasePrompt
+
+
+class TestConsolidateMemoryPrompt:
+    """Test ConsolidateMemoryPrompt class and prompt constants"""
+
+    def test_consolidate_memory_prompt_inherits_from_base_prompt(self):
+        """Test that ConsolidateMemoryPrompt inherits from BasePrompt"""
+        assert issubclass(ConsolidateMemoryPrompt, BasePrompt)
+
+    def test_user_prompt_formats_memories(self):
+        """Test that the memories are inserted into the user prompt"""
+        prompt = ConsolidateMemoryPrompt(inputs={"memories_json": '[{"content": "The user likes tea."}]'})
+
+        assert '[{"content": "The user likes tea."}]' in prompt.user_prompt
+        assert "{memories_json}" in USER_PROMPT
+        assert "<memory>" in USER_PROMPT
+
+    def test_system_prompt_prefers_recent_memories(self):
+        """Test that the system prompt resolves contradictions in favour of newer memories"""
+        assert "most recent" in SYSTEM_PROMPT
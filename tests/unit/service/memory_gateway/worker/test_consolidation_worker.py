@@ -0,0 +1,171 @@
+import pytest
+from unittest.mock import patch, MagicMock, call
+import uuid
+from datetime import datetime, timezone
+
+from agentic_platform.service.memory_gateway.worker.consolidation_worker import (
+    MemoryConsolidationWorker,
+    ConsolidationProgress,
+    cluster_memories,
+    clear_statement_cache,
+    _consolidation_candidates_statement,
+    _consolidation_write_statement
+)
+
+WORKER = 'agentic_platform.service.memory_gateway.worker.consolidation_worker'
+
+
+class TestMemoryConsolidationWorker:
+    """Test MemoryConsolidationWorker - clustering, resumable passes and cluster writes"""
+
+    def setup_method(self):
+        """Setup test data"""
+        clear_statement_cache()
+        self.user_id = "test-user"
+        self.older_than = datetime(2026, 9, 1, tzinfo=timezone.utc)
+
+    def _memory(self, embedding, memory_type='general', content='memory'):
+        return {
+            'memory_id': uuid.uuid4(),
+            'session_id': uuid.uuid4(),
+            'agent_id': uuid.uuid4(),
+            'memory_type': memory_type,
+            'content': content,
+            'embedding': embedding,
+            'created_at': datetime(2026, 8, 1, tzinfo=timezone.utc)
+        }
+
+    def test_cluster_memories_groups_similar_memories_of_the_same_type(self):
+        """Test that close embeddings of one memory_type form a cluster and small clusters are dropped"""
+        similar = [self._memory([1.0, 0.0]), self._memory([0.95, 0.05]), self._memory([0.9, 0.1])]
+        other_type = [self._memory([1.0, 0.0], memory_type='preference')]
+        unrelated = [self._memory([0.0, 1.0])]
+
+        clusters = cluster_memories(similar + other_type + unrelated, similarity=0.9, min_size=2, max_size=10)
+
+        assert clusters == [similar]
+
+    def test_cluster_memories_caps_cluster_size(self):
+        """Test that a group larger than max_size is split into several clusters"""
+        memories = [self._memory([1.0, 0.0]) for _ in range(5)]
+
+        clusters = cluster_memories(memories, similarity=0.9, min_size=2, max_size=3)
+
+        assert [len(cluster) for cluster in clusters] == [3, 2]
+
+    def test_write_statement_archives_or_deletes_originals(self):
+        """Test that archive mode moves the removed memories and delete mode only removes them"""
+        archive = str(_consolidation_write_statement('archive'))
+        delete = str(_consolidation_write_statement('delete'))
+
+        assert "INSERT INTO memory_archive" in archive
+        assert "CAST(:memory_id AS UUID) FROM removed" in archive
+        assert "updated_at, summary, consolidated_into)" in archive
+        assert "RETURNING" in archive and "updated_at, summary\n" in archive
+        assert "memory_archive" not in delete
+        assert "memory_id = ANY(:memory_ids)" in delete
+        assert "SELECT count(*) AS removed FROM removed" in delete
+
+    def test_candidates_are_summarized_from_the_distilled_summary(self):
+        """Test that a memory's summary, not its full transcript, is read as the content to summarize"""
+        content = _consolidation_candidates_statement().selected_columns['content']
+
+        assert "coalesce(memory.summary, memory.content)" in str(content)
+
+    @patch(f'{WORKER}.MemoryConsolidationWorker._save_checkpoint')
+    @patch(f'{WORKER}.MemoryConsolidationWorker.consolidate_user')
+    @patch(f'{WORKER}.MemoryConsolidationWorker._next_users')
+    @patch(f'{WORKER}.MemoryConsolidationWorker._load_checkpoint')
+    def test_run_pass_resumes_from_checkpoint(self, mock_load, mock_next_users, mock_consolidate, mock_save):
+        """Test that a pass starts after the checkpointed user and checkpoints every user"""
+        # Setup mock
+        mock_load.return_value = 'user-b'
+        mock_next_users.side_effect = [['user-c', 'user-d'], []]
+
+        # Call method
+        progress = MemoryConsolidationWorker.run_pass()
+
+        # Verify
+        assert mock_next_users.call_args_list[0].args[0] == 'user-b'
+        assert mock_next_users.call_args_list[1].args[0] == 'user-d'
+        assert [c.args[0] for c in mock_consolidate.call_args_list] == ['user-c', 'user-d']
+        assert mock_save.call_args_list == [call('user-c'), call('user-d'), call('')]
+        assert progress.users == 2
+
+    @patch(f'{WORKER}.MemoryConsolidationWorker._save_checkpoint')
+    @patch(f'{WORKER}.MemoryConsolidationWorker.consolidate_user')
+    @patch(f'{WORKER}.MemoryConsolidationWorker._next_users')
+    @patch(f'{WORKER}.MemoryConsolidationWorker._load_checkpoint')
+    def test_run_pass_stops_after_max_users(self, mock_load, mock_next_users, mock_consolidate, mock_save):
+        """Test that max_users bounds a pass and leaves the checkpoint at the last user"""
+        # Setup mock
+        mock_load.return_value = ''
+        mock_next_users.return_value = ['user-a', 'user-b', 'user-c']
+
+        # Call method
+        progress = MemoryConsolidationWorker.run_pass(max_users=2)
+
+        # Verify
+        assert progress.users == 2
+        assert progress.last_user_id == 'user-b'
+        assert mock_save.call_args_list == [call('user-a'), call('user-b')]
+
+    @patch(f'{WORKER}.MemoryConsolidationWorker._write_cluster')
+    @patch(f'{WORKER}.MemoryConsolidationWorker._summarize')
+    @patch(f'{WORKER}.MemoryConsolidationWorker._read_candidates')
+    def test_consolidate_user_skips_failed_clusters(self, mock_read, mock_summarize, mock_write):
+        """Test that a failed summary leaves its cluster alone and the other clusters are consolidated"""
+        # Setup mock
+        first = [self._memory([1.0, 0.0]) for _ in range(3)]
+        second = [self._memory([0.0, 1.0]) for _ in range(3)]
+        mock_read.return_value = first + second
+        mock_summarize.side_effect = [Exception("LLM gateway unavailable"), {'memory_id': 'new'}]
+        mock_write.return_value = True
+        progress = ConsolidationProgress()
+
+        # Call method
+        MemoryConsolidationWorker.consolidate_user(self.user_id, self.older_than, progress)
+
+        # Verify
+        mock_write.assert_called_once_with(self.user_id, {'memory_id': 'new'}, second)
+        assert progress.clusters == 1
+        assert progress.memories_consolidated == 3
+        assert progress.failed_clusters == 1
+
+    @patch(f'{WORKER}.write_db')
+    def test_write_cluster_rolls_back_when_memories_changed(self, mock_write_db):
+        """Test that the swap is rolled back if fewer memories were removed than clustered"""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_write_db.connect.return_value.__enter__.return_value = mock_conn
+        mock_conn.execute.return_value.scalar.return_value = 1
+        cluster = [self._memory([1.0, 0.0]) for _ in range(3)]
+
+        # Call method
+        written = MemoryConsolidationWorker._write_cluster(self.user_id, {'memory_id': 'new'}, cluster)
+
+        # Verify
+        assert written is False
+        params = mock_conn.execute.call_args.args[1]
+        assert params['memory_ids'] == [memory['memory_id'] for memory in cluster]
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+    @patch(f'{WORKER}.LLMGatewayClient')
+    def test_summarize_embeds_the_consolidated_memory(self, mock_llm_gateway):
+        """Test that the summary is extracted from the memory tags, embedded and keeps the oldest age"""
+        # Setup mock
+        mock_llm_gateway.chat_invoke.return_value = MagicMock(text="<memory>The user prefers tea.</memory>")
+        mock_llm_gateway.embed_invoke.return_value = MagicMock(embedding=[0.1, 0.2])
+        cluster = [self._memory([1.0, 0.0], memory_type='preference') for _ in range(3)]
+
+        # Call method
+        row = MemoryConsolidationWorker._summarize(self.user_id, cluster)
+
+        # Verify
+        assert row['content'] == "The user prefers tea."
+        assert row['user_id'] == self.user_id
+        assert row['memory_type'] == 'preference'
+        assert row['session_id'] == str(cluster[-1]['session_id'])
+        assert row['created_at'] == cluster[0]['created_at']
+        assert mock_llm_gateway.embed_invoke.call_args.args[0].text == "The user prefers tea."
@@ -0,0 +1,126 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import uuid
+
+from agentic_platform.service.memory_gateway.worker.embedding_migration import (
+    EmbeddingMigration,
+    _index_definition,
+    _backfill_batch_statement,
+    clear_statement_cache
+)
+
+MIGRATION = 'agentic_platform.service.memory_gateway.worker.embedding_migration'
+
+
+class TestEmbeddingMigration:
+    """Test EmbeddingMigration - backfill batches and the guards around the schema steps"""
+
+    def _row(self, user_id, content):
+        return MagicMock(user_id=user_id, memory_id=uuid.uuid4(), content=content)
+
+    def test_index_definition_matches_quantized_distances(self):
+        """Test that the next column's index uses the expression the searches order by"""
+        assert _index_definition('embedding_next', 512, 'none') == "embedding_next vector_cosine_ops"
+        assert _index_definition('embedding_next', 512, 'halfvec') == "(embedding_next::halfvec(512)) halfvec_cosine_ops"
+        assert _index_definition('embedding', 256, 'binary') == "(binary_quantize(embedding)::bit(256)) bit_hamming_ops"
+
+    @patch(f'{MIGRATION}.select')
+    @patch(f'{MIGRATION}.func')
+    @patch(f'{MIGRATION}.MEMORY_TABLE')
+    def test_backfill_embeds_the_summary_live_writes_embedded(self, mock_memory_table, mock_func, mock_select):
+        """Test that the backfill re-embeds a session memory's summary and only falls back to its content"""
+        clear_statement_cache()
+        try:
+            _backfill_batch_statement()
+        finally:
+            clear_statement_cache()
+
+        memory = mock_memory_table.c
+        mock_func.coalesce.assert_called_once_with(memory.summary, memory.content)
+        mock_func.coalesce.return_value.label.assert_called_once_with('content')
+        assert mock_select.call_args.args[2] is mock_func.coalesce.return_value.label.return_value
+
+    @patch(f'{MIGRATION}.EmbeddingMigration._create_partitioned_index')
+    @patch(f'{MIGRATION}.write_db')
+    def test_build_index_uses_the_configured_dimensions(self, mock_write_db, mock_create_index):
+        """Test that the quantized index matches the current column's dimensions and other quantizations can be dropped"""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_write_db.connect.return_value.execution_options.return_value.__enter__.return_value = mock_conn
+
+        # Call method
+        with patch(f'{MIGRATION}.EMBEDDING_DIMENSIONS', 512):
+            EmbeddingMigration.build_index('halfvec', drop_others=True)
+
+        # Verify
+        mock_create_index.assert_called_once_with(
+            mock_conn, 'idx_memory_embedding_halfvec', "(embedding::halfvec(512)) halfvec_cosine_ops"
+        )
+        statements = [str(c.args[0]) for c in mock_conn.execute.call_args_list]
+        assert "DROP INDEX IF EXISTS idx_memory_embedding_hnsw" in statements
+        assert "DROP INDEX IF EXISTS idx_memory_embedding_binary" in statements
+        assert "DROP INDEX IF EXISTS idx_memory_embedding_halfvec" not in statements
+        # The session settings of the step don't go back to the pool
+        mock_conn.invalidate.assert_called_once()
+        with pytest.raises(ValueError, match="quantization"):
+            EmbeddingMigration.build_index('int8')
+
+    def test_prepare_requires_next_model(self):
+        """Test that nothing is changed without a next model configured"""
+        with patch(f'{MIGRATION}.NEXT_EMBEDDING_MODEL', None):
+            with pytest.raises(ValueError, match="MEMORY_NEXT_EMBEDDING_MODEL"):
+                EmbeddingMigration.prepare()
+
+    @patch(f'{MIGRATION}._backfill_update_statement')
+    @patch(f'{MIGRATION}._backfill_batch_statement')
+    @patch(f'{MIGRATION}.LLMGatewayClient')
+    @patch(f'{MIGRATION}.write_db')
+    def test_backfill_embeds_batches_and_skips_failures(self, mock_write_db, mock_llm_gateway, mock_batch, mock_update):
+        """Test that each batch is embedded and committed, and a failed embedding is skipped"""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_write_db.connect.return_value.__enter__.return_value = mock_conn
+        first_batch = [self._row('user-a', 'tea'), self._row('user-b', 'coffee')]
+        mock_conn.execute.side_effect = [first_batch, None, []]
+        mock_llm_gateway.embed_invoke.side_effect = [MagicMock(embedding=[0.1, 0.2]), Exception("throttled")]
+
+        # Call method
+        with patch(f'{MIGRATION}.NEXT_EMBEDDING_MODEL', 'amazon.titan-embed-text-v2:0'), \
+             patch(f'{MIGRATION}.NEXT_EMBEDDING_DIMENSIONS', 512):
+            progress = EmbeddingMigration.backfill(batch_size=2)
+
+        # Verify
+        assert progress.memories == 1
+        assert progress.failed == 1
+        assert progress.batches == 1
+        assert mock_llm_gateway.embed_invoke.call_args_list[0].args[0].dimensions == 512
+        updates = mock_conn.execute.call_args_list[1].args[1]
+        assert [u['b_user_id'] for u in updates] == ['user-a']
+        assert updates[0]['b_embedding_model'] == 'amazon.titan-embed-text-v2:0'
+        # The next batch starts after the last memory of the previous one, failed or not.
+        cursor = mock_conn.execute.call_args_list[2].args[1]
+        assert (cursor['after_user_id'], cursor['after_memory_id']) == ('user-b', first_batch[1].memory_id)
+        mock_conn.commit.assert_called_once()
+
+    def test_finalize_refuses_configured_column(self):
+        """Test that the column searches still read can't be dropped"""
+        with patch(f'{MIGRATION}.EMBEDDING_COLUMN', 'embedding'):
+            with pytest.raises(ValueError, match="still configured"):
+                EmbeddingMigration.finalize('embedding')
+
+    @patch(f'{MIGRATION}.write_db')
+    def test_finalize_refuses_until_backfilled(self, mock_write_db):
+        """Test that the previous column is kept while memories only have its embedding"""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_write_db.connect.return_value.execution_options.return_value.__enter__.return_value = mock_conn
+        mock_conn.execute.return_value.scalar.return_value = 3
+
+        # Call method
+        with patch(f'{MIGRATION}.EMBEDDING_COLUMN', 'embedding_next'), \
+             patch(f'{MIGRATION}.NEXT_EMBEDDING_MODEL', None):
+            with pytest.raises(ValueError, match="3 memories"):
+                EmbeddingMigration.finalize('embedding')
+
+        # Verify
+        assert mock_conn.execute.call_count == 1
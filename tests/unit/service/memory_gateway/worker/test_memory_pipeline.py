@@ -0,0 +1,202 @@
+import pytest
+from unittest.mock import patch, AsyncMock
+import uuid
+import json
+
+from agentic_platform.core.models.memory_models import (
+    CreateMemoryRequest, CreateMemoryResponse, SessionContext, Message
+)
+from agentic_platform.service.memory_gateway.worker.memory_pipeline import (
+    MemoryPipeline,
+    InProcessMemoryJobQueue,
+    MemoryQueueFull
+)
+
+PIPELINE = 'agentic_platform.service.memory_gateway.worker.memory_pipeline'
+
+
+class TestMemoryPipeline:
+    """Test MemoryPipeline - the job queue and batched extraction, embedding and writes"""
+
+    def setup_method(self):
+        """Setup test data"""
+        self.queue = InProcessMemoryJobQueue(max_size=2, retention_seconds=60)
+        MemoryPipeline._queue = self.queue
+
+    def teardown_method(self):
+        MemoryPipeline._queue = None
+
+    def _request(self, text="I like tea"):
+        return CreateMemoryRequest(
+            session_id=str(uuid.uuid4()),
+            user_id="test-user",
+            agent_id=str(uuid.uuid4()),
+            session_context=SessionContext(user_id="test-user", messages=[Message(role="user", text=text)])
+        )
+
+    @pytest.mark.asyncio
+    async def test_submit_queues_a_job_and_rejects_when_full(self):
+        """Test that a submitted job is queued with a status and a full queue is rejected"""
+        first = await MemoryPipeline.submit(self._request())
+        await MemoryPipeline.submit(self._request())
+
+        with pytest.raises(MemoryQueueFull):
+            await MemoryPipeline.submit(self._request())
+
+        job = await MemoryPipeline.get_job(first.job_id)
+        assert first.status == "queued"
+        assert job.status == "queued"
+
+    @pytest.mark.asyncio
+    @patch(f'{PIPELINE}.AsyncPGMemoryClient.create_memories', new_callable=AsyncMock)
+    @patch(f'{PIPELINE}.PGMemoryClient._embed_contents')
+    @patch(f'{PIPELINE}.PGMemoryClient._summarize_session')
+    @patch(f'{PIPELINE}.AsyncPGMemoryClient.read_watermarks', new_callable=AsyncMock, return_value={})
+    async def test_malformed_session_id_is_rejected_without_failing_the_batch(
+        self, mock_read_watermarks, mock_summarize, mock_embed, mock_create_memories
+    ):
+        """Test that a job whose session id isn't a UUID is refused at submit and the rest of the batch is stored"""
+        # Setup mock
+        MemoryPipeline._queue = self.queue = InProcessMemoryJobQueue(max_size=10)
+        malformed = self._request("coffee")
+        malformed.session_id = "not-a-uuid"
+        mock_summarize.side_effect = lambda transcript: "memory"
+        mock_embed.return_value = ([[0.1], [0.2]], None)
+        mock_create_memories.side_effect = lambda memories, watermarks: [CreateMemoryResponse(memory=m) for m in memories]
+
+        # Call method
+        first = await MemoryPipeline.submit(self._request("tea"))
+        with pytest.raises(ValueError, match="session_id must be a UUID"):
+            await MemoryPipeline.submit(malformed)
+        last = await MemoryPipeline.submit(self._request("juice"))
+        jobs = await self.queue.get_batch(max_size=10, max_wait=0.01)
+        await MemoryPipeline.process_batch(jobs)
+
+        # Verify
+        assert [job_id for job_id, _ in jobs] == [first.job_id, last.job_id]
+        assert (await MemoryPipeline.get_job(first.job_id)).status == "completed"
+        assert (await MemoryPipeline.get_job(last.job_id)).status == "completed"
+
+    @pytest.mark.asyncio
+    async def test_get_batch_returns_the_queued_jobs_up_to_max_size(self):
+        """Test that a batch takes what is queued without waiting for it to fill"""
+        queue = InProcessMemoryJobQueue(max_size=10)
+        for job_id in ("a", "b", "c"):
+            await queue.put(job_id, self._request())
+
+        batch = await queue.get_batch(max_size=2, max_wait=0.01)
+        rest = await queue.get_batch(max_size=2, max_wait=0.01)
+
+        assert [job_id for job_id, _ in batch] == ["a", "b"]
+        assert [job_id for job_id, _ in rest] == ["c"]
+
+    @pytest.mark.asyncio
+    async def test_finished_jobs_expire_after_the_retention(self):
+        """Test that finished jobs are forgotten after the retention and queued ones are kept"""
+        queue = InProcessMemoryJobQueue(max_size=10, retention_seconds=0)
+        await queue.put("done", self._request())
+        await queue.set_status("done", "completed")
+
+        await queue.put("waiting", self._request())
+
+        assert await queue.get_status("done") is None
+        assert (await queue.get_status("waiting")).status == "queued"
+
+    @pytest.mark.asyncio
+    @patch(f'{PIPELINE}.AsyncPGMemoryClient.create_memories', new_callable=AsyncMock)
+    @patch(f'{PIPELINE}.PGMemoryClient._embed_contents')
+    @patch(f'{PIPELINE}.PGMemoryClient._summarize_session')
+    @patch(f'{PIPELINE}.AsyncPGMemoryClient.read_watermarks', new_callable=AsyncMock, return_value={})
+    async def test_process_batch_embeds_and_writes_the_extracted_memories_together(
+        self, mock_read_watermarks, mock_summarize, mock_embed, mock_create_memories
+    ):
+        """Test that one embedding request and one write cover the batch and a failed extraction fails only its job"""
+        # Setup mock
+        MemoryPipeline._queue = self.queue = InProcessMemoryJobQueue(max_size=10)
+        requests = [self._request("tea"), self._request("broken"), self._request("coffee")]
+        jobs = list(zip(("j1", "j2", "j3"), requests))
+        for job_id, request in jobs:
+            await self.queue.put(job_id, request)
+
+        def summarize(transcript):
+            if "broken" in transcript:
+                raise ValueError("No memory content")
+            return "memory of " + json.loads(transcript)[0]['content'][0]['text']
+        mock_summarize.side_effect = summarize
+        mock_embed.return_value = ([[0.1, 0.2], [0.3, 0.4]], None)
+        mock_create_memories.side_effect = lambda memories, watermarks: [CreateMemoryResponse(memory=memory) for memory in memories]
+
+        # Call method
+        await MemoryPipeline.process_batch(jobs)
+
+        # Verify
+        mock_read_watermarks.assert_awaited_once_with([request.session_id for request in requests])
+        mock_embed.assert_called_once_with(["memory of tea", "memory of coffee"])
+        memories, watermarks = mock_create_memories.await_args.args
+        assert [memory.embedding for memory in memories] == [[0.1, 0.2], [0.3, 0.4]]
+        assert [memory.session_id for memory in memories] == [requests[0].session_id, requests[2].session_id]
+        # The embedded text is stored with the memory, an embedding migration re-embeds it
+        assert [memory.summary for memory in memories] == ["memory of tea", "memory of coffee"]
+        assert [str(watermark['session_id']) for watermark in watermarks] == [requests[0].session_id, requests[2].session_id]
+        assert (await self.queue.get_status("j1")).status == "completed"
+        assert (await self.queue.get_status("j1")).result.memory.session_id == requests[0].session_id
+        failed = await self.queue.get_status("j2")
+        assert (failed.status, failed.error) == ("failed", "No memory content")
+        assert (await self.queue.get_status("j3")).status == "completed"
+
+    @pytest.mark.asyncio
+    @patch(f'{PIPELINE}.AsyncPGMemoryClient.create_memories', new_callable=AsyncMock)
+    @patch(f'{PIPELINE}.PGMemoryClient._summarize_session')
+    @patch(f'{PIPELINE}.AsyncPGMemoryClient.read_watermarks', new_callable=AsyncMock)
+    async def test_process_batch_skips_sessions_without_new_messages(self, mock_read_watermarks, mock_summarize, mock_create_memories):
+        """Test that a session past its watermark isn't sent to the LLM and older jobs of a session are superseded"""
+        # Setup mock
+        MemoryPipeline._queue = self.queue = InProcessMemoryJobQueue(max_size=10)
+        distilled = self._request("already distilled")
+        older = self._request("first turn")
+        newer = older.model_copy(deep=True)
+        newer.session_context.messages.append(Message(role="assistant", text="second turn"))
+        jobs = [("distilled", distilled), ("older", older), ("newer", newer)]
+        for job_id, request in jobs:
+            await self.queue.put(job_id, request)
+        mock_read_watermarks.return_value = {distilled.session_id: len(distilled.session_context.messages)}
+        mock_summarize.side_effect = Exception("LLM gateway unavailable")
+
+        # Call method
+        await MemoryPipeline.process_batch(jobs)
+
+        # Verify
+        mock_read_watermarks.assert_awaited_once_with([distilled.session_id, older.session_id])
+        mock_summarize.assert_called_once()
+        assert "second turn" in mock_summarize.call_args.args[0]
+        assert (await self.queue.get_status("distilled")).status == "skipped"
+        assert (await self.queue.get_status("older")).status == "skipped"
+        assert (await self.queue.get_status("newer")).status == "failed"
+        mock_create_memories.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    @patch(f'{PIPELINE}.AsyncPGMemoryClient.create_memories', new_callable=AsyncMock)
+    @patch(f'{PIPELINE}.PGMemoryClient._embed_contents')
+    @patch(f'{PIPELINE}.PGMemoryClient._summarize_session')
+    @patch(f'{PIPELINE}.AsyncPGMemoryClient.read_watermarks', new_callable=AsyncMock, return_value={})
+    async def test_process_batch_skips_sessions_extracted_concurrently(
+        self, mock_read_watermarks, mock_summarize, mock_embed, mock_create_memories
+    ):
+        """Test that a job whose session another extraction advanced as far meanwhile is skipped"""
+        # Setup mock
+        MemoryPipeline._queue = self.queue = InProcessMemoryJobQueue(max_size=10)
+        jobs = [("stored", self._request("tea")), ("raced", self._request("coffee"))]
+        for job_id, request in jobs:
+            await self.queue.put(job_id, request)
+        mock_summarize.return_value = "memory"
+        mock_embed.return_value = ([[0.1, 0.2], [0.3, 0.4]], None)
+        mock_create_memories.side_effect = lambda memories, watermarks: [CreateMemoryResponse(memory=memories[0]), None]
+
+        # Call method
+        await MemoryPipeline.process_batch(jobs)
+
+        # Verify
+        assert (await self.queue.get_status("stored")).status == "completed"
+        raced = await self.queue.get_status("raced")
+        assert raced.status == "skipped"
+        assert "extracted concurrently" in raced.error